@@ -0,0 +1,102 @@
+# benchmarks/bench_embeddings.py
+"""
+Embedding throughput and memory per backend (torch vs onnx vs onnx-int8).
+
+Each backend runs in a fresh subprocess so its resident memory is measured in
+isolation. Reports load time, embeddings/sec over a synthetic filing-like corpus,
+peak RSS, and how far each backend's vectors drift from torch's (max abs diff
+and min cosine similarity).
+
+    python -m benchmarks.bench_embeddings --texts 2000 --backends torch onnx onnx-int8
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+SENTENCES = [
+    "The Company faces intense competition in all of its markets.",
+    "Revenue increased primarily due to higher sales of services and wearables.",
+    "Supply chain disruptions could adversely affect our results of operations.",
+    "We are subject to legal proceedings and claims in the ordinary course of business.",
+    "Gross margin percentage decreased due to unfavorable foreign exchange rates.",
+]
+
+def corpus(n: int) -> list:
+    return [f"{SENTENCES[i % len(SENTENCES)]} (section {i})" for i in range(n)]
+
+def run_backend(backend: str, n_texts: int, batch_size: int) -> dict:
+    """Runs inside the child process."""
+    from src.data_engine.embeddings import build_embedding_model
+    texts = corpus(n_texts)
+
+    started = time.perf_counter()
+    model = build_embedding_model(backend=backend, batch_size=batch_size)
+    model.embed_documents(texts[:8])      # warm-up (graph/session init)
+    load_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectors = model.embed_documents(texts)
+    embed_s = time.perf_counter() - started
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = rss_kb / 1024 if sys.platform != "darwin" else rss_kb / 1024 / 1024
+    return {
+        "backend": backend,
+        "texts": n_texts,
+        "load_s": round(load_s, 2),
+        "embeddings_per_sec": round(n_texts / embed_s, 1),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "vectors": vectors[:64],
+    }
+
+def _compare(reference: list, other: list) -> dict:
+    import numpy as np
+    a, b = np.asarray(reference), np.asarray(other)
+    cos = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {"max_abs_diff": float(np.abs(a - b).max()), "min_cosine": float(cos.min())}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.texts, args.batch_size)))
+        return
+
+    results = []
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_embeddings", "--child", backend,
+             "--texts", str(args.texts), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            results.append({"backend": backend, "error": proc.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    reference = next((r for r in results if r.get("backend") == "torch" and "vectors" in r), None)
+    print(f"\n{'Backend':<12}{'Load s':>8}{'Emb/s':>10}{'Peak MB':>10}{'Max diff':>10}{'Min cos':>9}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<12}  failed: {r['error']}")
+            continue
+        drift = _compare(reference["vectors"], r["vectors"]) if reference else {}
+        r.update(drift)
+        print(f"{r['backend']:<12}{r['load_s']:>8}{r['embeddings_per_sec']:>10}{r['peak_rss_mb']:>10}"
+              f"{drift.get('max_abs_diff', float('nan')):>10.4f}{drift.get('min_cosine', float('nan')):>9.4f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([{k: v for k, v in r.items() if k != "vectors"} for r in results], f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_import_time.py
+"""
+Cold-start import budget for the long-running entry points.
+
+Each module is imported in fresh interpreters under `python -X importtime`; the
+median cumulative time of the top-level import is checked against its budget,
+and the full import list against modules that entry point must never load
+(Streamlit in the API, LLM/vector stacks in the ingestor, ...). Exits non-zero
+on any regression, so it can gate CI.
+
+    python -m benchmarks.bench_import_time [--runs 5] [--scale 1.5] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Budgets in seconds, measured on a laptop-class CPU with ~1.3x headroom
+BUDGETS = {
+    "src.api.main": 1.7,
+    "src.data_engine.ingestor_quant": 1.6,
+}
+
+_HEAVY = ["streamlit", "langchain", "langchain_core", "langchain_groq", "langchain_community",
+          "langgraph", "chromadb", "torch", "sentence_transformers"]
+FORBIDDEN = {
+    "src.api.main": _HEAVY + ["yfinance", "newsapi", "xgboost"],
+    "src.data_engine.ingestor_quant": _HEAVY + ["fastapi", "xgboost"],
+}
+
+def measure(module: str) -> dict:
+    """One cold import: {"seconds": cumulative time of `module`, "modules": set of everything loaded}."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    seconds, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name == "imported package":
+            continue
+        loaded.add(name)
+        if name == module:
+            seconds = int(cumulative) / 1e6
+    return {"seconds": seconds, "modules": loaded}
+
+def check(module: str, runs: int = 5, scale: float = 1.0) -> dict:
+    samples = [measure(module) for _ in range(runs)]
+    median = statistics.median(s["seconds"] for s in samples)
+    loaded = set().union(*(s["modules"] for s in samples))
+    leaked = sorted(m for m in FORBIDDEN.get(module, []) if m in loaded)
+    budget = BUDGETS[module] * scale
+    return {
+        "module": module,
+        "median_s": round(median, 3),
+        "budget_s": round(budget, 3),
+        "forbidden_loaded": leaked,
+        "ok": median <= budget and not leaked,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if entry-point import time regresses.")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply budgets (slow CI machines)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = [check(m, args.runs, args.scale) for m in args.modules]
+    print(f"{'Module':<34}{'Median s':>10}{'Budget s':>10}  Status")
+    for r in results:
+        status = "ok" if r["ok"] else "FAIL" + (f" (loads {', '.join(r['forbidden_loaded'])})" if r["forbidden_loaded"] else "")
+        print(f"{r['module']:<34}{r['median_s']:>10}{r['budget_s']:>10}  {status}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark suite for the hot paths, on synthetic data.
+
+Runs against a throwaway database / cache / model directory (never data/) and
+the offline fake LLM. Per-ticker cases scale with --years; universe cases with
+--tickers x --years. Results go to JSON (with git commit and environment
+metadata); pass --compare to diff against an earlier run.
+
+    python -m benchmarks.run_benchmarks --tickers 1 100 1000 --years 1 5 20 --output bench.json
+    python -m benchmarks.run_benchmarks --quick --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+def _isolate():
+    # Must run before anything imports src.config. Assigned unconditionally: an exported
+    # FINSIGHT_DB_PATH / FINSIGHT_MODEL_DIR must never receive synthetic tickers or models.
+    if "src.config" in sys.modules:
+        raise RuntimeError("benchmarks must isolate their paths before src is imported")
+    tmp = tempfile.mkdtemp(prefix="finsight_bench_")
+    os.environ["FINSIGHT_DB_PATH"] = os.path.join(tmp, "bench.db")
+    os.environ["FINSIGHT_FEATURE_CACHE_DIR"] = os.path.join(tmp, "features")
+    os.environ["FINSIGHT_MODEL_DIR"] = os.path.join(tmp, "models")
+    os.environ["FINSIGHT_LLM_BACKEND"] = "fake"
+    return tmp
+
+def timed(fn, repeats: int) -> dict:
+    """Calls fn() `repeats` times; the first call is reported separately (cold caches)."""
+    samples = []
+    for _ in range(max(repeats, 1)):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {
+        "first_s": round(samples[0], 6),
+        "median_s": round(statistics.median(samples), 6),
+        "min_s": round(min(samples), 6),
+        "repeats": len(samples),
+    }
+
+# --- Cases ---
+
+def bench_indicators(years, repeats):
+    from benchmarks.synthetic import make_ohlcv
+    from src.ml_engine.features import add_technical_indicators
+    df = make_ohlcv("SYN0000", years)
+    return timed(lambda: add_technical_indicators(df), repeats), {"rows": len(df)}
+
+def bench_panel_indicators(n, years, repeats):
+    from benchmarks.synthetic import make_universe
+    from src.ml_engine.panel import build_panel, compute_panel_indicators
+    panel = build_panel(make_universe(n, years))
+    stats = timed(lambda: compute_panel_indicators(panel["High"], panel["Low"], panel["Close"]), repeats)
+    return stats, {"cells": int(panel["Close"].size)}
+
+def bench_backtest(years, repeats):
+    from benchmarks.synthetic import make_ohlcv
+    from src.ml_engine.features import add_technical_indicators
+    from src.ml_engine.backtest import run_backtest
+    df = add_technical_indicators(make_ohlcv("SYN0000", years))
+    return timed(lambda: run_backtest(df), repeats), {"rows": len(df)}
+
+def bench_sweep(years, repeats):
+    from benchmarks.synthetic import make_ohlcv
+    from src.ml_engine.sweep import sweep_backtest
+    df = make_ohlcv("SYN0000", max(years, 1))
+    grid = dict(fast_windows=range(5, 105, 5), slow_windows=range(50, 205, 5), rules=["long_cash", "long_short"])
+    stats = timed(lambda: sweep_backtest(df, **grid), repeats)
+    return stats, {"combos": len(sweep_backtest(df, **grid))}
+
+def bench_portfolio(n, years, repeats):
+    from benchmarks.synthetic import make_universe, wide_close
+    from src.ml_engine.portfolio import portfolio_backtest, golden_cross_signals
+    close = wide_close(make_universe(n, years))
+    signals = golden_cross_signals(close)
+    return timed(lambda: portfolio_backtest(close, signals, weighting="vol", rebalance="W"), repeats), {"cells": int(close.size)}
+
+def bench_db(n, years, repeats):
+    from benchmarks.synthetic import make_universe
+    from src.data_engine.database import save_stock_data, get_stock_data, get_stock_data_bulk
+    universe = make_universe(n, years, prefix=f"DB{years}Y")
+    rows = sum(len(df) for df in universe.values())
+
+    def write():
+        for t, df in universe.items():
+            save_stock_data(t, df)
+
+    # stdout from save_stock_data is noise here
+    with open(os.devnull, "w") as devnull:
+        real, sys.stdout = sys.stdout, devnull
+        try:
+            write_stats = timed(write, repeats)          # first = inserts, rest = upserts of the same bars
+        finally:
+            sys.stdout = real
+    first = next(iter(universe))
+    read_stats = timed(lambda: get_stock_data(first), repeats)
+    bulk_stats = timed(lambda: get_stock_data_bulk(list(universe)), repeats)
+    return {"save_stock_data": write_stats, "get_stock_data": read_stats, "get_stock_data_bulk": bulk_stats}, {"rows": rows}
+
+def _ensure_model():
+    from xgboost import XGBRegressor
+    from benchmarks.synthetic import make_ohlcv
+    from src.ml_engine.features import add_technical_indicators, MODEL_FEATURES
+    from src.ml_engine.model_registry import save_model_artifact, get_model_registry
+    df = add_technical_indicators(make_ohlcv("TRAIN", 5))
+    model = XGBRegressor(n_estimators=50, max_depth=4)
+    model.fit(df[MODEL_FEATURES].iloc[:-1], df["Close"].shift(-1).iloc[:-1])
+    save_model_artifact(model, MODEL_FEATURES)
+    get_model_registry().clear()
+
+def bench_inference(n, years, repeats):
+    from benchmarks.synthetic import make_universe
+    from src.data_engine.database import save_stock_data
+    from src.ml_engine.forecasting import get_technical_analysis, analyze_batch
+    universe = make_universe(n, max(years, 1), prefix=f"INF{years}Y")
+    with open(os.devnull, "w") as devnull:
+        real, sys.stdout = sys.stdout, devnull
+        try:
+            for t, df in universe.items():
+                save_stock_data(t, df)
+            first = next(iter(universe))
+            single = timed(lambda: get_technical_analysis(first), repeats)
+            batch = timed(lambda: analyze_batch(list(universe)), repeats)
+        finally:
+            sys.stdout = real
+    return {"get_technical_analysis": single, "analyze_batch": batch}, {"tickers": n}
+
+def bench_graph(years, repeats):
+    from benchmarks.synthetic import make_ohlcv
+    from src.data_engine.database import save_stock_data
+    from src.agents import graph
+    # Network-bound nodes are stubbed; quant runs for real against the bench DB, report on the fake LLM
+    originals = graph.get_fundamental_analysis, graph.get_market_sentiment
+    graph.get_fundamental_analysis = lambda ticker: {"relevant_text": "Synthetic 10-K risk factors.", "matches": []}
+    graph.get_market_sentiment = lambda ticker: {"score": 0.1, "label": "Neutral", "top_headlines": []}
+    with open(os.devnull, "w") as devnull:
+        real, sys.stdout = sys.stdout, devnull
+        try:
+            save_stock_data("GRAPH", make_ohlcv("GRAPH", max(years, 1)))
+            app = graph.build_graph()
+            # first_s includes the fake LLM call; later repeats hit the report cache
+            stats = timed(lambda: app.invoke(graph.initial_state("GRAPH")), repeats)
+        finally:
+            sys.stdout = real
+            graph.get_fundamental_analysis, graph.get_market_sentiment = originals
+    return stats, {}
+
+PER_TICKER = {"add_technical_indicators": bench_indicators, "run_backtest": bench_backtest,
+              "sweep_backtest": bench_sweep, "graph_invoke": bench_graph}
+UNIVERSE = {"panel_indicators": bench_panel_indicators, "portfolio_backtest": bench_portfolio,
+            "database": bench_db, "inference": bench_inference}
+
+def run_suite(tickers=(1, 50), years=(1, 5), repeats=3, only=None, verbose=True) -> list:
+    _ensure_model()
+    results = []
+
+    def record(name, params, stats, extra):
+        # Cases timing several functions return {function: stats}
+        groups = stats if "median_s" not in stats else {name: stats}
+        for fn_name, s in groups.items():
+            results.append({"name": fn_name, "case": name,
+                            "params": params, **s, **extra})
+            if verbose:
+                print(f"{fn_name:<28}{json.dumps(params):<30}{s['median_s']:>12.6f}s")
+
+    for y in years:
+        for name, case in PER_TICKER.items():
+            if not only or name in only:
+                stats, extra = case(y, repeats)
+                record(name, {"years": y}, stats, extra)
+    for n in tickers:
+        for y in years:
+            for name, case in UNIVERSE.items():
+                if not only or name in only:
+                    stats, extra = case(n, y, repeats)
+                    record(name, {"tickers": n, "years": y}, stats, extra)
+    return results
+
+def _metadata(args) -> dict:
+    import numpy, pandas
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "args": vars(args),
+    }
+
+def compare(old: dict, new: dict):
+    """Prints median-time ratios (new / old) for matching benchmark + params."""
+    key = lambda r: (r["name"], json.dumps(r["params"], sort_keys=True))
+    before = {key(r): r for r in old["results"]}
+    print(f"\nvs {old['meta'].get('commit')}:")
+    for r in new["results"]:
+        prev = before.get(key(r))
+        if prev and prev["median_s"]:
+            ratio = r["median_s"] / prev["median_s"]
+            flag = "  ⚠️ slower" if ratio > 1.2 else "  ✅ faster" if ratio < 0.8 else ""
+            print(f"{r['name']:<28}{json.dumps(r['params']):<30}{ratio:>8.2f}x{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="FinSight hot-path benchmarks on synthetic OHLCV data.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 50], help="Universe sizes (1-5000)")
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 5], help="History lengths (1-20)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help=f"Subset of {list(PER_TICKER) + list(UNIVERSE)}")
+    parser.add_argument("--quick", action="store_true", help="Smallest grid (1 and 10 tickers, 1 year)")
+    parser.add_argument("--output", default=None, help="JSON path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+    if args.quick:
+        args.tickers, args.years = [1, 10], [1]
+
+    _isolate()
+    report = {"meta": _metadata(args)}
+    report["results"] = run_suite(args.tickers, args.years, args.repeats, args.only)
+
+    output = args.output or os.path.join("benchmarks", "results", f"{report['meta']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic OHLCV data for benchmarks and tests.
+
+Each ticker's series is a geometric random walk seeded by (seed, crc32(ticker)),
+so the same ticker always gets the same bars regardless of universe size or
+generation order. Bars are business days in the yfinance layout (Date index,
+Open/High/Low/Close/Volume) with High >= max(Open, Close) and Low <= min(Open, Close).
+"""
+import zlib
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+def ticker_names(n: int, prefix: str = "SYN") -> list:
+    return [f"{prefix}{i:04d}" for i in range(n)]
+
+def make_ohlcv(ticker: str, years: float = 5, start: str = "2005-01-03", seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+    n = max(int(round(years * TRADING_DAYS)), 1)
+    drift, vol = rng.uniform(-0.0002, 0.0006), rng.uniform(0.01, 0.03)
+
+    close = rng.uniform(10, 500) * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    open_ = np.r_[close[0], close[:-1]] * np.exp(rng.normal(0, vol / 3, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    volume = np.round(rng.lognormal(14, 0.5, n))
+
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=pd.bdate_range(start, periods=n, name="Date")
+    )
+
+def make_universe(n_tickers: int, years: float = 5, seed: int = 0, prefix: str = "SYN") -> dict:
+    """{ticker: OHLCV frame} for n_tickers synthetic tickers sharing one calendar."""
+    return {t: make_ohlcv(t, years, seed=seed) for t in ticker_names(n_tickers, prefix)}
+
+def wide_close(universe: dict) -> pd.DataFrame:
+    """Dates x tickers Close prices (the portfolio backtest input)."""
+    return pd.DataFrame({t: df["Close"] for t, df in universe.items()})
@@ -0,0 +1,43 @@
+# src/agents/fake_llm.py
+"""
+Offline stand-in for the report LLM (FINSIGHT_LLM_BACKEND=fake).
+
+Deterministic: the memo is built from the prompt's DATA lines, and streaming
+yields it word by word (optionally slowed by FINSIGHT_LLM_FAKE_DELAY per token),
+so the cache and streaming paths can be exercised without network or API keys.
+"""
+import re
+import time
+from typing import Any, Iterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+class FakeReportModel(BaseChatModel):
+    delay: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "finsight-fake"
+
+    def _memo(self, messages: List[BaseMessage]) -> str:
+        prompt = messages[-1].content
+        ticker = re.search(r"Analyze (\S+?)\.", prompt)
+        data = [line.strip() for line in prompt.splitlines() if re.match(r"\s*\d\.", line)]
+        lines = [f"## {ticker.group(1) if ticker else 'Ticker'} - Offline Memo", "", "**Executive Summary**"]
+        lines += [f"- {line}" for line in data] or ["- No data supplied."]
+        return "\n".join(lines)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._memo(messages)))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self.calls += 1
+        for token in re.findall(r"\S+\s*|\s+", self._memo(messages)):
+            if self.delay:
+                time.sleep(self.delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
@@ -1,10 +1,73 @@
-from langgraph.graph import StateGraph, END
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as NodeTimeout
 from src.agents.state import AgentState
+from src.agents.llm import build_report_prompt, generate_report
 from src.ml_engine.forecasting import get_technical_analysis
 from src.data_engine.vectorizer import get_fundamental_analysis
 from src.data_engine.sentiment import get_market_sentiment
+from src.config import logger, NODE_TIMEOUTS, NODE_POOL_SIZE
+from src.metrics import observe
+
+# Nodes run here so a stuck call can be abandoned after its timeout (the thread
+# finishes in the background; the graph moves on with a fallback). One bounded pool
+# per node type: abandoned calls only ever occupy their own node's workers.
+_node_pools = {
+    name: ThreadPoolExecutor(max_workers=NODE_POOL_SIZE, thread_name_prefix=f"finsight-{name}")
+    for name in ("quant", "rag", "sentiment", "report")
+}
+
+# What each node returns when it times out or raises, in the shape downstream code expects
+FALLBACKS = {
+    "quant": lambda reason: {"quant_data": {"error": f"Technical analysis unavailable ({reason}).",
+                                            "metrics": {}, "signals": [], "chart_data": {}}},
+    "rag": lambda reason: {"rag_data": {"relevant_text": f"Fundamental data unavailable ({reason}).",
+                                        "matches": []}},
+    "sentiment": lambda reason: {"sentiment_data": {"score": 0, "label": f"Neutral ({reason})",
+                                                    "top_headlines": []}},
+    "report": lambda reason: {"final_report": f"⚠️ Report generation failed ({reason})."},
+}
+
+class NodeBusy(Exception):
+    """The node's pool had no free worker within its timeout."""
+
+def guarded(name: str, fn):
+    """
+    Wraps a node with its timeout from NODE_TIMEOUTS and a degraded-result fallback,
+    and records how long it took (and how it ended) under state['node_timings'].
+    The timeout clock starts when the node starts running; if its pool is saturated
+    by abandoned calls for a whole timeout it never starts and ends as "busy".
+    """
+    def node(state: AgentState):
+        started = time.perf_counter()
+        running = threading.Event()
+
+        def run():
+            running.set()
+            return fn(state)
+
+        # copy_context: stages inside the node still land in the caller's request trace
+        future = _node_pools[name].submit(contextvars.copy_context().run, run)
+        try:
+            if not running.wait(timeout=NODE_TIMEOUTS[name]) and future.cancel():
+                raise NodeBusy()
+            update, status = future.result(timeout=NODE_TIMEOUTS[name]), "ok"
+        except NodeBusy:
+            logger.warning(f"{name} node found no free worker within {NODE_TIMEOUTS[name]}s for {state['ticker']}")
+            update, status = FALLBACKS[name]("busy"), "busy"
+        except NodeTimeout:
+            logger.warning(f"{name} node timed out after {NODE_TIMEOUTS[name]}s for {state['ticker']}")
+            update, status = FALLBACKS[name]("timed out"), "timeout"
+        except Exception as e:
+            logger.warning(f"{name} node failed for {state['ticker']}: {e}")
+            update, status = FALLBACKS[name]("error"), "error"
+        elapsed = time.perf_counter() - started
+        observe(f"graph.{name}", elapsed, error=status != "ok")
+        timing = {"seconds": round(elapsed, 3), "status": status}
+        return {**update, "node_timings": {name: timing}}
+    node.__name__ = f"{name}_node"
+    return node
 
 def quant_node(state: AgentState):
     return {"quant_data": get_technical_analysis(state['ticker'])}
@@ -16,41 +79,55 @@ def sentiment_node(state: AgentState):
     return {"sentiment_data": get_market_sentiment(state['ticker'])}
 
 def report_node(state: AgentState):
-    quant = state.get('quant_data', {})
-    rag = state.get('rag_data', {})
-    sent = state.get('sentiment_data', {})
-    
-    # Format data for LLM
-    metrics = quant.get('metrics', {})
-    quant_text = f"Price: ${metrics.get('current_price',0)}, RSI: {metrics.get('rsi',0)}, Signals: {quant.get('signals',[])}"
-    
-    llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
-    prompt = f"""
-    Act as a Senior Analyst. Analyze {state['ticker']}.
-    
-    DATA:
-    1. Technicals: {quant_text}
-    2. Sentiment: Score {sent.get('score',0)} ({sent.get('label','Neutral')})
-    3. Fundamentals: {rag.get('relevant_text','')}
-    
-    Write a Markdown report. 
-    Executive Summary MUST be bullet points. 
-    Highlight any divergence between Price and Sentiment.
-    """
-    
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return {"final_report": response.content}
+    # Cached by prompt hash: identical inputs never reach the LLM twice
+    prompt = build_report_prompt(state['ticker'], state.get('quant_data', {}),
+                                 state.get('sentiment_data', {}), state.get('rag_data', {}))
+    return {"final_report": generate_report(prompt)}
+
+def initial_state(ticker: str) -> AgentState:
+    return {
+        "ticker": ticker,
+        "user_query": "Analyze",
+        "quant_data": {},
+        "rag_data": {},
+        "sentiment_data": {},
+        "final_report": "",
+        "node_timings": {}
+    }
 
-def build_graph():
+def build_graph(with_report: bool = True):
+    """
+    The analysis graph. with_report=False stops after the data agents, for callers
+    that stream the memo themselves (see llm.stream_report).
+    """
+    from langgraph.graph import StateGraph, START, END
     workflow = StateGraph(AgentState)
-    workflow.add_node("quant", quant_node)
-    workflow.add_node("rag", rag_node)
-    workflow.add_node("sentiment", sentiment_node)
-    workflow.add_node("report", report_node)
+    workflow.add_node("quant", guarded("quant", quant_node))
+    workflow.add_node("rag", guarded("rag", rag_node))
+    workflow.add_node("sentiment", guarded("sentiment", sentiment_node))
     
-    workflow.set_entry_point("quant")
-    workflow.add_edge("quant", "rag")
-    workflow.add_edge("rag", "sentiment")
-    workflow.add_edge("sentiment", "report")
-    workflow.add_edge("report", END)
-    return workflow.compile()
\ No newline at end of file
+    # Fan out: the three data agents are independent I/O, so they run in parallel
+    # and the report waits for all of them (latency = slowest, not the sum)
+    for data_node in ("quant", "rag", "sentiment"):
+        workflow.add_edge(START, data_node)
+    if with_report:
+        workflow.add_node("report", guarded("report", report_node))
+        workflow.add_edge(["quant", "rag", "sentiment"], "report")
+        workflow.add_edge("report", END)
+    else:
+        workflow.add_edge(["quant", "rag", "sentiment"], END)
+    return workflow.compile()
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+def get_graph(with_report: bool = True):
+    """build_graph() compiled once per process (compiled graphs are safe to share across calls)."""
+    with _compiled_lock:
+        if with_report not in _compiled:
+            _compiled[with_report] = build_graph(with_report)
+        return _compiled[with_report]
+
+def gather_context(ticker: str) -> AgentState:
+    """Runs only the data agents and returns their state (input for the report prompt)."""
+    return get_graph(with_report=False).invoke(initial_state(ticker))
\ No newline at end of file
@@ -0,0 +1,91 @@
+# src/agents/llm.py
+"""
+Report generation for the Manager agent: one shared chat client per process and
+a persistent cache of finished memos.
+
+The cache key is a SHA-256 of the backend, model and the fully rendered prompt
+(which embeds the quant, sentiment and RAG inputs), stored in the report_cache
+table, so the same inputs never cost a second LLM call, across processes and
+restarts. stream_report() yields text as it arrives and caches the memo once
+the stream completes. LangChain / Groq are imported on first use.
+"""
+import hashlib
+import threading
+from src.config import logger, LLM_BACKEND, LLM_MODEL, LLM_FAKE_DELAY
+from src.data_engine.database import get_cached_report, save_cached_report
+from src.metrics import stage, cache_lookup
+
+_models = {}
+_lock = threading.Lock()
+
+def get_chat_model(backend: str = None, model: str = None):
+    """Shared chat client for (backend, model); built once per process."""
+    backend, model = backend or LLM_BACKEND, model or LLM_MODEL
+    with _lock:
+        if (backend, model) not in _models:
+            if backend == "groq":
+                from langchain_groq import ChatGroq
+                _models[(backend, model)] = ChatGroq(model=model, temperature=0)
+            elif backend == "fake":
+                from src.agents.fake_llm import FakeReportModel
+                _models[(backend, model)] = FakeReportModel(delay=LLM_FAKE_DELAY)
+            else:
+                raise ValueError(f"Unknown LLM backend {backend!r}; use 'groq' or 'fake'")
+        return _models[(backend, model)]
+
+def build_report_prompt(ticker: str, quant: dict, sent: dict, rag: dict) -> str:
+    # Format data for LLM
+    metrics = quant.get('metrics', {})
+    quant_text = f"Price: ${metrics.get('current_price',0)}, RSI: {metrics.get('rsi',0)}, Signals: {quant.get('signals',[])}"
+    
+    return f"""
+    Act as a Senior Analyst. Analyze {ticker}.
+    
+    DATA:
+    1. Technicals: {quant_text}
+    2. Sentiment: Score {sent.get('score',0)} ({sent.get('label','Neutral')})
+    3. Fundamentals: {rag.get('relevant_text','')}
+    
+    Write a Markdown report. 
+    Executive Summary MUST be bullet points. 
+    Highlight any divergence between Price and Sentiment.
+    """
+
+def report_cache_key(prompt: str, backend: str = None, model: str = None) -> str:
+    identity = f"{backend or LLM_BACKEND}|{model or LLM_MODEL}|{prompt}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+def generate_report(prompt: str) -> str:
+    """The memo for this prompt: from the cache, else one blocking LLM call (then cached)."""
+    key = report_cache_key(prompt)
+    cached = get_cached_report(key)
+    cache_lookup("reports", cached is not None)
+    if cached is not None:
+        return cached
+
+    from langchain_core.messages import HumanMessage
+    with stage("llm.generate"):
+        report = get_chat_model().invoke([HumanMessage(content=prompt)]).content
+    save_cached_report(key, f"{LLM_BACKEND}:{LLM_MODEL}", report)
+    return report
+
+def stream_report(prompt: str):
+    """
+    Yields the memo in pieces as the LLM produces them (a cached memo comes back as
+    one piece). Only a stream that runs to completion is cached.
+    """
+    key = report_cache_key(prompt)
+    cached = get_cached_report(key)
+    cache_lookup("reports", cached is not None)
+    if cached is not None:
+        yield cached
+        return
+
+    from langchain_core.messages import HumanMessage
+    parts = []
+    for chunk in get_chat_model().stream([HumanMessage(content=prompt)]):
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+    save_cached_report(key, f"{LLM_BACKEND}:{LLM_MODEL}", "".join(parts))
+    logger.info(f"Cached streamed report {key[:12]}")
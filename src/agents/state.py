@@ -1,4 +1,8 @@
-from typing import TypedDict, Dict, Any
+from typing import TypedDict, Dict, Any, Annotated
+
+def merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer so parallel nodes can each add their own key to a shared dict."""
+    return {**(left or {}), **(right or {})}
 
 class AgentState(TypedDict):
     ticker: str
@@ -6,4 +10,5 @@ class AgentState(TypedDict):
     quant_data: Dict[str, Any]      # Role A
     rag_data: Dict[str, Any]        # Role B
     sentiment_data: Dict[str, Any]  # Role D
-    final_report: str               # Role C
\ No newline at end of file
+    final_report: str               # Role C
+    node_timings: Annotated[Dict[str, Any], merge_dicts]  # {node: {"seconds", "status"}}
@@ -0,0 +1,73 @@
+# src/api/cache.py
+"""
+In-memory response cache for the API's per-ticker GET endpoints.
+
+Keys are tuples describing everything the payload depends on, e.g.
+("analyze", "NVDA", <stored-bars fingerprint>, <model version>), so ingesting a
+new bar, revising the last one or reloading a model moves a ticker to a new key
+on its own; TTL and the LRU bound only clean up what is left behind. The ETag is
+a digest of the key, which lets a conditional request be answered with 304
+before any work is done.
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from src.metrics import cache_lookup
+
+def make_etag(key: tuple) -> str:
+    return '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+class ResponseCache:
+    """Thread-safe TTL + LRU map from key tuples to JSON-able payloads."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()    # key -> (expires_at, payload)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                self._data.pop(key, None)
+                self.misses += 1
+                cache_lookup("responses", False)
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            cache_lookup("responses", True)
+            return entry[1]
+
+    def set(self, key, payload):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._data),
+        }
@@ -0,0 +1,89 @@
+# src/api/concurrency.py
+"""
+Keeps blocking work (yfinance, SQLite, NewsAPI, model inference) off the event loop.
+
+WorkGate runs each job on a bounded thread pool and coalesces identical concurrent
+requests ("single flight"): if 50 clients ask for /analyze/NVDA at once, one
+computation runs and all 50 get its result. Distinct jobs beyond max_in_flight are
+refused with Overloaded so the API can answer 503 + Retry-After instead of queueing
+without bound.
+"""
+import asyncio
+import itertools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+class Overloaded(Exception):
+    """Raised when the gate is at capacity; carries the suggested retry delay (seconds)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server busy, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class WorkGate:
+    def __init__(self, max_workers: int, max_in_flight: int, retry_after: int = 2):
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.max_workers = max_workers
+        self._pool = None        # created on first use, so the gate survives shutdown() (app restarts)
+        self._inflight = {}     # key -> asyncio.Future | None (only touched from the event loop)
+        self._reservations = itertools.count()
+        self.coalesced = 0
+
+    @property
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="finsight-api")
+        return self._pool
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) in the pool, sharing the result with concurrent callers of `key`."""
+        existing = self._inflight.get(key)
+        if existing is not None:
+            self.coalesced += 1
+            return await asyncio.shield(existing)
+
+        if len(self._inflight) >= self.max_in_flight:
+            raise Overloaded(self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        # The job runs in the first caller's context (its request trace); coalesced callers share it
+        ctx = contextvars.copy_context()
+        future = loop.run_in_executor(self._executor, partial(ctx.run, fn, *args, **kwargs))
+        self._inflight[key] = future
+
+        def _release(done):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+        future.add_done_callback(_release)
+
+        # shield: a client disconnecting must not cancel work other waiters depend on
+        return await asyncio.shield(future)
+
+    def reserve(self):
+        """
+        Claims one in-flight slot for work that doesn't go through run(), e.g. a
+        streamed response. Raises Overloaded when full; returns the release callable.
+        """
+        if len(self._inflight) >= self.max_in_flight:
+            raise Overloaded(self.retry_after)
+        key = ("reserved", next(self._reservations))
+        self._inflight[key] = None
+        return lambda: self._inflight.pop(key, None)
+
+    async def offload(self, fn, *args, **kwargs):
+        """Runs a cheap blocking call (e.g. a cache-key lookup) in the pool, outside the in-flight limit."""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(ctx.run, fn, *args, **kwargs))
+
+    def shutdown(self):
+        """Stops the pool; the next job starts a fresh one (e.g. a second app lifespan in one process)."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,21 +1,119 @@
 # src/api/main.py
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from src.ml_engine.forecasting import get_technical_analysis
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Literal
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from src.ml_engine.forecasting import get_technical_analysis, analyze_batch
+from src.ml_engine.backtest import backtest_ticker
+from src.ml_engine.chart_payload import compact_payload
 from src.data_engine.sentiment import get_market_sentiment
+from src.ml_engine.feature_store import get_feature_store
+from src.ml_engine.model_registry import get_model_registry
+from src.data_engine.database import get_price_version
+from src.agents.graph import gather_context, get_graph, initial_state
+from src.agents.llm import build_report_prompt, stream_report
+from src.api.concurrency import WorkGate, Overloaded
+from src.api.cache import ResponseCache, make_etag, etag_matches
+from src.metrics import histogram, render_prometheus, start_trace
+from src.config import (logger, API_MAX_WORKERS, API_MAX_IN_FLIGHT, API_RETRY_AFTER,
+                        API_CACHE_TTL, API_CACHE_MAX_ENTRIES, TRACE_REQUESTS)
+
+# Blocking work goes through the gate: bounded threads + single-flight per (endpoint, ticker)
+gate = WorkGate(max_workers=API_MAX_WORKERS, max_in_flight=API_MAX_IN_FLIGHT, retry_after=API_RETRY_AFTER)
+response_cache = ResponseCache(max_entries=API_CACHE_MAX_ENTRIES, ttl=API_CACHE_TTL)
+HTTP_SECONDS = histogram("finsight_http_request_seconds", "API request latency", ("method", "route", "status"))
+
+def _cache_key(endpoint: str, ticker: str) -> tuple:
+    """Everything the endpoint's payload depends on (runs in the pool: touches the DB)."""
+    version = get_price_version(ticker)
+    key = (endpoint, ticker, version)
+    if endpoint == "analyze":
+        artifact = get_model_registry().get(ticker)
+        key += (artifact.version if artifact else None,)
+    if endpoint == "sentiment" or version is None:
+        # News and live Yahoo data move without new bars: roll the key every TTL window
+        key += (int(time.time() // API_CACHE_TTL),)
+    return key
+
+async def _cached(endpoint: str, ticker: str, request: Request, response: Response, fn, fmt: str = "json"):
+    """
+    Serves from the response cache (or 304) when possible, else computes via the gate.
+    fmt="compact" caches and returns the compact-encoded chart payload.
+    """
+    key = await gate.offload(_cache_key, endpoint, ticker) + (fmt,)
+    etag = make_etag(key)
+    headers = {"ETag": etag, "Cache-Control": f"max-age={API_CACHE_TTL}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    data = response_cache.get(key)
+    if data is None:
+        data = await gate.run((endpoint, ticker), fn, ticker)
+        if "error" in data or data.get("label") == "Error":
+            return data     # failures are never cached
+        if fmt == "compact":
+            data = compact_payload(data)
+        response_cache.set(key, data)
+    response.headers.update(headers)
+    return data
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models once at startup so the first request doesn't pay for joblib.load
+    loaded = get_model_registry().warm_up()
+    logger.info(f"Model registry warmed up: {loaded}")
+    yield
+    gate.shutdown()
 
 # 1. Initialize App
 app = FastAPI(
     title="FinSight AI API",
     description="Algorithmic Trading Analysis as a Service",
-    version="2.0"
+    version="2.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """
+    Collects the stages each request runs into a Server-Timing header
+    (logged as well when FINSIGHT_TRACE_REQUESTS=1).
+    """
+    trace = start_trace()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - trace.started
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    HTTP_SECONDS.observe(elapsed, method=request.method, route=route, status=response.status_code)
+    response.headers["Server-Timing"] = trace.server_timing(elapsed)
+    if TRACE_REQUESTS:
+        logger.info(f"{request.method} {request.url.path} {response.status_code} "
+                    f"{elapsed * 1000:.1f}ms {trace.summary()}")
+    return response
+
 # 2. Define Request/Response Models (Validation)
 class AnalysisRequest(BaseModel):
     ticker: str
     period: str = "1y"
 
+class BatchAnalysisRequest(BaseModel):
+    tickers: list[str] = Field(..., min_length=1, max_length=1000)
+    period: str = "1y"
+    format: Literal["json", "compact"] = "json"
+
+# ?format=compact: chart series as base64 float32 columns + epoch-day dates (see chart_payload.py)
+FormatParam = Query("json", alias="format", pattern="^(json|compact)$")
+
 # 3. Define Endpoints
 @app.get("/")
 def health_check():
@@ -23,25 +121,134 @@ def health_check():
     return {"status": "online", "system": "FinSight AI"}
 
 @app.get("/analyze/{ticker}")
-def analyze_stock(ticker: str):
+async def analyze_stock(ticker: str, request: Request, response: Response, fmt: str = FormatParam):
     """
     Returns full technical analysis (Signals, RSI, MACD).
     """
     ticker = ticker.upper()
-    data = get_technical_analysis(ticker)
+    data = await _cached("analyze", ticker, request, response, get_technical_analysis, fmt)
     
-    if "error" in data:
+    if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=404, detail=data["error"])
     
     return data
 
+@app.post("/analyze/batch")
+async def analyze_stocks_batch(request: BatchAnalysisRequest):
+    """
+    Technical analysis for many tickers in one call (bulk DB read, one batched
+    model prediction). Returns {"results": {ticker: analysis}, "errors": {ticker: reason}}.
+    """
+    key = ("batch", tuple(sorted({t.upper() for t in request.tickers})), request.period)
+    data = await gate.run(key, analyze_batch, request.tickers, period=request.period)
+    return compact_payload(data) if request.format == "compact" else data
+
+@app.get("/backtest/{ticker}")
+async def backtest_stock(ticker: str, request: Request, response: Response, fmt: str = FormatParam):
+    """
+    Golden-cross backtest on the stored history: returns, and the strategy vs
+    buy-and-hold equity curves (downsampled to FINSIGHT_CHART_MAX_POINTS).
+    """
+    ticker = ticker.upper()
+    data = await _cached("backtest", ticker, request, response, backtest_ticker, fmt)
+
+    if isinstance(data, dict) and "error" in data:
+        raise HTTPException(status_code=404, detail=data["error"])
+
+    return data
+
 @app.get("/sentiment/{ticker}")
-def analyze_sentiment(ticker: str):
+async def analyze_sentiment(ticker: str, request: Request, response: Response):
     """
     Returns AI Sentiment Score from News.
     """
     ticker = ticker.upper()
-    return get_market_sentiment(ticker)
+    return await _cached("sentiment", ticker, request, response, get_market_sentiment)
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _graph_events(ticker: str, release):
+    """
+    Runs the full agent graph, yielding one SSE message per finished node. Each step
+    of the graph runs on the gate's pool; the stream's gate slot is freed at the end,
+    or, if the client disconnects mid-step, once that step has actually finished.
+    """
+    step = None
+    try:
+        yield _sse("start", {"ticker": ticker})
+        try:
+            updates = get_graph().stream(initial_state(ticker), stream_mode="updates")
+            while True:
+                # shield: a disconnect cancels the wait, not the step still running on the pool
+                step = asyncio.ensure_future(gate.offload(next, updates, None))
+                update = await asyncio.shield(step)
+                if update is None:
+                    break
+                for node, output in update.items():
+                    yield _sse(node, output)
+        except Exception as e:
+            logger.error(f"Graph stream failed for {ticker}: {e}")
+            yield _sse("error", {"detail": str(e)})
+        yield _sse("done", {"ticker": ticker})
+    finally:
+        if step is None or step.done():
+            release()
+        else:
+            def _release_after(done):
+                if not done.cancelled() and done.exception() is not None:
+                    logger.warning(f"Abandoned graph step failed for {ticker}: {done.exception()}")
+                release()
+            step.add_done_callback(_release_after)
+
+@app.get("/analyze/{ticker}/events")
+async def analyze_events(ticker: str):
+    """
+    Server-sent events for the full pipeline: quant, sentiment and rag each arrive
+    as soon as their node finishes, then the report, then a final "done" event.
+    """
+    ticker = ticker.upper()
+    # The whole pipeline (LLM included) holds one gate slot: 503 + Retry-After when full
+    release = gate.reserve()
+    return StreamingResponse(
+        _graph_events(ticker, release), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/report/{ticker}/stream")
+async def stream_investment_memo(ticker: str):
+    """
+    Streams the investment memo (Markdown) as the LLM writes it.
+    The data agents run first; a memo already generated for identical inputs comes back at once.
+    """
+    ticker = ticker.upper()
+    state = await gate.run(("context", ticker), gather_context, ticker)
+    prompt = build_report_prompt(ticker, state.get('quant_data', {}),
+                                 state.get('sentiment_data', {}), state.get('rag_data', {}))
+    # stream_report is a sync generator: Starlette iterates it in a worker thread
+    return StreamingResponse(stream_report(prompt), media_type="text/markdown; charset=utf-8")
+
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Hit/miss counters of the feature and response caches (for this API process).
+    """
+    return {"features": get_feature_store().stats(), "responses": response_cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint: stage latencies, call/error counts, cache hits and fallbacks.
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/models")
+def loaded_models():
+    """
+    Versions of every model artifact on disk: the shared model plus all per-ticker models.
+    All of them are preloaded at startup; hot reloads (and files added since) show up here.
+    """
+    return get_model_registry().warm_up()
 
 # 4. Run instructions
 # In terminal: uvicorn src.api.main:app --reload
@@ -1,7 +1,6 @@
 import os
 import sys
 import logging
-import streamlit as st
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -14,15 +13,89 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 VECTOR_DB_DIR = DATA_DIR / "vector_store"
-MODEL_DIR = PROJECT_ROOT / "models"
+MODEL_DIR = Path(os.getenv("FINSIGHT_MODEL_DIR", PROJECT_ROOT / "models"))
 LOGS_DIR = PROJECT_ROOT / "logs"
 
 # --- THE MISSING LINE THAT CAUSED THE ERROR ---
 MODEL_PATH = MODEL_DIR / "price_predictor.pkl"
 # ----------------------------------------------
 
+TICKER_MODEL_DIR = MODEL_DIR / "tickers"   # per-ticker artifacts; MODEL_PATH is the shared fallback
+# Seconds between artifact mtime checks (hot reload) in the model registry
+MODEL_RELOAD_INTERVAL = float(os.getenv("FINSIGHT_MODEL_RELOAD_INTERVAL", 5))
+MODEL_ARCHIVE_DIR = MODEL_DIR / "archive"   # every trained version, <TICKER>/<version>.pkl
+MODEL_REPORT_DIR = MODEL_DIR / "reports"    # walk-forward metrics reports from the trainer
+
 LOG_FILE = LOGS_DIR / "app.log"
 
+# SQLite price database (override with FINSIGHT_DB_PATH, e.g. for tests)
+DB_FILE = Path(os.getenv("FINSIGHT_DB_PATH", DATA_DIR / "finsight.db"))
+
+# SQLite connection pool (shared by the UI, API and ingestor processes via WAL)
+DB_POOL_SIZE = int(os.getenv("FINSIGHT_DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("FINSIGHT_DB_MAX_OVERFLOW", 20))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("FINSIGHT_DB_BUSY_TIMEOUT_MS", 30000))
+
+# Price storage backend: "sqlite" (default) or "arrow" (one memory-mapped Arrow IPC file per ticker)
+PRICE_STORE = os.getenv("FINSIGHT_PRICE_STORE", "sqlite").lower()
+PRICE_STORE_DIR = Path(os.getenv("FINSIGHT_PRICE_STORE_DIR", DATA_DIR / "prices"))
+
+# On-disk indicator cache (src/ml_engine/feature_store.py), evicted least-recently-used first
+FEATURE_CACHE_DIR = Path(os.getenv("FINSIGHT_FEATURE_CACHE_DIR", DATA_DIR / "features"))
+FEATURE_CACHE_MAX_ENTRIES = int(os.getenv("FINSIGHT_FEATURE_CACHE_MAX_ENTRIES", 512))
+FEATURE_CACHE_MAX_BYTES = int(os.getenv("FINSIGHT_FEATURE_CACHE_MAX_MB", 256)) * 1024 * 1024
+
+# Per-node time budgets for the LangGraph pipeline (seconds); a node that overruns
+# is replaced by a degraded result so the memo still gets written
+NODE_TIMEOUTS = {
+    "quant": float(os.getenv("FINSIGHT_QUANT_TIMEOUT", 30)),
+    "rag": float(os.getenv("FINSIGHT_RAG_TIMEOUT", 20)),
+    "sentiment": float(os.getenv("FINSIGHT_SENTIMENT_TIMEOUT", 10)),
+    "report": float(os.getenv("FINSIGHT_REPORT_TIMEOUT", 90)),
+}
+# Threads per node type: each node has its own pool, so calls stuck on one
+# dependency (e.g. NewsAPI) can't starve the other nodes of workers
+NODE_POOL_SIZE = int(os.getenv("FINSIGHT_NODE_POOL_SIZE", 16))
+
+# FastAPI worker pool: blocking jobs run on API_MAX_WORKERS threads; beyond
+# API_MAX_IN_FLIGHT distinct jobs the API answers 503 with Retry-After
+API_MAX_WORKERS = int(os.getenv("FINSIGHT_API_MAX_WORKERS", 8))
+API_MAX_IN_FLIGHT = int(os.getenv("FINSIGHT_API_MAX_IN_FLIGHT", 32))
+API_RETRY_AFTER = int(os.getenv("FINSIGHT_API_RETRY_AFTER", 2))
+
+# API response cache (/analyze, /sentiment). Keys already change with new bars;
+# the TTL bounds how long news sentiment and live (not ingested) data are reused
+API_CACHE_TTL = int(os.getenv("FINSIGHT_API_CACHE_TTL", 900))
+API_CACHE_MAX_ENTRIES = int(os.getenv("FINSIGHT_API_CACHE_MAX_ENTRIES", 1024))
+
+# Stage timings (src/metrics.py): every API response carries a Server-Timing header;
+# with FINSIGHT_TRACE_REQUESTS=1 the per-request breakdown is also logged
+TRACE_REQUESTS = os.getenv("FINSIGHT_TRACE_REQUESTS", "0") == "1"
+
+# Chart payloads: equity curves longer than CHART_MAX_POINTS are downsampled (LTTB)
+# before they are returned; metrics are always computed on the full series
+CHART_MAX_POINTS = int(os.getenv("FINSIGHT_CHART_MAX_POINTS", 500))
+
+# News sentiment: NewsAPI is only queried when a ticker's last fetch is older than
+# SENTIMENT_STALE_AFTER seconds; scores are averaged over the last SENTIMENT_WINDOW_DAYS
+SENTIMENT_STALE_AFTER = int(os.getenv("FINSIGHT_SENTIMENT_STALE_AFTER", 3600))
+SENTIMENT_WINDOW_DAYS = int(os.getenv("FINSIGHT_SENTIMENT_WINDOW_DAYS", 5))
+
+# Sentence embeddings for the RAG store. Backends: "torch" (sentence-transformers default),
+# "onnx" (ONNX Runtime, fp32) or "onnx-int8" (ONNX Runtime, dynamically quantized weights).
+# Speed and drift from torch are unmeasured here; check with `python -m benchmarks.bench_embeddings`
+# before switching, and re-embed the vector store if vectors move.
+EMBEDDING_MODEL = os.getenv("FINSIGHT_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("FINSIGHT_EMBEDDING_BACKEND", "torch")
+EMBEDDING_BATCH_SIZE = int(os.getenv("FINSIGHT_EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_ONNX_FILE = os.getenv("FINSIGHT_EMBEDDING_ONNX_FILE")   # override the int8 file picked per CPU
+
+# Report LLM: "groq" (needs GROQ_API_KEY) or "fake" (offline, deterministic; for tests and
+# benchmarks). FINSIGHT_LLM_FAKE_DELAY adds a per-token delay to mimic a real stream.
+LLM_BACKEND = os.getenv("FINSIGHT_LLM_BACKEND", "groq")
+LLM_MODEL = os.getenv("FINSIGHT_LLM_MODEL", "llama-3.3-70b-versatile")
+LLM_FAKE_DELAY = float(os.getenv("FINSIGHT_LLM_FAKE_DELAY", 0))
+
 # 3. Create Directories (CRITICAL STEP)
 # We must create these before trying to write files to them
 try:
@@ -38,11 +111,14 @@ def get_api_key(key_name):
     1. Streamlit Cloud Secrets (Production)
     2. Local Environment Variables (Local Development/Docker)
     """
-    try:
-        if key_name in st.secrets:
-            return st.secrets[key_name]
-    except FileNotFoundError:
-        pass 
+    # Only the Streamlit app has secrets; other processes (API, ingestors) never import streamlit
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try:
+            if key_name in st.secrets:
+                return st.secrets[key_name]
+        except FileNotFoundError:
+            pass 
     return os.getenv(key_name)
 
 # Export Keys
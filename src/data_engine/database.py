@@ -1,20 +1,48 @@
 import pandas as pd
-from sqlalchemy import create_engine, Column, String, Float, Date, Integer
+from sqlalchemy import create_engine, event, text, bindparam, Column, String, Float, Date, DateTime, Integer, Text, Index, select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, declarative_base
-from src.config import DATA_DIR
-from datetime import date
+from src.config import DB_FILE, PRICE_STORE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_BUSY_TIMEOUT_MS
+from src.metrics import instrumented
+import os
+import json
+from datetime import date, datetime, timezone
 
 # 1. Setup Database Path (Saves to data/finsight.db)
-DB_PATH = f"sqlite:///{DATA_DIR}/finsight.db"
-engine = create_engine(DB_PATH, echo=False)
+DB_PATH = f"sqlite:///{DB_FILE}"
+engine = create_engine(
+    DB_PATH, echo=False,
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_pre_ping=True,
+    connect_args={"timeout": DB_BUSY_TIMEOUT_MS / 1000, "check_same_thread": False}
+)
 Base = declarative_base()
 
+@event.listens_for(engine, "connect")
+def _tune_sqlite(dbapi_conn, _):
+    """
+    WAL lets the UI, API and ingestor read while one writer commits;
+    the rest trades a little durability for far fewer fsyncs and a bigger page cache.
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA cache_size=-65536")      # 64 MB
+    cursor.execute("PRAGMA mmap_size=268435456")    # 256 MB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 # 2. Define Tables (The Schema)
 class StockPrice(Base):
     __tablename__ = "stock_prices"
-    
+    # One bar per ticker per day: this is the key the upsert conflicts on, and the
+    # composite index every per-ticker range query is served from
+    __table_args__ = (
+        Index("uq_stock_prices_ticker_date", "ticker", "date", unique=True),
+    )
+
     id = Column(Integer, primary_key=True)
-    ticker = Column(String, index=True)
+    ticker = Column(String)
     date = Column(Date, index=True)
     open = Column(Float)
     high = Column(Float)
@@ -23,58 +51,391 @@ class StockPrice(Base):
     volume = Column(Float)
 
 class SentimentLog(Base):
+    """One scored headline per row; `date` is the article's publish date."""
     __tablename__ = "sentiment_logs"
-    
+    # A headline is scored once per ticker: re-fetched articles conflict on this key
+    __table_args__ = (
+        Index("uq_sentiment_logs_ticker_hash", "ticker", "url_hash", unique=True),
+    )
+
     id = Column(Integer, primary_key=True)
     ticker = Column(String)
-    date = Column(Date)
+    date = Column(Date, index=True)
     score = Column(Float)
     label = Column(String)
+    url_hash = Column(String)
+    url = Column(Text)
+    headline = Column(Text)
+    source = Column(String)
+    published_at = Column(DateTime)
+
+class SentimentFetch(Base):
+    """When NewsAPI was last queried per ticker (drives the staleness check)."""
+    __tablename__ = "sentiment_fetches"
+
+    ticker = Column(String, primary_key=True)
+    fetched_at = Column(DateTime)
+
+class IndicatorState(Base):
+    """Running state of the streaming indicator engine (src/ml_engine/streaming.py)."""
+    __tablename__ = "indicator_states"
+
+    ticker = Column(String, primary_key=True)
+    last_date = Column(Date)
+    state = Column(Text)
+
+class ReportCache(Base):
+    """Generated investment memos keyed by a hash of the model id + rendered prompt."""
+    __tablename__ = "report_cache"
+
+    prompt_hash = Column(String, primary_key=True)
+    model = Column(String)
+    report = Column(Text)
+    created_at = Column(DateTime)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
 
 # 3. Create Tables
 Base.metadata.create_all(engine)
 Session = sessionmaker(bind=engine)
 
-# --- HELPER FUNCTIONS ---
-
-def save_stock_data(ticker: str, df: pd.DataFrame):
+def _ensure_price_key():
     """
-    Saves a Pandas DataFrame (from yfinance) to SQLite.
-    Optimized to avoid duplicates.
+    Databases created before the (ticker, date) key existed may hold duplicate bars.
+    Keep the newest row of each pair, then build the unique index.
     """
+    key = StockPrice.__table_args__[0]
+    with engine.begin() as conn:
+        # The single-column ticker index is a prefix of the composite key, so it only slows writes
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_stock_prices_ticker")
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (key.name,)
+        ).first()
+        if exists:
+            return
+        conn.exec_driver_sql(
+            "DELETE FROM stock_prices WHERE id NOT IN "
+            "(SELECT MAX(id) FROM stock_prices GROUP BY ticker, date)"
+        )
+        key.create(conn)
+
+_ensure_price_key()
+
+def _ensure_sentiment_columns():
+    """sentiment_logs predates the per-headline columns: add any that are missing, then the key."""
+    table = SentimentLog.__table__
+    with engine.begin() as conn:
+        existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(sentiment_logs)")}
+        for column in table.columns:
+            if column.name not in existing:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE sentiment_logs ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                )
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+_ensure_sentiment_columns()
+
+# --- HELPER FUNCTIONS ---
+# With FINSIGHT_PRICE_STORE=arrow, price reads/writes go to the columnar store instead
+# (same signatures, same DataFrame layout). Sentiment logs always stay in SQLite.
+
+def _arrow_store():
+    if PRICE_STORE != "arrow":
+        return None
+    from src.data_engine.price_store import get_price_store
+    return get_price_store()
+
+def _to_price_records(ticker: str, df: pd.DataFrame) -> list:
+    """Normalizes a yfinance-style frame into rows for the stock_prices table."""
     # Convert index to column if needed
     if 'Date' not in df.columns:
         df = df.reset_index()
-    
+
     # Standardize columns
-    df['date'] = pd.to_datetime(df['Date']).dt.date
-    df['ticker'] = ticker
-    
-    # Rename for SQL mapping
     df = df.rename(columns={
-        "Open": "open", "High": "high", "Low": "low", 
+        "Open": "open", "High": "high", "Low": "low",
         "Close": "close", "Volume": "volume"
     })
-    
+    df['date'] = pd.to_datetime(df['Date']).dt.date
+    df['ticker'] = ticker
+
     # Filter only relevant columns
-    data_to_save = df[['ticker', 'date', 'open', 'high', 'low', 'close', 'volume']]
-    
-    # Use Pandas magic to write to SQL (Replace existing for simplicity in MVP)
-    # In production, you'd use 'append' and check for duplicates
-    data_to_save.to_sql('stock_prices', con=engine, if_exists='append', index=False, method='multi', chunksize=500)
-    print(f"✅ Saved {len(df)} rows for {ticker} to Database.")
-
-def get_stock_data(ticker: str) -> pd.DataFrame:
-    """Reads SQL data back into a Pandas DataFrame."""
-    query = f"SELECT * FROM stock_prices WHERE ticker = '{ticker}' ORDER BY date ASC"
-    df = pd.read_sql(query, con=engine)
-    
-    if not df.empty:
-        df['Date'] = pd.to_datetime(df['date'])
-        df.set_index('Date', inplace=True)
-        # Drop the extra SQL columns
-        df.drop(columns=['id', 'date', 'ticker'], inplace=True, errors='ignore')
-        # Capitalize columns to match yfinance format for other functions
-        df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}, inplace=True)
-        
-    return df
\ No newline at end of file
+    data_to_save = df[['ticker', 'date'] + PRICE_COLUMNS].astype({c: float for c in PRICE_COLUMNS})
+    return data_to_save.to_dict(orient='records')
+
+@instrumented("db.upsert_stock_data")
+def upsert_stock_data(ticker: str, df: pd.DataFrame) -> dict:
+    """
+    Inserts new bars and overwrites existing ones (matched on ticker + date)
+    in a single bulk statement. Returns {"inserted": n, "updated": n}.
+    """
+    if _arrow_store():
+        return _arrow_store().upsert(ticker, df)
+
+    records = _to_price_records(ticker, df)
+    if not records:
+        return {"inserted": 0, "updated": 0}
+
+    dates = [r['date'] for r in records]
+    stmt = sqlite_insert(StockPrice.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['ticker', 'date'],
+        set_={c: stmt.excluded[c] for c in PRICE_COLUMNS}
+    )
+
+    with engine.begin() as conn:
+        # Count the overlap first so we can report inserts vs updates
+        existing = conn.execute(
+            select(StockPrice.date).where(
+                StockPrice.ticker == ticker,
+                StockPrice.date.between(min(dates), max(dates))
+            )
+        ).scalars().all()
+        updated = len(set(existing) & set(dates))
+        conn.execute(stmt, records)
+
+    return {"inserted": len(set(dates)) - updated, "updated": updated}
+
+def save_stock_data(ticker: str, df: pd.DataFrame) -> dict:
+    """
+    Saves a Pandas DataFrame (from yfinance) to the price store (SQLite by default).
+    Existing (ticker, date) bars are updated in place, so re-saving never duplicates.
+    """
+    stats = upsert_stock_data(ticker, df)
+    print(f"✅ Saved {len(df)} rows for {ticker} to Database "
+          f"({stats['inserted']} inserted, {stats['updated']} updated).")
+    return stats
+
+@instrumented("db.delete_stock_data")
+def delete_stock_data(ticker: str):
+    """Removes every stored bar (and the derived indicator state) for a ticker."""
+    if _arrow_store():
+        return _arrow_store().delete(ticker)
+    with Session() as session:
+        session.query(StockPrice).filter(StockPrice.ticker == ticker).delete()
+        session.query(IndicatorState).filter(IndicatorState.ticker == ticker).delete()
+        session.commit()
+
+@instrumented("db.save_indicator_state")
+def save_indicator_state(ticker: str, state: dict):
+    """Persists the streaming indicator state alongside the ticker's prices."""
+    if _arrow_store():
+        return _arrow_store().save_state(ticker, state)
+    stmt = sqlite_insert(IndicatorState.__table__).values(
+        ticker=ticker, last_date=date.fromisoformat(state["last_date"]), state=json.dumps(state)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['ticker'], set_={"last_date": stmt.excluded.last_date, "state": stmt.excluded.state}
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+@instrumented("db.load_indicator_state")
+def load_indicator_state(ticker: str):
+    """Returns the stored streaming indicator state (dict) or None."""
+    if _arrow_store():
+        return _arrow_store().load_state(ticker)
+    with engine.connect() as conn:
+        raw = conn.execute(
+            select(IndicatorState.state).where(IndicatorState.ticker == ticker)
+        ).scalar()
+    return json.loads(raw) if raw else None
+
+@instrumented("db.save_sentiment_logs")
+def save_sentiment_logs(ticker: str, records: list, fetched_at: datetime = None) -> int:
+    """
+    Stores scored headlines ({url_hash, url, headline, source, published_at, score, label}).
+    Rows whose (ticker, url_hash) is already stored are skipped. Returns rows inserted.
+    With fetched_at, the ticker's last-fetch time is recorded in the same transaction,
+    so a failed save never leaves the ticker looking fresh.
+    """
+    inserted = 0
+    with engine.begin() as conn:
+        if records:
+            rows = [{**r, "ticker": ticker, "date": r["published_at"].date()} for r in records]
+            stmt = sqlite_insert(SentimentLog.__table__).on_conflict_do_nothing(index_elements=['ticker', 'url_hash'])
+            inserted = conn.execute(stmt, rows).rowcount
+        if fetched_at is not None:
+            conn.execute(_fetch_stmt(ticker, fetched_at))
+    return inserted
+
+@instrumented("db.get_known_sentiment_hashes")
+def get_known_sentiment_hashes(ticker: str, hashes: list) -> set:
+    """The subset of headline hashes already scored for this ticker."""
+    if not hashes:
+        return set()
+    with engine.connect() as conn:
+        return set(conn.execute(
+            select(SentimentLog.url_hash)
+            .where(SentimentLog.ticker == ticker, SentimentLog.url_hash.in_(list(hashes)))
+        ).scalars())
+
+@instrumented("db.get_sentiment_series")
+def get_sentiment_series(ticker: str, start=None) -> pd.DataFrame:
+    """Daily aggregate of stored headline scores: Date index, columns score (mean) and count."""
+    query = ("SELECT date, AVG(score) AS score, COUNT(*) AS count FROM sentiment_logs "
+             "WHERE ticker = :ticker AND score IS NOT NULL")
+    params = {"ticker": ticker}
+    if start is not None:
+        query += " AND date >= :start"
+        params["start"] = pd.Timestamp(start).strftime("%Y-%m-%d")
+    query += " GROUP BY date ORDER BY date ASC"
+    df = pd.read_sql(text(query), con=engine, params=params, parse_dates=['date'], index_col='date')
+    df.index.name = 'Date'
+    return df
+
+@instrumented("db.get_recent_headlines")
+def get_recent_headlines(ticker: str, start=None, limit: int = 3) -> list:
+    """Newest stored headlines (with scores) for a ticker."""
+    stmt = select(SentimentLog.headline, SentimentLog.score, SentimentLog.published_at, SentimentLog.url) \
+        .where(SentimentLog.ticker == ticker, SentimentLog.headline.is_not(None))
+    if start is not None:
+        stmt = stmt.where(SentimentLog.date >= pd.Timestamp(start).date())
+    stmt = stmt.order_by(SentimentLog.published_at.desc()).limit(limit)
+    with engine.connect() as conn:
+        return [dict(row._mapping) for row in conn.execute(stmt)]
+
+@instrumented("db.get_sentiment_fetched_at")
+def get_sentiment_fetched_at(ticker: str):
+    with engine.connect() as conn:
+        return conn.execute(select(SentimentFetch.fetched_at).where(SentimentFetch.ticker == ticker)).scalar()
+
+def _fetch_stmt(ticker: str, fetched_at: datetime):
+    stmt = sqlite_insert(SentimentFetch.__table__).values(ticker=ticker, fetched_at=fetched_at)
+    return stmt.on_conflict_do_update(index_elements=['ticker'], set_={"fetched_at": stmt.excluded.fetched_at})
+
+@instrumented("db.get_cached_report")
+def get_cached_report(prompt_hash: str):
+    """The stored memo for this prompt hash, or None."""
+    with engine.connect() as conn:
+        return conn.execute(select(ReportCache.report).where(ReportCache.prompt_hash == prompt_hash)).scalar()
+
+@instrumented("db.save_cached_report")
+def save_cached_report(prompt_hash: str, model: str, report: str):
+    stmt = sqlite_insert(ReportCache.__table__).values(
+        prompt_hash=prompt_hash, model=model, report=report,
+        created_at=datetime.now(timezone.utc).replace(tzinfo=None)
+    ).on_conflict_do_nothing(index_elements=['prompt_hash'])
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+@instrumented("db.get_last_date")
+def get_last_date(ticker: str):
+    """Returns the most recent stored bar date for a ticker (None if absent)."""
+    if _arrow_store():
+        return _arrow_store().last_date(ticker)
+    with engine.connect() as conn:
+        return conn.execute(
+            select(StockPrice.date).where(StockPrice.ticker == ticker)
+            .order_by(StockPrice.date.desc()).limit(1)
+        ).scalar()
+
+@instrumented("db.get_price_version")
+def get_price_version(ticker: str):
+    """
+    Cheap fingerprint of a ticker's stored bars, None if absent: changes when bars
+    are added or removed and when the last bar is revised in place (incremental
+    ingest re-fetches and overwrites it).
+    """
+    if _arrow_store():
+        path = _arrow_store()._path(ticker)
+        if not path.exists():
+            return None
+        st = os.stat(path)
+        return (str(_arrow_store().last_date(ticker)), st.st_mtime_ns, st.st_size)
+    with engine.connect() as conn:
+        last = conn.execute(
+            select(StockPrice.date, StockPrice.open, StockPrice.high, StockPrice.low,
+                   StockPrice.close, StockPrice.volume)
+            .where(StockPrice.ticker == ticker).order_by(StockPrice.date.desc()).limit(1)
+        ).first()
+        if last is None:
+            return None
+        count = conn.execute(select(func.count()).where(StockPrice.ticker == ticker)).scalar()
+    return (str(last[0]), count, *last[1:])
+
+@instrumented("db.get_last_dates")
+def get_last_dates(tickers: list) -> dict:
+    """Bulk version of get_last_date: {ticker: last bar date} for tickers that have data."""
+    if _arrow_store():
+        dates = {t: _arrow_store().last_date(t) for t in tickers}
+        return {t: d for t, d in dates.items() if d is not None}
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(StockPrice.ticker, func.max(StockPrice.date))
+            .where(StockPrice.ticker.in_(list(tickers)))
+            .group_by(StockPrice.ticker)
+        ).all()
+    return dict(rows)
+
+@instrumented("db.get_stock_data")
+def get_stock_data(ticker: str, start=None, end=None, columns=None) -> pd.DataFrame:
+    """
+    Reads stored bars back into a Pandas DataFrame (yfinance layout: Date index, Open..Volume).
+
+    start/end (inclusive, date-like) and columns (e.g. ["Close"]) are pushed into the
+    query, so callers only pay for the rows and columns they use.
+    """
+    columns = _select_columns(columns)
+    if _arrow_store():
+        return _arrow_store().read(ticker, start=start, end=end, columns=columns)
+
+    query = f"SELECT date, {', '.join(c.lower() for c in columns)} FROM stock_prices WHERE ticker = :ticker"
+    params = {"ticker": ticker}
+    if start is not None:
+        query += " AND date >= :start"
+        params["start"] = pd.Timestamp(start).strftime("%Y-%m-%d")
+    if end is not None:
+        query += " AND date <= :end"
+        params["end"] = pd.Timestamp(end).strftime("%Y-%m-%d")
+    query += " ORDER BY date ASC"
+
+    df = pd.read_sql(text(query), con=engine, params=params, parse_dates=['date'], index_col='date')
+    # Capitalize columns to match yfinance format for other functions
+    df.index.name = 'Date'
+    df.columns = columns
+    return df
+
+@instrumented("db.get_stock_data_bulk")
+def get_stock_data_bulk(tickers: list, start=None, end=None, columns=None) -> dict:
+    """
+    Loads several tickers with one query. Returns {ticker: DataFrame} in the
+    get_stock_data layout; tickers without stored bars are omitted.
+    """
+    columns = _select_columns(columns)
+    tickers = list(dict.fromkeys(tickers))
+    if _arrow_store():
+        frames = {t: _arrow_store().read(t, start=start, end=end, columns=columns) for t in tickers}
+        return {t: df for t, df in frames.items() if not df.empty}
+
+    query = (f"SELECT ticker, date, {', '.join(c.lower() for c in columns)} FROM stock_prices "
+             "WHERE ticker IN :tickers")
+    params = {"tickers": tickers}
+    if start is not None:
+        query += " AND date >= :start"
+        params["start"] = pd.Timestamp(start).strftime("%Y-%m-%d")
+    if end is not None:
+        query += " AND date <= :end"
+        params["end"] = pd.Timestamp(end).strftime("%Y-%m-%d")
+    query += " ORDER BY ticker, date"
+
+    stmt = text(query).bindparams(bindparam("tickers", expanding=True))
+    df = pd.read_sql(stmt, con=engine, params=params, parse_dates=['date'])
+    frames = {}
+    for ticker, rows in df.groupby('ticker', sort=False):
+        rows = rows.drop(columns='ticker').set_index('date')
+        rows.index.name = 'Date'
+        rows.columns = columns
+        frames[ticker] = rows
+    return frames
+
+def _select_columns(columns) -> list:
+    """Validates a requested column subset (case-insensitive) against the OHLCV whitelist."""
+    if columns is None:
+        return [c.capitalize() for c in PRICE_COLUMNS]
+    wanted = [c.capitalize() for c in ([columns] if isinstance(columns, str) else columns)]
+    unknown = set(wanted) - {c.capitalize() for c in PRICE_COLUMNS}
+    if unknown:
+        raise ValueError(f"Unknown price columns: {sorted(unknown)}")
+    return wanted
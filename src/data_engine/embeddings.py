@@ -0,0 +1,63 @@
+# src/data_engine/embeddings.py
+"""
+Process-wide embedding model shared by the UI, API, ingestors and agents.
+
+The model is built on first use (double-checked lock, so concurrent first
+callers still load it once) and then reused; nothing here depends on Streamlit.
+FINSIGHT_EMBEDDING_BACKEND picks how sentence-transformers runs it on CPU:
+"torch", "onnx", or "onnx-int8" (the quantized exports published with
+all-MiniLM-L6-v2; needs sentence-transformers>=3.2 and onnxruntime / optimum).
+"""
+import platform
+import threading
+from src.config import (logger, EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE,
+                        EMBEDDING_ONNX_FILE)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+_model = None
+_lock = threading.Lock()
+
+def _int8_file() -> str:
+    """The quantized ONNX export matching this CPU's instruction set."""
+    if EMBEDDING_ONNX_FILE:
+        return EMBEDDING_ONNX_FILE
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+def backend_kwargs(backend: str) -> dict:
+    """SentenceTransformer constructor kwargs for a backend name."""
+    if backend == "torch":
+        return {"device": "cpu"}
+    if backend == "onnx":
+        return {"device": "cpu", "backend": "onnx"}
+    if backend == "onnx-int8":
+        return {"device": "cpu", "backend": "onnx", "model_kwargs": {"file_name": _int8_file()}}
+    raise ValueError(f"Unknown embedding backend {backend!r}; choose from {list(BACKENDS)}")
+
+def build_embedding_model(backend: str = None, model_name: str = None, batch_size: int = None):
+    """A new LangChain embeddings object (use get_embedding_model() for the shared one)."""
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    backend = backend or EMBEDDING_BACKEND
+    return HuggingFaceEmbeddings(
+        model_name=model_name or EMBEDDING_MODEL,
+        model_kwargs=backend_kwargs(backend),
+        encode_kwargs={"batch_size": batch_size or EMBEDDING_BATCH_SIZE, "normalize_embeddings": True},
+    )
+
+def get_embedding_model():
+    """The shared embeddings object, loaded on first call."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                logger.info(f"Loading embedding model {EMBEDDING_MODEL} ({EMBEDDING_BACKEND} backend)")
+                _model = build_embedding_model()
+    return _model
+
+def reset_embedding_model():
+    """Drops the shared instance (tests, or after changing the backend settings)."""
+    global _model
+    with _lock:
+        _model = None
@@ -1,29 +1,210 @@
+import sys
+import time
+import queue
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
-from src.data_engine.database import save_stock_data, engine, StockPrice
-from sqlalchemy.orm import sessionmaker
+from src.config import logger
+from src.data_engine.database import (
+    save_stock_data, upsert_stock_data, delete_stock_data, get_last_date, get_last_dates
+)
+from src.ml_engine.streaming import refresh_indicator_state
+from src.ml_engine.feature_store import invalidate_features
 
-def ingest_data(ticker: str):
-    print(f"📥 Ingesting Data for {ticker}...")
-    
-    # 1. Fetch from API
+DEFAULT_TICKERS = ["AAPL", "NVDA", "TSLA", "MSFT", "GOOGL", "BTC-USD", "ETH-USD"]
+
+def fetch_history(ticker: str, start=None):
+    """
+    Downloads daily bars from Yahoo Finance.
+    With no start date we pull 5 years (enough for backtesting).
+    """
     stock = yf.Ticker(ticker)
-    df = stock.history(period="5y") # Get 5 years for backtesting
-    
+    if start is None:
+        return stock.history(period="5y")
+    return stock.history(start=start)
+
+def ingest_data(ticker: str, incremental: bool = True) -> dict:
+    """
+    Refreshes the stored bars for a ticker.
+
+    incremental=True  -> fetch only from the last stored date onwards and upsert
+                         (the last bar is re-fetched since it may have been partial).
+    incremental=False -> wipe the ticker and reload the full 5 year history.
+
+    Returns {"inserted": n, "updated": n}.
+    """
+    print(f"📥 Ingesting Data for {ticker}...")
+
+    # 1. Work out how much history we actually need
+    last_date = get_last_date(ticker) if incremental else None
+
+    # 2. Fetch from API
+    df = fetch_history(ticker, start=last_date)
+
     if df.empty:
         print(f"⚠️ No data found for {ticker}")
-        return
+        return {"inserted": 0, "updated": 0}
+
+    # 3. Full reload: clear old data for this ticker first
+    if not incremental:
+        delete_stock_data(ticker)
+
+    # 4. Upsert to SQL, then update everything derived from the bars
+    stats = save_stock_data(ticker, df)
+    _after_write(ticker)
+    return stats
+
+def _after_write(ticker: str):
+    """Drops cached feature frames and rolls the streaming indicators forward."""
+    # Derived data only: a failure here must never fail the ingest itself
+    try:
+        invalidate_features(ticker)
+        refresh_indicator_state(ticker)
+    except Exception as e:
+        logger.warning(f"Post-ingest refresh failed for {ticker}: {e}")
+
+# --- BATCH INGESTION ---
+
+class RateLimiter:
+    """Token bucket shared by all fetch workers (rate = requests per second)."""
 
-    # 2. Clear old data for this ticker (To prevent duplicates in this MVP)
-    # In a real app, you would 'Upsert' (Update Insert), but deleting is safer for now.
-    with sessionmaker(bind=engine)() as session:
-        session.query(StockPrice).filter(StockPrice.ticker == ticker).delete()
-        session.commit()
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
 
-    # 3. Save to SQL
-    save_stock_data(ticker, df)
+    def acquire(self):
+        """Blocks until a request slot is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def _fetch_with_retry(ticker, start, limiter, max_retries, backoff):
+    """Rate-limited fetch with exponential backoff + jitter. Returns (df, attempts)."""
+    for attempt in range(1, max_retries + 1):
+        limiter.acquire()
+        try:
+            return fetch_history(ticker, start=start), attempt
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff * 2 ** (attempt - 1) + random.uniform(0, backoff))
+
+def _writer_loop(jobs: queue.Queue, summary: dict, incremental: bool):
+    """The only thread that writes to SQLite; drains fetched frames from the queue."""
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        ticker, df = job
+        entry = summary[ticker]
+        started = time.perf_counter()
+        try:
+            if not incremental:
+                delete_stock_data(ticker)
+            entry.update(upsert_stock_data(ticker, df))
+            entry["status"] = "ok"
+            _after_write(ticker)
+        except Exception as e:
+            entry.update(status="error", error=f"write: {e}")
+        entry["write_s"] = round(time.perf_counter() - started, 3)
+
+def ingest_batch(tickers: list, incremental: bool = True, max_workers: int = 8,
+                 requests_per_second: float = 2.0, max_retries: int = 3,
+                 backoff: float = 1.0) -> dict:
+    """
+    Ingests many tickers concurrently.
+
+    Fetches run on a bounded thread pool behind a shared rate limiter and retry
+    with backoff; all database writes go through a single writer thread.
+    Returns a per-ticker summary: status, rows inserted/updated, attempts and latency.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    last_dates = get_last_dates(tickers) if incremental else {}
+    limiter = RateLimiter(requests_per_second, burst=max_workers)
+    summary = {t: {"status": "pending", "inserted": 0, "updated": 0, "attempts": 0} for t in tickers}
+
+    # Bounded queue: if the writer falls behind, fetchers wait instead of piling up frames
+    jobs = queue.Queue(maxsize=max_workers * 2)
+    writer = threading.Thread(target=_writer_loop, args=(jobs, summary, incremental), daemon=True)
+    writer.start()
+
+    def fetch(ticker):
+        entry = summary[ticker]
+        started = time.perf_counter()
+        try:
+            df, entry["attempts"] = _fetch_with_retry(
+                ticker, last_dates.get(ticker), limiter, max_retries, backoff
+            )
+        except Exception as e:
+            entry.update(status="error", attempts=max_retries, error=f"fetch: {e}")
+            return
+        finally:
+            entry["fetch_s"] = round(time.perf_counter() - started, 3)
+
+        if df.empty:
+            entry["status"] = "empty"
+        else:
+            jobs.put((ticker, df))
+
+    batch_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(fetch, tickers))
+    jobs.put(None)
+    writer.join()
+
+    elapsed = time.perf_counter() - batch_started
+    ok = sum(1 for e in summary.values() if e["status"] == "ok")
+    print(f"✅ Batch ingest: {ok}/{len(tickers)} tickers in {elapsed:.1f}s "
+          f"({sum(e['inserted'] for e in summary.values())} rows inserted, "
+          f"{sum(e['updated'] for e in summary.values())} updated).")
+    return summary
+
+def print_summary(summary: dict):
+    """Prints one line per ticker: status, rows and latency."""
+    for ticker, e in summary.items():
+        line = (f"{ticker:<10} {e['status']:<6} +{e['inserted']:<5} ~{e['updated']:<5} "
+                f"tries={e['attempts']} fetch={e.get('fetch_s', 0):.2f}s write={e.get('write_s', 0):.2f}s")
+        if "error" in e:
+            line += f"  ⚠️ {e['error']}"
+        print(line)
+
+def exit_code(summary: dict, fail_threshold: float = 0.0) -> int:
+    """1 when the share of tickers that errored exceeds fail_threshold (0 = any error fails)."""
+    failed = sum(1 for e in summary.values() if e["status"] == "error")
+    return 1 if summary and failed / len(summary) > fail_threshold else 0
 
 if __name__ == "__main__":
-    # Load initial data for popular stocks
-    tickers = ["AAPL", "NVDA", "TSLA", "MSFT", "GOOGL", "BTC-USD", "ETH-USD"]
-    for t in tickers:
-        ingest_data(t)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ingest daily bars into the FinSight database.")
+    parser.add_argument("tickers", nargs="*", help="Symbols to ingest (default: the popular set).")
+    parser.add_argument("--file", help="Text file with one symbol per line.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=2.0, help="Max Yahoo requests per second.")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--full", action="store_true", help="Wipe and reload 5 years per ticker.")
+    parser.add_argument("--fail-threshold", type=float, default=0.0,
+                        help="Fraction of tickers allowed to fail before exiting non-zero (default: none).")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    summary = ingest_batch(
+        tickers or DEFAULT_TICKERS, incremental=not args.full, max_workers=args.workers,
+        requests_per_second=args.rate, max_retries=args.retries
+    )
+    print_summary(summary)
+    sys.exit(exit_code(summary, args.fail_threshold))
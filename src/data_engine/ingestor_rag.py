@@ -1,19 +1,228 @@
 # src/data_engine/ingestor_rag.py
+"""
+Indexes filings (10-K text/HTML/PDF) into per-ticker Chroma collections.
 
-from langchain_core.documents import Document
-# --- CHANGED: Use Local Embeddings instead of OpenAI ---
-from langchain_community.embeddings import HuggingFaceEmbeddings 
-from langchain_community.vectorstores import Chroma
+Files are streamed block by block through a reader and a sliding-window chunker,
+so a 100 MB inline-XBRL filing never sits in memory whole. Chunk ids are content
+hashes: re-ingesting an unchanged (or partly changed) filing only embeds chunks
+the collection doesn't already hold. New chunks are embedded and upserted in
+batches of `batch_size`.
+"""
+import argparse
+import hashlib
+import time
+from html.parser import HTMLParser
+from pathlib import Path
 from src.config import VECTOR_DB_DIR
-import shutil
-import os
+
+CHUNK_SIZE = 1000         # characters
+CHUNK_OVERLAP = 150
+EMBED_BATCH_SIZE = 256
+READ_BLOCK_SIZE = 1 << 16
+SUPPORTED_SUFFIXES = {".txt", ".md", ".htm", ".html", ".pdf"}
+
+# --- Streaming readers ---
+
+def _read_text(path: Path, block_size: int):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while block := f.read(block_size):
+            yield block
+
+class _HTMLText(HTMLParser):
+    """Collects visible text, dropping scripts/styles and breaking lines at block tags."""
+    SKIP = {"script", "style", "head", "title"}
+    BREAKS = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "h5", "h6", "table", "section"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        elif tag in self.BREAKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.BREAKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def drain(self) -> str:
+        text, self.parts = "".join(self.parts), []
+        return text
+
+def _read_html(path: Path, block_size: int):
+    parser = _HTMLText()
+    for block in _read_text(path, block_size):
+        parser.feed(block)
+        yield parser.drain()
+    parser.close()
+    yield parser.drain()
+
+def _read_pdf(path: Path, block_size: int):
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("PDF ingestion needs pypdf (pip install pypdf)") from e
+    # Pages are parsed on demand, one at a time
+    for page in PdfReader(str(path)).pages:
+        yield (page.extract_text() or "") + "\n"
+
+def iter_text_blocks(path, block_size: int = READ_BLOCK_SIZE):
+    """Yields the document's plain text in pieces, whatever the file format."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in (".htm", ".html"):
+        return _read_html(path, block_size)
+    if suffix == ".pdf":
+        return _read_pdf(path, block_size)
+    return _read_text(path, block_size)
+
+# --- Chunking ---
+
+def _cut_point(buf: str, chunk_size: int) -> int:
+    """Ends a chunk at the last sentence/line break in its second half, else at a space."""
+    window = buf[:chunk_size]
+    for sep in ("\n", ". ", " "):
+        pos = window.rfind(sep, chunk_size // 2)
+        if pos != -1:
+            return pos + len(sep)
+    return chunk_size
+
+def chunk_stream(blocks, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    """
+    Sliding-window chunker over a stream of text blocks. Yields (offset, text) with
+    whitespace collapsed; the output doesn't depend on how the input was split into blocks.
+    """
+    buf, offset = "", 0
+
+    def cut():
+        nonlocal buf, offset
+        end = _cut_point(buf, chunk_size)
+        text = " ".join(buf[:end].split())
+        # Next chunk starts `overlap` chars back, moved forward to a word boundary
+        step = max(end - overlap, 1)
+        space = buf.find(" ", step, end)
+        step = space + 1 if space != -1 else step
+        emitted = offset
+        buf, offset = buf[step:], offset + step
+        return emitted, text
+
+    for block in blocks:
+        buf += block
+        while len(buf) >= chunk_size:
+            emitted, text = cut()
+            if text:
+                yield emitted, text
+    text = " ".join(buf.split())
+    if text:
+        yield offset, text
+
+def chunk_id(text: str) -> str:
+    """Content hash used as the Chroma id: identical chunks map to the same id."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+# --- Indexing ---
+
+def get_collection(ticker: str):
+    from langchain_community.vectorstores import Chroma
+    from src.data_engine.embeddings import get_embedding_model
+    return Chroma(
+        persist_directory=str(VECTOR_DB_DIR),
+        embedding_function=get_embedding_model(),
+        collection_name=f"{ticker}_10k"
+    )
+
+def _batches(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def index_chunks(store, chunks, batch_size: int = EMBED_BATCH_SIZE, verbose: bool = True) -> dict:
+    """
+    Upserts (text, metadata) chunks into a vector store, embedding only ids it doesn't hold.
+    Returns {"chunks", "embedded", "skipped", "seconds", "chunks_per_sec"}.
+    """
+    stats = {"chunks": 0, "embedded": 0, "skipped": 0}
+    seen = set()
+    started = time.perf_counter()
+    for batch in _batches(chunks, batch_size):
+        # 1. Drop duplicates within this run, then ask the store which ids it already has
+        fresh = {}
+        for text, meta in batch:
+            cid = chunk_id(text)
+            if cid not in seen:
+                seen.add(cid)
+                fresh[cid] = (text, meta)
+        existing = set(store.get(ids=list(fresh), include=[])["ids"]) if fresh else set()
+        new_ids = [cid for cid in fresh if cid not in existing]
+
+        # 2. One embedding call + one upsert for everything new in the batch
+        if new_ids:
+            store.add_texts(
+                texts=[fresh[cid][0] for cid in new_ids],
+                metadatas=[fresh[cid][1] for cid in new_ids],
+                ids=new_ids
+            )
+
+        stats["chunks"] += len(batch)
+        stats["embedded"] += len(new_ids)
+        stats["skipped"] += len(batch) - len(new_ids)
+        elapsed = time.perf_counter() - started
+        if verbose:
+            print(f"   {stats['chunks']} chunks ({stats['embedded']} embedded, {stats['skipped']} unchanged)"
+                  f" · {stats['chunks'] / elapsed if elapsed else 0:.0f} chunks/s")
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["chunks_per_sec"] = round(stats["chunks"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
+
+def _expand(paths) -> list:
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files += sorted(f for f in p.rglob("*") if f.suffix.lower() in SUPPORTED_SUFFIXES)
+        else:
+            files.append(p)
+    return files
+
+def ingest_filings(ticker: str, paths, batch_size: int = EMBED_BATCH_SIZE,
+                   chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP, store=None) -> dict:
+    """Streams every file (or directory of files) into the ticker's collection."""
+    ticker = ticker.upper()
+    files = _expand(paths)
+    print(f"📚 Indexing {len(files)} file(s) for {ticker}...")
+    store = store or get_collection(ticker)
+
+    def chunks():
+        for path in files:
+            for i, (offset, text) in enumerate(chunk_stream(iter_text_blocks(path), chunk_size, overlap)):
+                yield text, {"ticker": ticker, "source": path.name, "chunk": i, "offset": offset}
+
+    stats = index_chunks(store, chunks(), batch_size)
+    stats["files"] = len(files)
+    print(f"✅ {stats['embedded']} new chunks embedded, {stats['skipped']} unchanged "
+          f"({stats['chunks_per_sec']} chunks/s).")
+    return stats
 
 def ingest_mock_data(ticker: str):
     """
     Creates a dummy knowledge base for testing using Free Local Embeddings.
     """
     print(f"📚 Indexing mock data for {ticker}...")
-    
+
     # 1. Define Dummy Data
     texts = [
         f"{ticker} reported a 10% increase in revenue due to AI adoption.",
@@ -21,27 +230,21 @@ def ingest_mock_data(ticker: str):
         f"{ticker} is facing a lawsuit regarding patent infringement.",
         f"Analysts project {ticker} will expand into the automotive sector next year."
     ]
-    
-    docs = [Document(page_content=t) for t in texts]
-    
-    # 2. Initialize Free Embeddings (Runs on your CPU)
-    print("   Loading local embedding model (all-MiniLM-L6-v2)...")
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    
-    # 3. CRITICAL: Clean up old OpenAI DB to prevent conflicts
-    # If you try to mix OpenAI vectors with HuggingFace vectors, it crashes.
-    collection_name = f"{ticker}_10k"
-    
-    # Create the Vector Database
-    print(f"   Saving to {VECTOR_DB_DIR}...")
-    Chroma.from_documents(
-        documents=docs, 
-        embedding=embeddings, 
-        persist_directory=str(VECTOR_DB_DIR),
-        collection_name=collection_name
-    )
-    print("✅ Vector DB populated successfully (Free Mode).")
+    chunks = [(t, {"ticker": ticker, "source": "mock", "chunk": i, "offset": 0}) for i, t in enumerate(texts)]
+
+    stats = index_chunks(get_collection(ticker), chunks, verbose=False)
+    print(f"✅ Vector DB populated successfully (Free Mode): {stats['embedded']} new chunks.")
 
 if __name__ == "__main__":
-    # Test with Apple
-    ingest_mock_data("AAPL")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Index 10-K filings (txt/html/pdf) for the research agent.")
+    parser.add_argument("ticker", help="Ticker whose collection receives the chunks, e.g. AAPL")
+    parser.add_argument("paths", nargs="*", help="Files or directories to index (omit for mock data)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Chunks per embedding call")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Characters per chunk")
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP, help="Characters shared by neighbouring chunks")
+    args = parser.parse_args()
+
+    if args.paths:
+        ingest_filings(args.ticker, args.paths, args.batch_size, args.chunk_size, args.overlap)
+    else:
+        ingest_mock_data(args.ticker.upper())
@@ -0,0 +1,167 @@
+# src/data_engine/price_store.py
+"""
+Columnar price store: one Arrow IPC file per ticker under data/prices/.
+
+Files are memory-mapped on read so OHLCV columns come back without copying
+through SQL rows. Enable it with FINSIGHT_PRICE_STORE=arrow; the functions in
+database.py keep the same API and route here automatically.
+"""
+import os
+import sys
+import json
+import threading
+import pandas as pd
+import pyarrow as pa
+from src.config import PRICE_STORE_DIR
+
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+SCHEMA = pa.schema(
+    [pa.field("Date", pa.timestamp("ns"))] + [pa.field(c, pa.float64()) for c in PRICE_FIELDS]
+)
+
+class ArrowPriceStore:
+    """Stores each ticker's bars as a sorted, date-unique Arrow IPC file."""
+
+    def __init__(self, root=PRICE_STORE_DIR):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, ticker: str):
+        # Symbols like "BRK/B" must not escape the store directory
+        return self.root / f"{ticker.replace(os.sep, '_')}.arrow"
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def tickers(self) -> list:
+        return sorted(p.stem for p in self.root.glob("*.arrow"))
+
+    def _read_table(self, ticker: str):
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+        # Buffers keep the mapping alive, so the columns stay zero-copy views of the file
+        return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+    def read(self, ticker: str, start=None, end=None, columns=None) -> pd.DataFrame:
+        """
+        Returns bars in yfinance layout (Date index, capitalized OHLCV columns).
+        start/end are inclusive; rows are sliced off the sorted file without copying.
+        """
+        columns = list(columns or PRICE_FIELDS)
+        table = self._read_table(ticker)
+        if table is None:
+            return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="Date"))
+
+        if start is not None or end is not None:
+            dates = table.column("Date").to_numpy()
+            lo = 0 if start is None else dates.searchsorted(pd.Timestamp(start).to_datetime64(), "left")
+            hi = len(dates) if end is None else dates.searchsorted(pd.Timestamp(end).to_datetime64(), "right")
+            table = table.slice(lo, max(0, hi - lo))
+
+        df = table.select(["Date"] + columns).to_pandas(split_blocks=True)
+        return df.set_index("Date")
+
+    def last_date(self, ticker: str):
+        table = self._read_table(ticker)
+        if table is None or table.num_rows == 0:
+            return None
+        return table.column("Date")[-1].as_py().date()
+
+    def upsert(self, ticker: str, df: pd.DataFrame) -> dict:
+        """Merges new bars into the ticker's file (new values win). Returns insert/update counts."""
+        incoming = _normalize(df)
+        if incoming.empty:
+            return {"inserted": 0, "updated": 0}
+
+        with self._lock(ticker):
+            existing = self.read(ticker)
+            updated = int(incoming.index.isin(existing.index).sum()) if not existing.empty else 0
+            merged = pd.concat([existing, incoming]) if not existing.empty else incoming
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self._write(ticker, merged)
+
+        return {"inserted": len(incoming) - updated, "updated": updated}
+
+    def delete(self, ticker: str):
+        with self._lock(ticker):
+            self._path(ticker).unlink(missing_ok=True)
+            self._state_path(ticker).unlink(missing_ok=True)
+
+    # --- Streaming indicator state (sidecar JSON next to the bars) ---
+
+    def _state_path(self, ticker: str):
+        return self._path(ticker).with_suffix(".state.json")
+
+    def save_state(self, ticker: str, state: dict):
+        path = self._state_path(ticker)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
+
+    def load_state(self, ticker: str):
+        path = self._state_path(ticker)
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def _write(self, ticker: str, df: pd.DataFrame):
+        table = pa.Table.from_pandas(df.reset_index(), schema=SCHEMA, preserve_index=False)
+        path = self._path(ticker)
+        tmp = path.with_suffix(".arrow.tmp")
+        # Uncompressed IPC so reads can be memory-mapped; rename keeps readers consistent
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, SCHEMA) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerces a yfinance-style frame to a naive, date-unique Date index + OHLCV floats."""
+    if df.empty:
+        return pd.DataFrame(columns=PRICE_FIELDS)
+    if "Date" in df.columns:
+        df = df.set_index("Date")
+    df = df.rename(columns=str.capitalize)[PRICE_FIELDS].astype(float)
+    # One bar per calendar day, matching the SQLite (ticker, date) key
+    dates = pd.to_datetime(df.index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    df.index = pd.DatetimeIndex(dates.normalize(), name="Date").as_unit("ns")
+    return df[~df.index.duplicated(keep="last")]
+
+_store = None
+
+def get_price_store() -> ArrowPriceStore:
+    """Process-wide store instance (shares per-ticker write locks)."""
+    global _store
+    if _store is None:
+        _store = ArrowPriceStore()
+    return _store
+
+def migrate_from_sqlite(store: ArrowPriceStore = None) -> dict:
+    """Copies every ticker in finsight.db into the Arrow store. Returns {ticker: rows}."""
+    from src.data_engine.database import engine
+
+    store = store or get_price_store()
+    df = pd.read_sql(
+        "SELECT ticker, date AS Date, open AS Open, high AS High, low AS Low, "
+        "close AS Close, volume AS Volume FROM stock_prices ORDER BY ticker, date",
+        con=engine, parse_dates=["Date"]
+    )
+    migrated = {}
+    for ticker, rows in df.groupby("ticker", sort=False):
+        store.delete(ticker)
+        store.upsert(ticker, rows.drop(columns="ticker"))
+        migrated[ticker] = len(rows)
+        print(f"✅ Migrated {len(rows)} rows for {ticker}")
+    return migrated
+
+if __name__ == "__main__":
+    # Usage: python -m src.data_engine.price_store migrate
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("Usage: python -m src.data_engine.price_store migrate")
+    result = migrate_from_sqlite()
+    print(f"📦 Moved {sum(result.values())} rows for {len(result)} tickers into {PRICE_STORE_DIR}")
+    print("   Set FINSIGHT_PRICE_STORE=arrow to read from the new store.")
@@ -1,46 +1,135 @@
-import os
-from datetime import datetime, timedelta
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from newsapi import NewsApiClient
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from src.config import logger, SENTIMENT_STALE_AFTER, SENTIMENT_WINDOW_DAYS
+from src.metrics import stage
+from src.data_engine.database import (
+    save_sentiment_logs, get_known_sentiment_hashes, get_sentiment_series,
+    get_recent_headlines, get_sentiment_fetched_at
+)
 
 load_dotenv()
 
-def get_market_sentiment(ticker: str):
+# Shared across calls: VADER loads its lexicon on construction, NewsApiClient holds a session.
+# Both libraries are imported on first use.
+_analyzer = None
+_clients = {}
+_lock = threading.Lock()
+
+def get_analyzer():
+    global _analyzer
+    with _lock:
+        if _analyzer is None:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+            _analyzer = SentimentIntensityAnalyzer()
+        return _analyzer
+
+def _news_client():
     from src.config import NEWS_API_KEY
-    api_key = NEWS_API_KEY
-    if not api_key:
-        return {"score": 0, "label": "Neutral (No Key)", "top_headlines": []}
-    
+    if not NEWS_API_KEY:
+        return None
+    with _lock:
+        if NEWS_API_KEY not in _clients:
+            from newsapi import NewsApiClient
+            _clients[NEWS_API_KEY] = NewsApiClient(api_key=NEWS_API_KEY)
+        return _clients[NEWS_API_KEY]
+
+def label_for(score: float) -> str:
+    if score > 0.15: return "Bullish"
+    elif score < -0.15: return "Bearish"
+    return "Neutral"
+
+def headline_hash(article: dict) -> str:
+    """Stable id for an article: its URL, or the title when NewsAPI gives no URL."""
+    key = (article.get('url') or article.get('title') or '').strip().lower()
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def score_headlines(titles: list) -> list:
+    """Compound VADER scores for a batch of headlines with the shared analyzer."""
+    analyzer = get_analyzer()
+    return [analyzer.polarity_scores(t)['compound'] for t in titles]
+
+def _published_at(article: dict) -> datetime:
+    raw = article.get('publishedAt')
+    try:
+        return datetime.fromisoformat(raw.replace('Z', '+00:00')).astimezone(timezone.utc).replace(tzinfo=None)
+    except (AttributeError, ValueError):
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def refresh_sentiment(ticker: str, force: bool = False) -> dict:
+    """
+    Pulls recent articles from NewsAPI if the stored window is stale, scores only
+    headlines not seen before, and persists them. Returns {"fetched", "new", "stored"}.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    last = get_sentiment_fetched_at(ticker)
+    if not force and last is not None and (now - last).total_seconds() < SENTIMENT_STALE_AFTER:
+        return {"fetched": 0, "new": 0, "stored": 0}
+
+    client = _news_client()
+    if client is None:
+        return {"fetched": 0, "new": 0, "stored": 0}
+
+    start_date = (now - timedelta(days=SENTIMENT_WINDOW_DAYS)).strftime('%Y-%m-%d')
+    with stage("newsapi.get_everything"):
+        response = client.get_everything(q=ticker, from_param=start_date, language='en', sort_by='publishedAt', page_size=100)
+    articles = [a for a in response.get('articles', []) if a.get('title') and "[Removed]" not in a['title']]
+
+    # 1. Dedup: within this response and against what is already stored
+    by_hash = {}
+    for art in articles:
+        by_hash.setdefault(headline_hash(art), art)
+    known = get_known_sentiment_hashes(ticker, list(by_hash))
+    fresh = {h: a for h, a in by_hash.items() if h not in known}
+
+    # 2. Score the new headlines in one batch and store them
+    with stage("sentiment.score"):
+        scores = score_headlines([a['title'] for a in fresh.values()])
+    records = [{
+        "url_hash": h,
+        "url": a.get('url'),
+        "headline": a['title'],
+        "source": (a.get('source') or {}).get('name'),
+        "published_at": _published_at(a),
+        "score": score,
+        "label": label_for(score),
+    } for (h, a), score in zip(fresh.items(), scores)]
+    # The fetch only counts (for SENTIMENT_STALE_AFTER) once its headlines are stored
+    stored = save_sentiment_logs(ticker, records, fetched_at=now)
+    return {"fetched": len(articles), "new": len(fresh), "stored": stored}
+
+def get_market_sentiment(ticker: str):
+    """
+    Sentiment over the last SENTIMENT_WINDOW_DAYS, read from the database
+    (refreshed from NewsAPI first when stale). Includes the daily series.
+    """
+    error = None
     try:
-        newsapi = NewsApiClient(api_key=api_key)
-        start_date = (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d')
-        
-        response = newsapi.get_everything(q=ticker, from_param=start_date, language='en', sort_by='relevancy', page_size=10)
-        articles = response.get('articles', [])
-        
-        if not articles: return {"score": 0, "label": "Neutral", "top_headlines": []}
-        
-        analyzer = SentimentIntensityAnalyzer()
-        total_score = 0
-        headlines = []
-        
-        for art in articles:
-            title = art.get('title', '')
-            if "[Removed]" in title: continue
-            headlines.append(title)
-            total_score += analyzer.polarity_scores(title)['compound']
-            
-        avg_score = total_score / len(headlines) if headlines else 0
-        
-        if avg_score > 0.15: label = "Bullish"
-        elif avg_score < -0.15: label = "Bearish"
-        else: label = "Neutral"
-        
-        return {
-            "score": round(avg_score, 3),
-            "label": label,
-            "top_headlines": headlines[:3]
-        }
+        refresh_sentiment(ticker)
     except Exception as e:
-        return {"score": 0, "label": "Error", "top_headlines": [str(e)]}
\ No newline at end of file
+        # Serve whatever is stored; only report the error if there is nothing to show
+        logger.warning(f"Sentiment refresh failed for {ticker}: {e}")
+        error = str(e)
+
+    start = (datetime.now(timezone.utc) - timedelta(days=SENTIMENT_WINDOW_DAYS)).date()
+    daily = get_sentiment_series(ticker, start=start)
+    if daily.empty:
+        if error:
+            return {"score": 0, "label": "Error", "top_headlines": [error], "daily": []}
+        label = "Neutral" if _news_client() else "Neutral (No Key)"
+        return {"score": 0, "label": label, "top_headlines": [], "daily": []}
+
+    # Headline-weighted mean over the window (same as averaging every headline)
+    avg_score = float((daily['score'] * daily['count']).sum() / daily['count'].sum())
+    headlines = get_recent_headlines(ticker, start=start, limit=3)
+
+    return {
+        "score": round(avg_score, 3),
+        "label": label_for(avg_score),
+        "top_headlines": [h['headline'] for h in headlines],
+        "daily": [
+            {"date": str(d.date()), "score": round(float(r['score']), 3), "count": int(r['count'])}
+            for d, r in daily.iterrows()
+        ]
+    }
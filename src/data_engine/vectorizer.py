@@ -1,32 +1,86 @@
-import streamlit as st
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from src.config import VECTOR_DB_DIR
+from src.metrics import stage
+# Loaded once per process (UI, API or script alike); see embeddings.py for backends
+from src.data_engine.embeddings import get_embedding_model
 
-# --- CACHING OPTIMIZATION ---
-@st.cache_resource
-def get_embedding_model():
+# Named topics expand to fuller queries; anything else is searched verbatim
+TOPIC_QUERIES = {
+    "risks": "key risk factors and uncertainties that could hurt the business",
+    "growth": "revenue growth drivers, new products and expansion plans",
+    "litigation": "lawsuits, legal proceedings and regulatory investigations",
+}
+
+# One client per process; collection handles are reused across queries
+_client = None
+_collections = {}
+_lock = threading.Lock()
+_search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="finsight-rag")
+
+def _get_collection(ticker: str):
+    """Cached handle to the ticker's Chroma collection (raises if it was never ingested)."""
+    global _client
+    name = f"{ticker}_10k"
+    with _lock:
+        if name not in _collections:
+            if _client is None:
+                import chromadb
+                _client = chromadb.PersistentClient(path=str(VECTOR_DB_DIR))
+            # Missing collections aren't cached, so a later ingestion is picked up
+            _collections[name] = _client.get_collection(name)
+        return _collections[name]
+
+def _query_collection(ticker: str, embeddings: list, k: int) -> list:
+    """All query vectors against one collection in a single call -> one hit list per query."""
+    res = _get_collection(ticker).query(
+        query_embeddings=embeddings, n_results=k, include=["documents", "metadatas", "distances"]
+    )
+    hits = []
+    for ids, docs, metas, dists in zip(res["ids"], res["documents"], res["metadatas"], res["distances"]):
+        hits.append([{
+            "id": i,
+            "text": doc,
+            # MiniLM vectors are unit length, so Chroma's squared L2 maps to cosine similarity
+            "score": round(1 - dist / 2, 4),
+            "distance": dist,
+            "metadata": meta or {},
+        } for i, doc, meta, dist in zip(ids, docs, metas, dists)])
+    return hits
+
+def search_filings(tickers: list, topics=("risks",), k: int = 3) -> dict:
     """
-    Loads the model once and keeps it in memory.
-    Using a smaller model (paraphrase-MiniLM) to save RAM.
+    Searches several tickers' filings for several topics at once.
+    The queries are embedded in one batch, each collection is queried once (all
+    topics together) and collections are searched concurrently.
+    Returns {"results": {ticker: {topic: [hit, ...]}}, "errors": {ticker: reason}}.
     """
-    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    topics = list(dict.fromkeys(topics))
+    with stage("rag.embed_queries"):
+        vectors = get_embedding_model().embed_documents([TOPIC_QUERIES.get(t, t) for t in topics])
 
-def get_fundamental_analysis(ticker: str, query="risks"):
+    with stage("rag.query"):
+        futures = {t: _search_pool.submit(_query_collection, t, vectors, k) for t in tickers}
+        results, errors = {}, {}
+        for ticker, future in futures.items():
+            try:
+                results[ticker] = dict(zip(topics, future.result()))
+            except Exception as e:
+                errors[ticker] = str(e)
+    return {"results": results, "errors": errors}
+
+def get_fundamental_analysis(ticker: str, query="risks", k: int = 2):
     try:
-        # 1. Get the cached model
-        embeddings = get_embedding_model()
-        
-        # 2. Connect to DB
-        db = Chroma(
-            persist_directory=str(VECTOR_DB_DIR), 
-            embedding_function=embeddings, 
-            collection_name=f"{ticker}_10k"
-        )
-        
-        # 3. Search
-        docs = db.similarity_search(query, k=2)
-        return {"relevant_text": "\n".join([d.page_content for d in docs]) if docs else "No docs found."}
-        
+        found = search_filings([ticker], [query], k=k)
+        if found["errors"]:
+            raise RuntimeError(next(iter(found["errors"].values())))
+
+        hits = found["results"][ticker.upper()][query]
+        return {
+            "relevant_text": "\n".join(h["text"] for h in hits) if hits else "No docs found.",
+            "matches": hits
+        }
+
     except Exception as e:
-        return {"relevant_text": f"Error retrieving docs: {str(e)}"}
\ No newline at end of file
+        return {"relevant_text": f"Error retrieving docs: {str(e)}", "matches": []}
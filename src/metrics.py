@@ -0,0 +1,190 @@
+# src/metrics.py
+"""
+Process-wide counters and latency histograms, exported in the Prometheus text format.
+
+Code marks its expensive steps with `stage("db.get_stock_data")` (a context manager)
+or `@instrumented("...")`; each stage feeds finsight_stage_seconds plus call/error
+counters. Caches report lookups with `cache_lookup(name, hit)` and fallbacks with
+`fallback(source)`. When a request trace is active (the API starts one per request)
+the same stage timings are also collected for that request, which is what the
+Server-Timing header is built from. Work handed to thread pools keeps the trace only
+if it is submitted with contextvars.copy_context().run.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+# Prometheus' default buckets, plus finer ones for sub-millisecond SQLite/cache hits
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_str(labels: tuple, values: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in zip(labels, values)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(k, "") for k in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(k, "") for k in self.labels), 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.labels, key)} {value:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}     # label values -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(k, "") for k in self.labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(labels.get(k, "") for k in self.labels))
+        return series[-2] if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, n in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_label_str(self.labels + ('le',), key + (f'{bound:g}',))} {n}")
+                lines.append(f"{self.name}_bucket{_label_str(self.labels + ('le',), key + ('+Inf',))} {series[-2]}")
+                lines.append(f"{self.name}_count{_label_str(self.labels, key)} {series[-2]}")
+                lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {series[-1]:.6f}")
+        return lines
+
+# --- Registry ---
+
+_metrics = {}
+_registry_lock = threading.Lock()
+
+def _register(cls, name, help, labels=(), **kwargs):
+    with _registry_lock:
+        if name not in _metrics:
+            _metrics[name] = cls(name, help, labels, **kwargs)
+        return _metrics[name]
+
+def counter(name: str, help: str, labels: tuple = ()) -> Counter:
+    return _register(Counter, name, help, labels)
+
+def histogram(name: str, help: str, labels: tuple = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, help, labels, buckets=buckets)
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _registry_lock:
+        metrics = list(_metrics.values())
+    return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+STAGE_SECONDS = histogram("finsight_stage_seconds", "Latency of instrumented stages", ("stage",))
+STAGE_CALLS = counter("finsight_stage_calls_total", "Calls per instrumented stage", ("stage",))
+STAGE_ERRORS = counter("finsight_stage_errors_total", "Stages that raised or returned a degraded result", ("stage",))
+CACHE_LOOKUPS = counter("finsight_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+FALLBACKS = counter("finsight_fallbacks_total", "Requests served from a fallback source", ("source",))
+
+# --- Per-request traces ---
+
+class Trace:
+    """Stage timings collected while one request is being served."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []      # (stage, seconds) in completion order
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.stages.append((name, seconds))
+
+    def summary(self) -> dict:
+        """{stage: {"ms": total milliseconds, "calls": n}} in first-seen order."""
+        out = {}
+        with self._lock:
+            for name, seconds in self.stages:
+                entry = out.setdefault(name, {"ms": 0.0, "calls": 0})
+                entry["ms"] += seconds * 1000
+                entry["calls"] += 1
+        return {k: {"ms": round(v["ms"], 2), "calls": v["calls"]} for k, v in out.items()}
+
+    def server_timing(self, total: float = None) -> str:
+        """Server-Timing header value, e.g. 'db.get_stock_data;dur=1.8, features;dur=12.4, total;dur=15.0'."""
+        parts = [f"{name};dur={s['ms']:.2f}" + (f';desc="x{s["calls"]}"' if s["calls"] > 1 else "")
+                 for name, s in self.summary().items()]
+        if total is not None:
+            parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+_current_trace = ContextVar("finsight_trace", default=None)
+
+def start_trace() -> Trace:
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+def current_trace():
+    return _current_trace.get()
+
+# --- Hooks used by the rest of the code ---
+
+def observe(name: str, seconds: float, error: bool = False):
+    """Records one finished stage (histogram, counters and the active trace)."""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    STAGE_CALLS.inc(stage=name)
+    if error:
+        STAGE_ERRORS.inc(stage=name)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        observe(name, time.perf_counter() - started, error=True)
+        raise
+    observe(name, time.perf_counter() - started)
+
+def instrumented(name: str):
+    """Decorator form of stage()."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+def fallback(source: str):
+    FALLBACKS.inc(source=source)
@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
+from src.config import CHART_MAX_POINTS
+from src.ml_engine.chart_payload import chart_series
 
-def run_backtest(df: pd.DataFrame, initial_capital=10000):
+def run_backtest(df: pd.DataFrame, initial_capital=10000, max_points=CHART_MAX_POINTS):
     """
     Simulates a trading strategy on historical data.
     Strategy: Golden Cross (SMA 50 > SMA 200 = BUY, else SELL/CASH).
+    The equity curves are downsampled to max_points for charting (None keeps every day).
     """
     # Work on a copy to avoid SettingWithCopy warnings
     df = df.copy()
@@ -49,9 +52,17 @@ def run_backtest(df: pd.DataFrame, initial_capital=10000):
         "final_strategy_equity": round(final_strategy, 2),
         "market_return_pct": round(market_perf, 2),
         "strategy_return_pct": round(strategy_perf, 2),
-        "comparison_data": {
-            "dates": df.index.astype(str).tolist(),
-            "market_curve": df['Market_Equity'].tolist(),
-            "strategy_curve": df['Strategy_Equity'].tolist()
-        }
-    }
\ No newline at end of file
+        "comparison_data": chart_series(df.index, {
+            "market_curve": df['Market_Equity'],
+            "strategy_curve": df['Strategy_Equity']
+        }, max_points)
+    }
+
+def backtest_ticker(ticker: str, initial_capital=10000, max_points=CHART_MAX_POINTS):
+    """run_backtest on the ticker's stored bars (indicators from the feature cache)."""
+    from src.data_engine.database import get_stock_data
+    from src.ml_engine.feature_store import get_features
+    df = get_stock_data(ticker)
+    if df.empty:
+        return {"error": f"No stored data for {ticker} (run the ingestor first)."}
+    return run_backtest(get_features(ticker, df), initial_capital, max_points)
@@ -0,0 +1,110 @@
+# src/ml_engine/chart_payload.py
+"""
+Bounded, compact chart series for the API and the dashboard.
+
+chart_series() downsamples aligned curves with Largest-Triangle-Three-Buckets:
+one shared set of dates is kept (first and last always included), picked to
+preserve the visual shape of all curves together, so a 20-year equity curve
+becomes CHART_MAX_POINTS points that plot the same peaks and drawdowns.
+
+compact_payload() rewrites every {"dates": [...], <name>: [...]} block of a
+response as little-endian float32 columns and int32 epoch-day dates, base64
+encoded (about a quarter of the JSON size). chart_columns() reads either form,
+so renderers never need to know which one they were given.
+"""
+import base64
+import numpy as np
+import pandas as pd
+from src.config import CHART_MAX_POINTS
+
+COMPACT_FORMAT = "f32-b64/epoch-day"
+
+def lttb_indices(ys, n_out: int) -> np.ndarray:
+    """
+    Positions kept by LTTB for one or more equally spaced series (rows of `ys`).
+    Each series is scaled to its own range first so no curve dominates the choice.
+    """
+    ys = np.atleast_2d(np.asarray(ys, dtype=float))
+    n = ys.shape[1]
+    if not n_out or n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    low = np.nanmin(ys, axis=1, keepdims=True)
+    span = np.nanmax(ys, axis=1, keepdims=True) - low
+    span[~(span > 0)] = 1.0
+    ys = np.nan_to_num((ys - low) / span)
+    x = np.arange(n, dtype=float)
+
+    # n_out - 2 buckets between the fixed first and last points
+    bounds = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(int) + 1
+    bounds[-1] = n - 1
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        # Third vertex: mean of the next bucket (the last point for the final bucket)
+        nlo, nhi = (hi, bounds[i + 2]) if i + 2 < len(bounds) else (n - 1, n)
+        cx, cy = x[nlo:nhi].mean(), ys[:, nlo:nhi].mean(axis=1, keepdims=True)
+        ax, ay = x[a], ys[:, a:a + 1]
+        area = np.abs((ax - cx) * (ys[:, lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay)).sum(axis=0)
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def chart_series(index, columns: dict, max_points: int = CHART_MAX_POINTS) -> dict:
+    """{"dates": [...], name: [...]} for aligned curves, LTTB-downsampled to max_points."""
+    values = {name: np.asarray(v, dtype=float) for name, v in columns.items()}
+    keep = lttb_indices(np.vstack(list(values.values())), max_points)
+    return {
+        "dates": pd.Index(index)[keep].astype(str).tolist(),
+        **{name: v[keep].tolist() for name, v in values.items()}
+    }
+
+# --- Compact encoding ---
+
+def _b64(array: np.ndarray) -> str:
+    return base64.b64encode(array.tobytes()).decode("ascii")
+
+def _epoch_days(dates) -> np.ndarray:
+    # The exchange-local date is the first 10 chars, with or without yfinance's time/UTC offset
+    return np.array([str(d)[:10] for d in dates], dtype="datetime64[D]").astype("<i4")
+
+def encode_columns(columns: dict) -> dict:
+    """One chart block -> {"format", "length", "dates", "columns": {name: base64 float32}}."""
+    days = _epoch_days(columns["dates"])
+    return {
+        "format": COMPACT_FORMAT,
+        "length": len(days),
+        "dates": _b64(days),
+        "columns": {name: _b64(np.asarray(v, dtype="<f4")) for name, v in columns.items() if name != "dates"},
+    }
+
+def decode_columns(block: dict) -> dict:
+    """Inverse of encode_columns: datetime64[D] dates and float64 arrays."""
+    out = {"dates": np.frombuffer(base64.b64decode(block["dates"]), dtype="<i4").astype("datetime64[D]")}
+    for name, raw in block["columns"].items():
+        out[name] = np.frombuffer(base64.b64decode(raw), dtype="<f4").astype(float)
+    return out
+
+def _is_chart_block(value) -> bool:
+    if not isinstance(value, dict) or not isinstance(value.get("dates"), list) or len(value) < 2:
+        return False
+    n = len(value["dates"])
+    return all(isinstance(v, list) and len(v) == n for v in value.values())
+
+def compact_payload(payload):
+    """Copy of a response with every chart block compact-encoded (other fields untouched)."""
+    if _is_chart_block(payload):
+        return encode_columns(payload)
+    if isinstance(payload, dict):
+        return {k: compact_payload(v) for k, v in payload.items()}
+    if isinstance(payload, list):
+        return [compact_payload(v) for v in payload]
+    return payload
+
+def chart_columns(block: dict) -> dict:
+    """A chart block ready for plotting, whether it arrived as JSON lists or compact-encoded."""
+    if block and block.get("format") == COMPACT_FORMAT:
+        return decode_columns(block)
+    return block
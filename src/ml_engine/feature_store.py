@@ -0,0 +1,139 @@
+# src/ml_engine/feature_store.py
+"""
+On-disk cache of computed indicator frames (the output of add_technical_indicators).
+
+Entries live under data/features/<TICKER>/ and are keyed by the ticker, the last
+bar date, and a digest of the indicator parameters plus the input's shape
+(first bar, row count, last close), so a different history window or a revised
+last bar never returns a stale frame. Ingestion calls invalidate() for the
+tickers it touched; the least recently used entries are evicted once the cache
+exceeds its entry or byte budget.
+"""
+import json
+import os
+import hashlib
+import shutil
+import threading
+import pandas as pd
+from src.config import logger, FEATURE_CACHE_DIR, FEATURE_CACHE_MAX_ENTRIES, FEATURE_CACHE_MAX_BYTES
+from src.ml_engine.features import add_technical_indicators, INDICATOR_PARAMS
+from src.metrics import cache_lookup
+
+# Bump when add_technical_indicators changes in a way the parameters don't capture
+FEATURE_VERSION = 1
+
+def _bar_dates(df: pd.DataFrame):
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df.index
+    if 'Date' in df.columns:
+        return pd.DatetimeIndex(pd.to_datetime(df['Date'], utc=True))
+    return None
+
+class FeatureStore:
+    """Disk-backed LRU cache of indicator frames."""
+
+    def __init__(self, root=FEATURE_CACHE_DIR, max_entries=FEATURE_CACHE_MAX_ENTRIES,
+                 max_bytes=FEATURE_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.params_hash = hashlib.sha1(
+            json.dumps({"v": FEATURE_VERSION, **INDICATOR_PARAMS}, sort_keys=True).encode()
+        ).hexdigest()[:12]
+
+    def _ticker_dir(self, ticker: str):
+        return self.root / ticker.replace(os.sep, '_')
+
+    def key(self, ticker: str, df: pd.DataFrame):
+        """Cache path for this ticker/input, or None if the frame has no usable dates."""
+        dates = _bar_dates(df)
+        if dates is None or df.empty:
+            return None
+        fingerprint = f"{self.params_hash}|{dates[0]}|{len(df)}|{float(df['Close'].iloc[-1])!r}"
+        digest = hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+        return self._ticker_dir(ticker) / f"{dates[-1]:%Y-%m-%d}_{digest}.pkl"
+
+    def get_or_compute(self, ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Returns add_technical_indicators(df), reading it from disk when already computed."""
+        path = self.key(ticker, df)
+        if path is None:
+            return add_technical_indicators(df)
+
+        if path.exists():
+            try:
+                features = pd.read_pickle(path)
+                os.utime(path)   # mark as recently used
+                with self._lock:
+                    self.hits += 1
+                cache_lookup("features", True)
+                return features
+            except Exception as e:
+                logger.warning(f"Dropping unreadable feature cache entry {path.name}: {e}")
+                path.unlink(missing_ok=True)
+
+        with self._lock:
+            self.misses += 1
+        cache_lookup("features", False)
+        features = add_technical_indicators(df)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        features.to_pickle(tmp)
+        os.replace(tmp, path)
+        self._evict()
+        return features
+
+    def invalidate(self, ticker: str):
+        """Drops every cached frame for a ticker (called after its bars change)."""
+        shutil.rmtree(self._ticker_dir(ticker), ignore_errors=True)
+
+    def _entries(self):
+        entries = []
+        for path in self.root.glob("*/*.pkl"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+_store = None
+
+def get_feature_store() -> FeatureStore:
+    """Process-wide cache instance (hit/miss counters are per process)."""
+    global _store
+    if _store is None:
+        _store = FeatureStore()
+    return _store
+
+def get_features(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Read-through helper used by the forecasting, backtest and training paths."""
+    return get_feature_store().get_or_compute(ticker, df)
+
+def invalidate_features(ticker: str):
+    get_feature_store().invalidate(ticker)
@@ -4,25 +4,42 @@ from ta.momentum import RSIIndicator
 from ta.trend import SMAIndicator, MACD
 from ta.volatility import BollingerBands, AverageTrueRange
 
+# Window settings shared by every indicator implementation (batch, streaming, panel).
+# The sma_50 / sma_200 column names are part of the API, so change "sma_fast"/"sma_slow" with care.
+INDICATOR_PARAMS = {
+    "rsi_window": 14,
+    "macd_fast": 12, "macd_slow": 26, "macd_sign": 9,
+    "sma_fast": 50, "sma_slow": 200,
+    "bb_window": 20, "bb_dev": 2,
+    "atr_window": 14,
+}
+
+INDICATOR_COLUMNS = ['rsi', 'macd', 'macd_signal', 'sma_50', 'sma_200', 'bb_high', 'bb_low', 'atr']
+
+# Default model inputs. Trained artifacts record their own list (see model_registry.py),
+# so inference always uses the order the model was fitted with.
+MODEL_FEATURES = ['Close', 'rsi', 'macd', 'macd_signal', 'sma_50', 'sma_200', 'atr']
+
 def add_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """Adds RSI, MACD, and SMAs to the dataframe."""
     if df.empty: return df
     
     df = df.copy() # Avoid SettingWithCopy warnings
+    p = INDICATOR_PARAMS
     
     # 1. Trend & Momentum
-    df['rsi'] = RSIIndicator(close=df['Close'], window=14).rsi()
-    macd = MACD(close=df['Close'])
+    df['rsi'] = RSIIndicator(close=df['Close'], window=p['rsi_window']).rsi()
+    macd = MACD(close=df['Close'], window_slow=p['macd_slow'], window_fast=p['macd_fast'], window_sign=p['macd_sign'])
     df['macd'] = macd.macd()
     df['macd_signal'] = macd.macd_signal()
-    df['sma_50'] = SMAIndicator(close=df['Close'], window=50).sma_indicator()
-    df['sma_200'] = SMAIndicator(close=df['Close'], window=200).sma_indicator()
+    df['sma_50'] = SMAIndicator(close=df['Close'], window=p['sma_fast']).sma_indicator()
+    df['sma_200'] = SMAIndicator(close=df['Close'], window=p['sma_slow']).sma_indicator()
     
     # 2. Volatility
-    bb = BollingerBands(close=df['Close'], window=20, window_dev=2)
+    bb = BollingerBands(close=df['Close'], window=p['bb_window'], window_dev=p['bb_dev'])
     df['bb_high'] = bb.bollinger_hband()
     df['bb_low'] = bb.bollinger_lband()
-    df['atr'] = AverageTrueRange(high=df['High'], low=df['Low'], close=df['Close']).average_true_range()
+    df['atr'] = AverageTrueRange(high=df['High'], low=df['Low'], close=df['Close'], window=p['atr_window']).average_true_range()
     
     df.dropna(inplace=True)
     return df
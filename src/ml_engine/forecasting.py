@@ -1,10 +1,11 @@
-import yfinance as yf
 import pandas as pd
-import joblib
 from src.config import logger
-from src.config import MODEL_PATH
-from src.ml_engine.features import add_technical_indicators, interpret_signals
-from src.data_engine.database import get_stock_data # <--- Reads from your SQL DB
+from src.metrics import stage, fallback
+from src.ml_engine.features import interpret_signals
+from src.ml_engine.feature_store import get_features
+from src.ml_engine.model_registry import get_model_registry
+from src.ml_engine.panel import build_panel, compute_panel_indicators, ticker_frame
+from src.data_engine.database import get_stock_data, get_stock_data_bulk # <--- Reads from your SQL DB
 
 def get_technical_analysis(ticker: str, period="1y"):
     """
@@ -20,14 +21,20 @@ def get_technical_analysis(ticker: str, period="1y"):
     # If DB is empty or missing this ticker, fallback to API (Slow but reliable)
     if df.empty:
         print(f"⚠️ {ticker} not found in Database. Fetching live from Yahoo Finance...")
-        stock = yf.Ticker(ticker)
-        df = stock.history(period="2y") # Fetch enough for 200 SMA
+        fallback("yfinance")
+        with stage("yfinance.history"):
+            import yfinance as yf   # only this fallback needs it; keeps API start-up light
+            stock = yf.Ticker(ticker)
+            df = stock.history(period="2y") # Fetch enough for 200 SMA
     
     if df.empty:
         return {"error": f"No data found for {ticker} (Check symbol or internet)."}
 
-    # 2. Add Technical Indicators (RSI, MACD, Bollinger, ATR, etc.)
-    df = add_technical_indicators(df)
+    # 2. Add Technical Indicators (RSI, MACD, Bollinger, ATR, etc.) - cached on disk
+    with stage("features"):
+        df = get_features(ticker, df)
+    if df.empty:
+        return {"error": f"Not enough history for {ticker} to compute indicators."}
     
     # Filter data based on requested period to keep payload light
     # (But keep enough buffer for lookback calculations if needed later)
@@ -38,23 +45,29 @@ def get_technical_analysis(ticker: str, period="1y"):
     latest = df.iloc[-1]
     
     # 3. Machine Learning Inference
+    # The registry keeps models in memory (per-ticker first, shared fallback)
     pred_msg = "Model not loaded."
-    if MODEL_PATH.exists():
+    artifact = get_model_registry().get(ticker)
+    if artifact is not None:
         try:
-            model = joblib.load(MODEL_PATH)
-            
-            # CRITICAL: Feature order must match training exactly
-            features = ['Close', 'rsi', 'macd', 'macd_signal', 'sma_50', 'sma_200', 'atr']
-            
+            # Feature order comes from the artifact's metadata, checked at load time
             # Reshape for Sklearn/XGBoost (1 row, N columns)
-            input_df = pd.DataFrame([latest[features]])
+            input_df = pd.DataFrame([latest[artifact.features]])
             
-            pred = model.predict(input_df)[0]
+            with stage("inference"):
+                pred = artifact.model.predict(input_df)[0]
             pred_msg = f"ML Model predicts next Close: ${pred:.2f}"
         except Exception as e:
             print(f"⚠️ Model Inference Failed: {e}")
             pred_msg = f"Model Error: {str(e)}"
     
+    with stage("payload"):
+        return _build_analysis(df, pred_msg)
+
+def _build_analysis(df: pd.DataFrame, pred_msg: str) -> dict:
+    """Metrics cards, text signals and chart series from an indicator frame."""
+    latest = df.iloc[-1]
+    
     # 4. Build Metrics Dictionary (For the UI Cards)
     metrics = {
         "current_price": float(latest['Close']),
@@ -93,6 +106,67 @@ def get_technical_analysis(ticker: str, period="1y"):
         "chart_data": chart_data
     }
 
+def analyze_batch(tickers: list, period="1y") -> dict:
+    """
+    get_technical_analysis for many tickers at once.
+
+    Prices come from one bulk query, indicators from one panel computation, and
+    the ML step runs a single predict() per distinct model (normally just the
+    shared one) over the stacked latest rows. Tickers that fail are reported in
+    "errors" without affecting the rest. Unlike the single-ticker path there is
+    no live Yahoo fallback: tickers must already be ingested.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    errors = {}
+
+    # 1. Bulk load + panel indicators
+    frames = get_stock_data_bulk(tickers)
+    for t in tickers:
+        if t not in frames:
+            errors[t] = f"No stored data for {t} (run the ingestor first)."
+    features = {}
+    if frames:
+        with stage("features.panel"):
+            panel = build_panel(frames)
+            indicators = compute_panel_indicators(panel['High'], panel['Low'], panel['Close'])
+        for t in frames:
+            df = ticker_frame(panel, indicators, t)
+            if df.empty:
+                errors[t] = f"Not enough history for {t} to compute indicators."
+            else:
+                features[t] = df.tail(300) if period == "1y" else df
+
+    # 2. Group tickers by the model that serves them, then one predict() per group
+    registry = get_model_registry()
+    groups = {}
+    for t in features:
+        artifact = registry.get(t)
+        if artifact is not None:
+            groups.setdefault(id(artifact), (artifact, []))[1].append(t)
+
+    pred_msgs = {t: "Model not loaded." for t in features}
+    for artifact, members in groups.values():
+        try:
+            batch = pd.DataFrame([features[t].iloc[-1][artifact.features] for t in members])
+            with stage("inference.batch"):
+                preds = artifact.model.predict(batch)
+            for t, pred in zip(members, preds):
+                pred_msgs[t] = f"ML Model predicts next Close: ${pred:.2f}"
+        except Exception as e:
+            logger.warning(f"Batch inference failed for model {artifact.version}: {e}")
+            for t in members:
+                pred_msgs[t] = f"Model Error: {str(e)}"
+
+    # 3. Assemble per-ticker payloads (same shape as get_technical_analysis)
+    results = {}
+    for t, df in features.items():
+        try:
+            results[t] = _build_analysis(df, pred_msgs[t])
+        except Exception as e:
+            errors[t] = f"Analysis failed: {e}"
+
+    return {"results": results, "errors": errors}
+
 # --- Test Block ---
 if __name__ == "__main__":
     import json
@@ -0,0 +1,158 @@
+# src/ml_engine/model_registry.py
+"""
+In-process registry of trained price models.
+
+Artifacts are joblib dicts ({"model", "features", "ticker", "version", ...}) stored
+at models/tickers/<TICKER>.pkl, with models/price_predictor.pkl as the shared
+fallback. A copy of every saved version is kept under models/archive/. Each
+artifact is loaded once and kept in memory; its mtime is re-checked at most every
+MODEL_RELOAD_INTERVAL seconds and a changed file is reloaded, so a retrain is
+picked up without restarting the API.
+"""
+import os
+import time
+import shutil
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import joblib
+from src.config import logger, MODEL_PATH, TICKER_MODEL_DIR, MODEL_RELOAD_INTERVAL, MODEL_ARCHIVE_DIR
+from src.ml_engine.features import MODEL_FEATURES, INDICATOR_COLUMNS
+from src.metrics import stage
+
+# Columns the feature pipeline can supply at inference time
+AVAILABLE_FEATURES = set(['Open', 'High', 'Low', 'Close', 'Volume'] + INDICATOR_COLUMNS)
+
+class ModelArtifactError(ValueError):
+    """The artifact on disk can't be served (bad format or feature mismatch)."""
+
+@dataclass
+class ModelArtifact:
+    model: object
+    features: list
+    version: str
+    ticker: str = None          # None for the shared model
+    path: str = ""
+    mtime: float = 0.0
+    metadata: dict = field(default_factory=dict)
+
+def ticker_model_path(ticker: str):
+    return TICKER_MODEL_DIR / f"{ticker.upper()}.pkl"
+
+def archive_path(ticker: str, version: str):
+    return MODEL_ARCHIVE_DIR / (ticker.upper() if ticker else "_shared") / f"{version}.pkl"
+
+def save_model_artifact(model, features: list = None, ticker: str = None, metrics: dict = None,
+                        path=None, archive: bool = True) -> str:
+    """Writes a model plus its metadata; ticker=None writes the shared model."""
+    features = list(features or MODEL_FEATURES)
+    path = path or (ticker_model_path(ticker) if ticker else MODEL_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    artifact = {
+        "model": model,
+        "features": features,
+        "ticker": ticker.upper() if ticker else None,
+        "version": now.strftime("%Y%m%dT%H%M%S%fZ"),
+        "trained_at": now.isoformat(),
+        "metrics": metrics or {},
+    }
+    # Write then rename so the registry never sees a half-written file
+    tmp = path.with_suffix(".tmp")
+    joblib.dump(artifact, tmp)
+    if archive:
+        kept = archive_path(ticker, artifact["version"])
+        kept.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(tmp, kept)
+    os.replace(tmp, path)
+    return artifact["version"]
+
+def load_model_artifact(path) -> ModelArtifact:
+    """Loads and validates one artifact file."""
+    mtime = os.stat(path).st_mtime
+    with stage("model.load"):
+        raw = joblib.load(path)
+    if isinstance(raw, dict) and "model" in raw:
+        meta = {k: v for k, v in raw.items() if k != "model"}
+        model, features = raw["model"], list(raw.get("features") or [])
+        version, ticker = str(raw.get("version", "unknown")), raw.get("ticker")
+    else:
+        # Bare estimator from before artifacts carried metadata
+        meta, model, features = {}, raw, list(MODEL_FEATURES)
+        version, ticker = "legacy", None
+
+    # The recorded feature list must be servable and agree with what the model was fitted on
+    missing = [f for f in features if f not in AVAILABLE_FEATURES]
+    if not features or missing:
+        raise ModelArtifactError(f"{path}: unknown features {missing or 'none recorded'}")
+    fitted = getattr(model, "feature_names_in_", None)
+    if fitted is not None and list(fitted) != features:
+        raise ModelArtifactError(f"{path}: model was fitted on {list(fitted)}, metadata says {features}")
+
+    return ModelArtifact(model=model, features=features, version=version, ticker=ticker,
+                         path=str(path), mtime=mtime, metadata=meta)
+
+class ModelRegistry:
+    """Caches artifacts per path and hot-reloads them when the file changes."""
+
+    def __init__(self, check_interval: float = MODEL_RELOAD_INTERVAL):
+        self.check_interval = check_interval
+        self._entries = {}        # path -> ModelArtifact | None (None = checked, absent/invalid)
+        self._checked = {}        # path -> monotonic time of last stat
+        self._lock = threading.Lock()
+
+    def _load(self, path):
+        path = str(path)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(path)
+            if path in self._entries and now - self._checked.get(path, 0) < self.check_interval:
+                return cached
+            self._checked[path] = now
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                self._entries[path] = None
+                return None
+            if cached is not None and cached.mtime == mtime:
+                return cached
+            try:
+                artifact = load_model_artifact(path)
+            except Exception as e:
+                logger.warning(f"Could not load model {path}: {e}")
+                # Keep serving the previous version if a reload fails
+                self._entries[path] = cached
+                return cached
+            if cached is not None:
+                logger.info(f"Reloaded {path}: {cached.version} -> {artifact.version}")
+            self._entries[path] = artifact
+            return artifact
+
+    def get(self, ticker: str = None):
+        """The ticker's own model if one exists, else the shared model (None if neither)."""
+        if ticker:
+            artifact = self._load(ticker_model_path(ticker))
+            if artifact is not None:
+                return artifact
+        return self._load(MODEL_PATH)
+
+    def warm_up(self, tickers=None) -> dict:
+        """Loads the shared model plus the given (default: all) per-ticker models."""
+        if tickers is None:
+            tickers = [p.stem for p in TICKER_MODEL_DIR.glob("*.pkl")]
+        loaded = {"_shared": self._load(MODEL_PATH)}
+        loaded.update({t: self.get(t) for t in tickers})
+        return {k: a.version for k, a in loaded.items() if a is not None}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._checked.clear()
+
+_registry = None
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,157 @@
+# src/ml_engine/panel.py
+"""
+Panel (dates x tickers) version of add_technical_indicators.
+
+Every indicator is computed for all tickers at once with NumPy kernels that run
+along the time axis and are vectorized across the ticker axis, instead of one
+`ta` object per series. Tickers with different listing dates or missing bars are
+handled by packing each column's valid bars to the top (so all columns share the
+same "bar number" axis), computing, and scattering the results back to their dates.
+Per ticker, `result[col][ticker].dropna()` equals add_technical_indicators(df)[col].
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from src.ml_engine.features import INDICATOR_PARAMS, INDICATOR_COLUMNS
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# --- Kernels (axis 0 = time, axis 1 = tickers; trailing NaNs are allowed) ---
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if len(x) < window:
+        return out
+    csum = np.cumsum(np.vstack([np.zeros((1, x.shape[1])), x]), axis=0)
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+def _rolling_std(x: np.ndarray, window: int, block: int = 512) -> np.ndarray:
+    """Population std (ddof=0) over exact windows, in row blocks to bound memory."""
+    out = np.full_like(x, np.nan)
+    if len(x) < window:
+        return out
+    windows = sliding_window_view(x, window, axis=0)   # (T - w + 1, N, w) view, no copy
+    for start in range(0, len(windows), block):
+        out[window - 1 + start: window - 1 + start + block] = windows[start:start + block].std(axis=-1)
+    return out
+
+def _ewm(x: np.ndarray, alpha: float, start: int = 0) -> np.ndarray:
+    """pandas ewm(adjust=False) seeded with the value at row `start`."""
+    out = np.full_like(x, np.nan)
+    if len(x) <= start:
+        return out
+    out[start] = x[start]
+    decay = 1 - alpha
+    for t in range(start + 1, len(x)):
+        out[t] = decay * out[t - 1] + alpha * x[t]
+    return out
+
+def _wilder_atr(tr: np.ndarray, window: int) -> np.ndarray:
+    # ta: zeros during warm-up, simple mean of the first window, then Wilder smoothing
+    out = np.zeros_like(tr)
+    if len(tr) < window:
+        return out
+    out[window - 1] = tr[:window].mean(axis=0)
+    for t in range(window, len(tr)):
+        out[t] = (out[t - 1] * (window - 1) + tr[t]) / window
+    return out
+
+def _mask_warmup(x: np.ndarray, rows: int) -> np.ndarray:
+    x[:rows] = np.nan
+    return x
+
+# --- Packing ---
+
+def _pack(values: np.ndarray, order: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(values, order, axis=0)
+
+def _unpack(packed: np.ndarray, order: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    out = np.empty_like(packed)
+    np.put_along_axis(out, order, packed, axis=0)
+    out[~valid] = np.nan
+    return out
+
+def compute_panel_indicators(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame,
+                             params: dict = None) -> dict:
+    """
+    Computes the add_technical_indicators set for every column of wide
+    (dates x tickers) High/Low/Close frames.
+    Returns {indicator: DataFrame(dates x tickers)}, NaN during warm-up and on missing bars.
+    """
+    p = dict(INDICATOR_PARAMS, **(params or {}))
+    close = close.astype(float)
+    high = high.reindex_like(close).astype(float).to_numpy()
+    low = low.reindex_like(close).astype(float).to_numpy()
+    c = close.to_numpy()
+
+    # 1. Pack each ticker's usable bars to the top, preserving their order
+    valid = ~(np.isnan(c) | np.isnan(high) | np.isnan(low))
+    order = np.argsort(~valid, axis=0, kind='stable')
+    c, h, l = _pack(c, order), _pack(high, order), _pack(low, order)
+    packed_valid = _pack(valid, order)
+    c = np.where(packed_valid, c, np.nan)
+
+    # 2. Trend & Momentum
+    diff = np.vstack([np.zeros((1, c.shape[1])), np.diff(c, axis=0)])
+    up, down = np.where(diff > 0, diff, 0.0), np.where(diff < 0, -diff, 0.0)
+    up[~packed_valid] = down[~packed_valid] = np.nan
+    ema_up = _ewm(up, 1 / p['rsi_window'])
+    ema_down = _ewm(down, 1 / p['rsi_window'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+    rsi = _mask_warmup(rsi, p['rsi_window'] - 1)
+
+    slow_start = max(p['macd_fast'], p['macd_slow']) - 1
+    macd = _ewm(c, 2 / (p['macd_fast'] + 1)) - _ewm(c, 2 / (p['macd_slow'] + 1))
+    macd = _mask_warmup(macd, slow_start)
+    macd_signal = _mask_warmup(_ewm(macd, 2 / (p['macd_sign'] + 1), start=slow_start), slow_start + p['macd_sign'] - 1)
+
+    sma_fast = _rolling_mean(c, p['sma_fast'])
+    sma_slow = _rolling_mean(c, p['sma_slow'])
+
+    # 3. Volatility
+    bb_mid = _rolling_mean(c, p['bb_window'])
+    bb_std = _rolling_std(c, p['bb_window'])
+    prev_close = np.vstack([np.full((1, c.shape[1]), np.nan), c[:-1]])
+    tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+    atr = _wilder_atr(tr, p['atr_window'])
+
+    packed = {
+        'rsi': rsi, 'macd': macd, 'macd_signal': macd_signal,
+        'sma_50': sma_fast, 'sma_200': sma_slow,
+        'bb_high': bb_mid + p['bb_dev'] * bb_std, 'bb_low': bb_mid - p['bb_dev'] * bb_std,
+        'atr': atr,
+    }
+
+    # 4. Scatter back onto the original dates
+    return {
+        name: pd.DataFrame(_unpack(packed[name], order, valid), index=close.index, columns=close.columns)
+        for name in INDICATOR_COLUMNS
+    }
+
+# --- Building / slicing panels ---
+
+def build_panel(frames: dict) -> dict:
+    """
+    {ticker: yfinance-style frame} -> {field: wide DataFrame (dates x tickers)} on the union of dates.
+    With no (non-empty) frames every field is an empty frame, so callers can check `.empty`.
+    """
+    present = {t: df[PANEL_FIELDS] for t, df in frames.items() if not df.empty}
+    if not present:
+        empty = pd.DataFrame(index=pd.DatetimeIndex([], name='Date'), columns=pd.Index([], name='Ticker'), dtype=float)
+        return {field: empty.copy() for field in PANEL_FIELDS}
+    long = pd.concat(present, names=['Ticker', 'Date'])
+    return {field: long[field].unstack('Ticker').sort_index() for field in PANEL_FIELDS}
+
+def load_panel(tickers: list, start=None, end=None) -> dict:
+    """Reads many tickers from the price store into wide OHLCV frames."""
+    from src.data_engine.database import get_stock_data_bulk
+    return build_panel(get_stock_data_bulk(tickers, start=start, end=end))
+
+def ticker_frame(panel: dict, indicators: dict, ticker: str) -> pd.DataFrame:
+    """One ticker's OHLCV + indicators, laid out like add_technical_indicators' output."""
+    df = pd.DataFrame({f: panel[f][ticker] for f in PANEL_FIELDS})
+    for name, wide in indicators.items():
+        df[name] = wide[ticker]
+    return df.dropna()
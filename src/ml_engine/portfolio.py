@@ -0,0 +1,137 @@
+# src/ml_engine/portfolio.py
+"""
+Multi-asset portfolio backtest on aligned (dates x assets) arrays.
+
+Target weights are set at each rebalance date from per-asset signals (1 = hold,
+0 = cash) and a weighting scheme. Between rebalances holdings drift with prices,
+so a segment's value is V_k * (cash_k + sum_i w_ik * P_i(t) / P_i(start_k)).
+Segment growth, the drifted weights at its end, turnover and costs are all array
+expressions; only the (few) rebalance points are chained with a cumprod, so
+there is no Python loop over days.
+"""
+import numpy as np
+import pandas as pd
+from src.config import CHART_MAX_POINTS
+from src.ml_engine.chart_payload import chart_series
+
+WEIGHTINGS = ("equal", "vol")
+REBALANCE_FREQS = {"D": None, "W": "W", "M": "M", "Q": "Q"}
+
+def _rebalance_rows(index: pd.DatetimeIndex, rebalance) -> np.ndarray:
+    """Row numbers of the rebalance dates: row 0 plus the first bar of every period (or every N bars)."""
+    if isinstance(rebalance, int):
+        return np.arange(0, len(index), max(rebalance, 1))
+    if rebalance not in REBALANCE_FREQS:
+        raise ValueError(f"Unknown rebalance schedule {rebalance!r}; use {list(REBALANCE_FREQS)} or a bar count")
+    if rebalance == "D":
+        return np.arange(len(index))
+    idx = index.tz_localize(None) if index.tz is not None else index
+    periods = idx.to_period(REBALANCE_FREQS[rebalance]).asi8
+    return np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+
+def _target_weights(prices: pd.DataFrame, active: np.ndarray, weighting, vol_window: int) -> np.ndarray:
+    """(dates x assets) target weights; rows sum to <= 1, the remainder is cash."""
+    if isinstance(weighting, str):
+        if weighting == "equal":
+            raw = active.astype(float)
+        elif weighting == "vol":
+            vol = np.log(prices).diff().rolling(vol_window).std().to_numpy()
+            with np.errstate(divide='ignore'):
+                raw = np.where(active & (vol > 0), 1 / vol, 0.0)
+        else:
+            raise ValueError(f"Unknown weighting {weighting!r}; use {list(WEIGHTINGS)} or a {{ticker: weight}} mapping")
+        total = raw.sum(axis=1, keepdims=True)
+        return np.divide(raw, total, out=np.zeros_like(raw), where=total > 0)
+
+    # User-supplied fixed weights: assets whose signal is off go to cash (no renormalization)
+    fixed = pd.Series(weighting, dtype=float).reindex(prices.columns).fillna(0.0).to_numpy()
+    return np.where(active, fixed, 0.0)
+
+def portfolio_backtest(close: pd.DataFrame, signals: pd.DataFrame = None, weighting="equal",
+                       rebalance="M", cost_bps=10.0, slippage_bps=5.0, vol_window=60,
+                       initial_capital=10000, periods_per_year=252, max_points=CHART_MAX_POINTS) -> dict:
+    """
+    Simulates a rebalanced long-only portfolio.
+
+    close: wide Close prices (dates x tickers), NaN before listing / on missing bars.
+    signals: same shape, truthy = hold the asset from that close (default: always hold).
+    weighting: "equal", "vol" (inverse volatility over vol_window) or {ticker: weight}.
+    rebalance: "D", "W", "M", "Q" or a number of bars.
+    Costs (cost_bps + slippage_bps) are charged on traded value at every rebalance.
+    The equity curve is downsampled to max_points for charting (None keeps every day).
+    """
+    close = close.sort_index().astype(float)
+    if close.empty:
+        return {"error": "No price data for portfolio backtest"}
+    prices = close.ffill()                      # a missing bar (or delisting) holds the last price
+    listed = prices.notna().to_numpy()
+    logp = np.where(listed, np.log(prices.to_numpy()), 0.0)
+
+    if signals is None:
+        active = close.notna().to_numpy()
+    else:
+        active = signals.reindex_like(close).fillna(0).astype(bool).to_numpy() & close.notna().to_numpy()
+    weights = _target_weights(prices, active, weighting, vol_window)
+
+    # 1. Segments between rebalances
+    T = len(close)
+    starts = _rebalance_rows(close.index, rebalance)
+    ends = np.r_[starts[1:], T - 1]
+    segment = np.searchsorted(starts, np.arange(T), side='right') - 1
+    W = weights[starts]                          # (K, N) targets
+    cash = 1 - W.sum(axis=1)
+
+    # 2. Growth inside each segment, and at its end (just before the next rebalance)
+    growth = np.exp(logp - logp[starts][segment])                      # (T, N) asset growth since segment start
+    seg_growth = cash[segment] + (W[segment] * growth).sum(axis=1)     # (T,) portfolio growth since segment start
+    end_growth = np.exp(logp[ends] - logp[starts])                     # (K, N)
+    end_value = cash + (W * end_growth).sum(axis=1)                    # (K,)
+
+    # 3. Turnover vs. the drifted book, costs, and chained segment values
+    drifted = np.vstack([np.zeros((1, W.shape[1])), (W * end_growth / end_value[:, None])[:-1]])
+    turnover = np.abs(W - drifted).sum(axis=1)
+    cost_rate = (cost_bps + slippage_bps) / 1e4
+    carried = np.r_[1.0, end_value[:-1]]
+    start_value = initial_capital * np.cumprod(carried * (1 - cost_rate * turnover))
+    costs = start_value / (1 - cost_rate * turnover) * cost_rate * turnover
+
+    equity = start_value[segment] * seg_growth
+    equity[-1] = start_value[-1] * end_value[-1]
+
+    # 4. Metrics
+    daily = np.diff(np.r_[initial_capital, equity]) / np.r_[initial_capital, equity[:-1]]
+    std = daily.std(ddof=1) if T > 1 else 0.0
+    years = T / periods_per_year
+    final = equity[-1]
+    drawdown = (equity / np.maximum.accumulate(np.r_[initial_capital, equity])[1:] - 1).min()
+
+    return {
+        "initial_capital": initial_capital,
+        "final_equity": round(float(final), 2),
+        "total_return_pct": round(float((final - initial_capital) / initial_capital * 100), 2),
+        "cagr": float(max(final / initial_capital, 0) ** (1 / years) - 1),
+        "sharpe": float(daily.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        "max_drawdown": float(drawdown),
+        "total_costs": round(float(costs.sum()), 2),
+        "rebalances": int(len(starts)),
+        "avg_turnover": float(turnover.mean()),
+        "final_weights": {t: round(float(w), 4) for t, w in zip(close.columns, W[-1]) if w > 0},
+        "comparison_data": chart_series(close.index, {"strategy_curve": equity}, max_points)
+    }
+
+def golden_cross_signals(close: pd.DataFrame, fast=50, slow=200) -> pd.DataFrame:
+    """Per-asset run_backtest rule on a wide frame: hold while SMA fast > SMA slow."""
+    return close.rolling(fast).mean() > close.rolling(slow).mean()
+
+def run_portfolio_backtest(tickers: list, start=None, end=None, strategy="golden_cross", **kwargs) -> dict:
+    """Loads tickers from the price store and backtests them as one portfolio."""
+    from src.ml_engine.panel import load_panel
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    panel = load_panel(tickers, start=start, end=end)
+    close = panel['Close']
+    if close.empty:
+        return {"error": "None of the tickers has stored prices (run the ingestor first).", "missing": tickers}
+    signals = golden_cross_signals(close) if strategy == "golden_cross" else None
+    result = portfolio_backtest(close, signals, **kwargs)
+    result["missing"] = [t for t in tickers if t not in close.columns]
+    return result
@@ -0,0 +1,240 @@
+# src/ml_engine/streaming.py
+"""
+Incremental version of add_technical_indicators.
+
+StreamingIndicators keeps the running state of every indicator (EMA levels,
+rolling-window buffers, Wilder averages) so each new bar costs O(1) instead of
+a full-history recompute. Values match the batch `ta` output bar for bar.
+The state round-trips through JSON and is stored next to the prices
+(see save_indicator_state in database.py), so the ingestor rolls it forward
+after each upsert without replaying history, even across restarts.
+Request-time analysis doesn't read it: the dashboard needs the whole chart
+window, which comes from the feature store (feature_store.py).
+"""
+import math
+from collections import deque
+import pandas as pd
+from src.ml_engine.features import INDICATOR_PARAMS, INDICATOR_COLUMNS
+
+STATE_VERSION = 1
+
+# Plain numeric fields that make up the running state (besides the close buffer)
+_SCALARS = ("n", "prev_close", "avg_up", "avg_down", "ema_fast", "ema_slow", "macd_count",
+            "ema_signal", "sum_fast", "sum_slow", "tr_sum", "atr")
+
+def _ema_step(prev, value, alpha):
+    # pandas ewm(adjust=False): y0 = x0, y_t = (1 - a) * y_{t-1} + a * x_t
+    return value if prev is None else (1 - alpha) * prev + alpha * value
+
+class StreamingIndicators:
+    """Running RSI / MACD / SMA / Bollinger / ATR state for one ticker."""
+
+    def __init__(self, params: dict = None):
+        self.params = dict(params or INDICATOR_PARAMS)
+        p = self.params
+        self.n = 0                      # bars seen
+        self.last_date = None
+        self.prev_close = None
+        # RSI (Wilder smoothing of gains / losses)
+        self.avg_up = None
+        self.avg_down = None
+        # MACD
+        self.ema_fast = None
+        self.ema_slow = None
+        self.macd_count = 0             # valid MACD values fed to the signal line
+        self.ema_signal = None
+        # SMAs + Bollinger share one buffer of the longest window's closes
+        self.closes = deque(maxlen=max(p['sma_slow'], p['sma_fast'], p['bb_window']))
+        self.sum_fast = 0.0
+        self.sum_slow = 0.0
+        # ATR
+        self.tr_sum = 0.0
+        self.atr = None
+        # Snapshot before the latest bar, so a revised last bar can be re-applied
+        self._prev = None
+        self.values = {c: math.nan for c in INDICATOR_COLUMNS}
+
+    # --- Updates ---
+
+    def update(self, date, high: float, low: float, close: float) -> dict:
+        """
+        Folds one bar into the state and returns the indicator values for it.
+        Re-sending the latest date replaces that bar (e.g. an intraday partial close).
+        """
+        date = pd.Timestamp(date).date()
+        if self.last_date is not None and date < self.last_date:
+            raise ValueError(f"Bar {date} is older than the stored state ({self.last_date}); rebuild from history.")
+        if self.last_date is not None and date == self.last_date:
+            self._rollback()
+        evicted = self.closes[0] if len(self.closes) == self.closes.maxlen else None
+        self._prev = self._snapshot(evicted)
+
+        p = self.params
+        close, high, low = float(close), float(high), float(low)
+        prev_close = self.prev_close
+
+        # 1. RSI: ta sets the first diff to 0 (not NaN), so the averages start at bar 0
+        diff = 0.0 if prev_close is None else close - prev_close
+        alpha = 1 / p['rsi_window']
+        self.avg_up = _ema_step(self.avg_up, max(diff, 0.0), alpha)
+        self.avg_down = _ema_step(self.avg_down, max(-diff, 0.0), alpha)
+
+        # 2. MACD: the signal line only starts once the slow EMA is valid
+        self.ema_fast = _ema_step(self.ema_fast, close, 2 / (p['macd_fast'] + 1))
+        self.ema_slow = _ema_step(self.ema_slow, close, 2 / (p['macd_slow'] + 1))
+        macd = math.nan
+        if self.n + 1 >= max(p['macd_fast'], p['macd_slow']):
+            macd = self.ema_fast - self.ema_slow
+            self.ema_signal = _ema_step(self.ema_signal, macd, 2 / (p['macd_sign'] + 1))
+            self.macd_count += 1
+
+        # 3. Rolling windows (running sums for the SMAs, exact two-pass std for the bands)
+        leaving_fast = self.closes[-p['sma_fast']] if len(self.closes) >= p['sma_fast'] else 0.0
+        leaving_slow = self.closes[-p['sma_slow']] if len(self.closes) >= p['sma_slow'] else 0.0
+        self.closes.append(close)
+        self.sum_fast += close - leaving_fast
+        self.sum_slow += close - leaving_slow
+
+        # 4. ATR: mean of the first `window` true ranges, then Wilder smoothing
+        if prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        w = p['atr_window']
+        if self.n < w:
+            self.tr_sum += tr
+            if self.n == w - 1:
+                self.atr = self.tr_sum / w
+        else:
+            self.atr = (self.atr * (w - 1) + tr) / w
+
+        self.n += 1
+        self.prev_close = close
+        self.last_date = date
+        self.values = self._current(macd)
+        return self.values
+
+    def _current(self, macd) -> dict:
+        p = self.params
+        nan = math.nan
+
+        rsi = nan
+        if self.n >= p['rsi_window']:
+            rsi = 100.0 if self.avg_down == 0 else 100 - 100 / (1 + self.avg_up / self.avg_down)
+
+        sma_fast = self.sum_fast / p['sma_fast'] if self.n >= p['sma_fast'] else nan
+        sma_slow = self.sum_slow / p['sma_slow'] if self.n >= p['sma_slow'] else nan
+
+        bb_high = bb_low = nan
+        bw = p['bb_window']
+        if self.n >= bw:
+            window = [self.closes[-i] for i in range(1, bw + 1)]
+            mean = sum(window) / bw
+            std = math.sqrt(sum((c - mean) ** 2 for c in window) / bw)
+            bb_high, bb_low = mean + p['bb_dev'] * std, mean - p['bb_dev'] * std
+
+        return {
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": self.ema_signal if self.macd_count >= p['macd_sign'] else nan,
+            "sma_50": sma_fast,
+            "sma_200": sma_slow,
+            "bb_high": bb_high,
+            "bb_low": bb_low,
+            # ta reports 0 (not NaN) for the ATR warm-up bars
+            "atr": self.atr if self.atr is not None else 0.0,
+        }
+
+    @property
+    def ready(self) -> bool:
+        """True once every indicator has a value (the first row add_technical_indicators keeps)."""
+        return not any(math.isnan(v) for v in self.values.values())
+
+    def update_frame(self, df: pd.DataFrame) -> dict:
+        """Feeds every row of a yfinance-style frame; returns the values after the last bar."""
+        for date, row in zip(df.index, df[['High', 'Low', 'Close']].itertuples(index=False)):
+            self.update(date, row.High, row.Low, row.Close)
+        return self.values
+
+    # --- Persistence ---
+
+    def _snapshot(self, evicted=None) -> dict:
+        snap = {k: getattr(self, k) for k in _SCALARS}
+        snap["last_date"] = self.last_date.isoformat() if self.last_date else None
+        snap["values"] = {k: (None if math.isnan(v) else v) for k, v in self.values.items()}
+        snap["evicted"] = evicted
+        return snap
+
+    def _load(self, snap: dict):
+        for k in _SCALARS:
+            setattr(self, k, snap[k])
+        self.last_date = pd.Timestamp(snap["last_date"]).date() if snap["last_date"] else None
+        self.values = {k: (math.nan if v is None else v) for k, v in snap["values"].items()}
+
+    def _rollback(self):
+        """Undoes the latest bar using the snapshot taken just before it (O(1))."""
+        if self._prev is None:
+            raise ValueError(f"No snapshot to revise {self.last_date}; rebuild from history.")
+        snap, self._prev = self._prev, None
+        self.closes.pop()
+        if snap["evicted"] is not None:
+            self.closes.appendleft(snap["evicted"])
+        self._load(snap)
+
+    def to_dict(self) -> dict:
+        """JSON-safe snapshot of the running state."""
+        state = self._snapshot()
+        del state["evicted"]
+        state.update(version=STATE_VERSION, params=self.params, closes=list(self.closes), prev=self._prev)
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "StreamingIndicators":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError("Unsupported indicator state version")
+        engine = cls(state["params"])
+        engine._load(state)
+        engine.closes.extend(state["closes"])
+        engine._prev = state.get("prev")
+        return engine
+
+# --- Price-store integration ---
+
+def refresh_indicator_state(ticker: str) -> dict:
+    """
+    Brings the ticker's stored indicator state up to date with its stored bars.
+
+    Only bars from the bar before the state's last date onwards are read. The last
+    bar may have been revised by the upsert and is re-applied. The one before it is
+    compared with the state's close for that day, and a mismatch (a rewritten history
+    the upsert didn't just append to) forces a rebuild, as does a missing or
+    incompatible state (first run, changed parameters). Rewrites further back are not
+    detected; a full re-ingest deletes the state with the bars. Returns the latest values.
+    """
+    from src.data_engine.database import get_stock_data, load_indicator_state, save_indicator_state
+
+    state = load_indicator_state(ticker)
+    engine = None
+    if state and state.get("version") == STATE_VERSION and state.get("params") == INDICATOR_PARAMS:
+        engine = StreamingIndicators.from_dict(state)
+
+    try:
+        if engine is None:
+            raise ValueError("no usable state")
+        prev = engine._prev
+        if prev is None or prev["last_date"] is None:
+            bars = get_stock_data(ticker, start=engine.last_date, columns=['High', 'Low', 'Close'])
+        else:
+            bars = get_stock_data(ticker, start=prev["last_date"], columns=['High', 'Low', 'Close'])
+            anchor = pd.Timestamp(prev["last_date"])
+            if bars.empty or bars.index[0] != anchor or bars['Close'].iloc[0] != prev["prev_close"]:
+                raise ValueError("history before the last bar changed")
+            bars = bars.iloc[1:]
+        engine.update_frame(bars)
+    except ValueError:
+        engine = StreamingIndicators()
+        engine.update_frame(get_stock_data(ticker, columns=['High', 'Low', 'Close']))
+
+    if engine.last_date is not None:
+        save_indicator_state(ticker, engine.to_dict())
+    return engine.values
@@ -0,0 +1,113 @@
+# src/ml_engine/sweep.py
+"""
+Vectorized parameter sweep for moving-average crossover strategies.
+
+Every (fast, slow, rule) combination becomes one column of a (days x combos)
+position matrix; returns, equity curves and metrics are then computed for all
+columns at once with NumPy. Large grids are split into column blocks evaluated
+on a thread pool (the heavy NumPy kernels release the GIL).
+
+All combinations are evaluated over the same dates: from the bar where the
+longest slow window is first defined. With a longest slow window of 200 that is
+exactly the frame run_backtest receives from add_technical_indicators, so the
+(50, 200, "long_cash") row reproduces run_backtest bit for bit.
+"""
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Position held while fast > slow, and otherwise
+POSITION_RULES = {
+    "long_cash": (1.0, 0.0),      # run_backtest's golden cross
+    "long_short": (1.0, -1.0),
+    "short_cash": (0.0, -1.0),
+}
+
+SWEEP_COLUMNS = ['fast', 'slow', 'rule', 'final_equity', 'total_return_pct', 'cagr',
+                 'sharpe', 'max_drawdown', 'turnover']
+
+def _metrics(returns: np.ndarray, positions: np.ndarray, initial_capital: float, periods_per_year: int) -> dict:
+    """Metrics for every column of a (days x combos) position matrix."""
+    # Same arithmetic as run_backtest: capital * cumprod(1 + market_return * position)
+    strategy = returns[:, None] * positions
+    equity = initial_capital * np.cumprod(1 + strategy, axis=0)
+    final = equity[-1]
+    years = len(returns) / periods_per_year
+
+    std = strategy.std(axis=0, ddof=1) if len(returns) > 1 else np.zeros(positions.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, strategy.mean(axis=0) / std * np.sqrt(periods_per_year), 0.0)
+
+    curve = np.vstack([np.full((1, equity.shape[1]), float(initial_capital)), equity])
+    drawdown = (curve / np.maximum.accumulate(curve, axis=0) - 1).min(axis=0)
+
+    # Position units traded per year, counting the entry from a flat book
+    trades = np.abs(np.diff(np.vstack([np.zeros((1, positions.shape[1])), positions]), axis=0)).sum(axis=0)
+
+    return {
+        'final_equity': final,
+        'total_return_pct': (final - initial_capital) / initial_capital * 100,
+        'cagr': np.clip(final / initial_capital, 0, None) ** (1 / years) - 1,
+        'sharpe': sharpe,
+        'max_drawdown': drawdown,
+        'turnover': trades / years,
+    }
+
+def sweep_backtest(prices, fast_windows=(10, 20, 50), slow_windows=(100, 150, 200),
+                   rules=("long_cash",), initial_capital=10000, periods_per_year=252,
+                   max_workers=None, block_size=256) -> pd.DataFrame:
+    """
+    Backtests every fast < slow crossover in the grid under each position rule.
+
+    `prices` is a raw OHLCV frame (or a Close series); the moving averages are
+    computed here, so no indicator columns are needed. Returns one row per
+    combination with SWEEP_COLUMNS, in grid order.
+    """
+    close = prices['Close'] if isinstance(prices, pd.DataFrame) else prices
+    close = close.dropna().astype(float)
+
+    unknown = [r for r in rules if r not in POSITION_RULES]
+    if unknown:
+        raise ValueError(f"Unknown position rules {unknown}; choose from {list(POSITION_RULES)}")
+    combos = [(f, s, r) for r in rules for f in fast_windows for s in slow_windows if f < s]
+    if not combos:
+        raise ValueError("The grid has no fast < slow combinations")
+    warmup = max(s for _, s, _ in combos) - 1
+    if len(close) - warmup < 2:
+        raise ValueError(f"Need more than {warmup + 1} bars, got {len(close)}")
+
+    # 1. One rolling mean per distinct window (pandas, same arithmetic as ta's SMAIndicator).
+    #    Rows warmup..T-2 are the signals that set the positions held on days warmup+1..T-1.
+    windows = sorted({f for f, _, _ in combos} | {s for _, s, _ in combos})
+    averages = {w: close.rolling(w).mean().to_numpy()[warmup:-1] for w in windows}
+    returns = close.pct_change().to_numpy()[warmup + 1:]
+
+    # 2. Evaluate column blocks: signal matrix -> position matrix -> metrics
+    def evaluate(block):
+        fast = np.column_stack([averages[f] for f, _, _ in block])
+        slow = np.column_stack([averages[s] for _, s, _ in block])
+        held, flat = np.array([POSITION_RULES[r] for _, _, r in block]).T
+        positions = np.where(fast > slow, held, flat)
+        return _metrics(returns, positions, initial_capital, periods_per_year)
+
+    blocks = [combos[i:i + block_size] for i in range(0, len(combos), block_size)]
+    if len(blocks) > 1 and max_workers != 1:
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            parts = list(pool.map(evaluate, blocks))
+    else:
+        parts = [evaluate(b) for b in blocks]
+
+    # 3. Stitch the blocks back into one table
+    result = pd.DataFrame(combos, columns=['fast', 'slow', 'rule'])
+    for name in SWEEP_COLUMNS[3:]:
+        result[name] = np.concatenate([p[name] for p in parts])
+    return result
+
+# --- Test Block ---
+if __name__ == "__main__":
+    from src.data_engine.database import get_stock_data
+    df = get_stock_data("AAPL")
+    table = sweep_backtest(df, fast_windows=range(5, 105, 5), slow_windows=range(50, 205, 5),
+                           rules=list(POSITION_RULES))
+    print(table.sort_values('sharpe', ascending=False).head(10).to_string(index=False))
@@ -1,33 +1,185 @@
+import os
+import json
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import numpy as np
 import pandas as pd
-import joblib
 from xgboost import XGBRegressor
-from src.config import RAW_DATA_DIR, MODEL_PATH
-from src.ml_engine.features import add_technical_indicators
+from sklearn.model_selection import TimeSeriesSplit
+from src.config import logger, MODEL_REPORT_DIR
+from src.ml_engine.features import MODEL_FEATURES
+from src.ml_engine.feature_store import get_features
+from src.ml_engine.model_registry import save_model_artifact
+from src.data_engine.database import get_stock_data
+
+XGB_PARAMS = {"n_estimators": 100, "learning_rate": 0.05}
+
+def load_training_frame(ticker: str) -> pd.DataFrame:
+    """Stored bars -> indicator features + next-close Target (empty if the ticker isn't ingested)."""
+    df = get_stock_data(ticker)
+    if df.empty:
+        return df
+    df = get_features(ticker, df)
 
-def train_model(ticker="AAPL"):
-    print(f"🧠 Training model for {ticker}...")
-    csv_path = RAW_DATA_DIR / f"{ticker}_raw.csv"
-    
-    if not csv_path.exists():
-        print("❌ Data not found. Run ingestor_quant.py first.")
-        return
-
-    df = pd.read_csv(csv_path)
-    df = add_technical_indicators(df)
-    
     # Target: Predict Next Day's Close
     df['Target'] = df['Close'].shift(-1)
-    df.dropna(inplace=True)
-    
-    features = ['Close', 'rsi', 'macd', 'macd_signal', 'sma_50', 'sma_200', 'atr']
-    
-    # Train (No shuffle for time-series!)
-    split = int(len(df) * 0.8)
-    model = XGBRegressor(n_estimators=100, learning_rate=0.05)
-    model.fit(df[features].iloc[:split], df['Target'].iloc[:split])
-    
-    joblib.dump(model, MODEL_PATH)
-    print(f"✅ Model saved to {MODEL_PATH}")
+    return df.dropna()
+
+def _fold_metrics(y_true: np.ndarray, y_pred: np.ndarray, last_close: np.ndarray) -> dict:
+    errors = y_pred - y_true
+    return {
+        "mae": float(np.abs(errors).mean()),
+        "rmse": float(np.sqrt((errors ** 2).mean())),
+        "mape_pct": float((np.abs(errors) / np.abs(y_true)).mean() * 100),
+        # "Tomorrow = today" baseline: a model that can't beat this isn't learning anything
+        "naive_mae": float(np.abs(last_close - y_true).mean()),
+    }
+
+def walk_forward(df: pd.DataFrame, features: list = None, n_folds: int = 5, n_jobs: int = 1) -> list:
+    """
+    Expanding-window CV: each fold trains on everything before its test block and
+    scores the block out of sample. Returns one metrics dict per fold.
+    """
+    features = features or MODEL_FEATURES
+    X, y = df[features], df['Target']
+    folds = []
+    for i, (train_idx, test_idx) in enumerate(TimeSeriesSplit(n_splits=n_folds).split(X)):
+        model = XGBRegressor(**XGB_PARAMS, n_jobs=n_jobs)
+        model.fit(X.iloc[train_idx], y.iloc[train_idx])
+        pred = model.predict(X.iloc[test_idx])
+        folds.append({
+            "fold": i,
+            "train_start": str(df.index[train_idx[0]].date()), "train_end": str(df.index[train_idx[-1]].date()),
+            "test_start": str(df.index[test_idx[0]].date()), "test_end": str(df.index[test_idx[-1]].date()),
+            "n_train": len(train_idx), "n_test": len(test_idx),
+            **_fold_metrics(y.iloc[test_idx].to_numpy(), pred, X['Close'].iloc[test_idx].to_numpy()),
+        })
+    return folds
+
+def train_ticker(ticker: str, n_folds: int = 5, n_jobs: int = 1, shared: bool = False) -> dict:
+    """Walk-forward evaluation, then a final fit on all rows saved as a new artifact version."""
+    ticker = ticker.upper()
+    df = load_training_frame(ticker)
+    if len(df) < (n_folds + 1) * 20:
+        return {"ticker": ticker, "status": "skipped", "error": f"Only {len(df)} usable rows (run the ingestor first)."}
+
+    folds = walk_forward(df, MODEL_FEATURES, n_folds, n_jobs)
+    summary = {k: float(np.mean([f[k] for f in folds])) for k in ("mae", "rmse", "mape_pct", "naive_mae")}
+
+    model = XGBRegressor(**XGB_PARAMS, n_jobs=n_jobs)
+    model.fit(df[MODEL_FEATURES], df['Target'])
+    # The artifact records the feature order so inference can't drift from training
+    version = save_model_artifact(model, MODEL_FEATURES, ticker=None if shared else ticker,
+                                  metrics={"walk_forward": summary, "rows": len(df)})
+    return {"ticker": ticker, "status": "ok", "version": version, "rows": len(df),
+            "summary": summary, "folds": folds}
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+@contextmanager
+def _thread_caps(threads: int):
+    """
+    Caps OpenMP/BLAS pools for processes spawned inside the block. The variables are
+    read when numpy/xgboost load, which in a spawned worker happens while it imports
+    this module, before any initializer runs; so they are set here, in the parent,
+    and the children inherit them with os.environ.
+    """
+    saved = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+def train_tickers(tickers: list, max_workers: int = None, n_folds: int = 5, report_path=None) -> dict:
+    """
+    Trains per-ticker models in a process pool and writes a JSON metrics report.
+    Each worker gets cpu_count // max_workers XGBoost threads so the pool never
+    oversubscribes the cores.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    cpus = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers or cpus, len(tickers)))
+    threads = max(1, cpus // max_workers)
+    print(f"🧠 Training {len(tickers)} tickers ({max_workers} workers x {threads} threads, {n_folds} folds)...")
+
+    results = {}
+    if max_workers == 1:
+        for t in tickers:
+            results[t] = train_ticker(t, n_folds, threads)
+    else:
+        # spawn, not fork: XGBoost's OpenMP runtime is not fork-safe
+        ctx = multiprocessing.get_context("spawn")
+        with _thread_caps(threads), ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            futures = {pool.submit(train_ticker, t, n_folds, threads): t for t in tickers}
+            for future in as_completed(futures):
+                t = futures[future]
+                try:
+                    results[t] = future.result()
+                except Exception as e:
+                    logger.error(f"Training failed for {t}: {e}")
+                    results[t] = {"ticker": t, "status": "error", "error": str(e)}
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "n_folds": n_folds,
+        "params": XGB_PARAMS,
+        "features": MODEL_FEATURES,
+        "tickers": [results[t] for t in tickers],
+    }
+    if report_path is None:
+        MODEL_REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        report_path = MODEL_REPORT_DIR / f"train_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    report["path"] = str(report_path)
+    return report
+
+def train_model(ticker="AAPL", shared=True):
+    """
+    Trains the next-close regressor on one ticker.
+    shared=True writes the fallback model used for every ticker; False writes a per-ticker model.
+    """
+    print(f"🧠 Training model for {ticker}...")
+    result = train_ticker(ticker, shared=shared, n_jobs=os.cpu_count() or 1)
+    if result["status"] != "ok":
+        print(f"❌ {result['error']}")
+        return result
+    print(f"✅ Model {result['version']} saved ({'shared' if shared else ticker}), "
+          f"walk-forward MAE {result['summary']['mae']:.2f} vs naive {result['summary']['naive_mae']:.2f}")
+    return result
+
+def print_report(report: dict):
+    print(f"\n{'Ticker':<10}{'Status':<9}{'MAE':>10}{'Naive MAE':>12}{'MAPE %':>9}")
+    for r in report["tickers"]:
+        s = r.get("summary")
+        if s:
+            print(f"{r['ticker']:<10}{r['status']:<9}{s['mae']:>10.3f}{s['naive_mae']:>12.3f}{s['mape_pct']:>9.2f}")
+        else:
+            print(f"{r['ticker']:<10}{r['status']:<9}  {r.get('error', '')}")
+    print(f"📄 Report: {report['path']}")
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Walk-forward training of per-ticker price models.")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols, e.g. AAPL MSFT NVDA")
+    parser.add_argument("--file", help="Text file with one ticker per line")
+    parser.add_argument("--workers", type=int, default=None, help="Training processes (default: all cores)")
+    parser.add_argument("--folds", type=int, default=5, help="Walk-forward folds")
+    parser.add_argument("--shared", action="store_true", help="Train the shared fallback model on the first ticker only")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if args.shared:
+        train_model(tickers[0] if tickers else "AAPL", shared=True)
+    else:
+        print_report(train_tickers(tickers or ["AAPL"], max_workers=args.workers, n_folds=args.folds))
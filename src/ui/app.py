@@ -14,10 +14,12 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from src.agents.graph import build_graph
-from src.agents.state import AgentState
+from src.agents.graph import gather_context, FALLBACKS
+from src.agents.llm import build_report_prompt, stream_report
 from src.ml_engine.backtest import run_backtest # <--- NEW IMPORT
-from src.ml_engine.features import add_technical_indicators # Helper for backtest data
+from src.ml_engine.feature_store import get_features # Cached indicators for backtest data
+from src.ml_engine.chart_payload import compact_payload, chart_columns
+from src.data_engine.database import get_stock_data
 
 # --- PAGE CONFIG ---
 st.set_page_config(layout="wide", page_title="FinSight Pro", page_icon="📈")
@@ -33,31 +35,27 @@ st.markdown("""
 # --- CACHING OPTIMIZATION ---
 @st.cache_data(ttl=3600, show_spinner=False)
 def run_analysis_cached(ticker):
-    """Runs the graph and caches the result for 1 hour."""
-    app = build_graph()
-    inputs: AgentState = {
-        "ticker": ticker, 
-        "user_query": "Analyze", 
-        "quant_data": {}, 
-        "rag_data": {}, 
-        "sentiment_data": {}, 
-        "final_report": ""
-    }
-    return app.invoke(inputs)
+    """Runs the data agents and caches the result for 1 hour (the memo is streamed separately)."""
+    return gather_context(ticker)
 
 @st.cache_data(ttl=3600)
 def perform_backtest(ticker):
-    """Fetches 5 years of data to run a robust backtest."""
-    stock = yf.Ticker(ticker)
-    df = stock.history(period="5y")
+    """
+    Runs the backtest on the stored 5 years of data (live fetch if the ticker isn't ingested).
+    The downsampled curves are kept compact-encoded in Streamlit's cache.
+    """
+    df = get_stock_data(ticker)
+    if df.empty:
+        df = yf.Ticker(ticker).history(period="5y")
     if df.empty: return None
-    df = add_technical_indicators(df)
-    return run_backtest(df)
+    df = get_features(ticker, df)
+    return compact_payload(run_backtest(df))
 
 # --- CHARTING ENGINES ---
 def render_chart(ticker, data):
     """Draws a professional Candlestick chart."""
     if not data: return
+    data = chart_columns(data)
     
     fig = go.Figure()
     fig.add_trace(go.Candlestick(
@@ -80,7 +78,7 @@ def render_backtest_chart(backtest_res):
         st.warning("Could not run backtest.")
         return
 
-    data = backtest_res['comparison_data']
+    data = chart_columns(backtest_res['comparison_data'])
     fig = go.Figure()
     
     # 1. Market (Buy & Hold)
@@ -159,11 +157,6 @@ if st.button("Initialize Analysis", type="primary"):
                         elif "Bearish" in s: st.error(s)
                         else: st.write(f"• {s}")
 
-            # --- TAB 2: REPORT ---
-            with tab_report:
-                st.markdown(result['final_report'])
-                st.download_button("Download Report", result['final_report'], file_name=f"{ticker}_report.md")
-
             # --- TAB 3: BACKTEST ---
             with tab_backtest:
                 if backtest_results and "error" not in backtest_results:
@@ -187,5 +180,18 @@ if st.button("Initialize Analysis", type="primary"):
             with tab_dev:
                 st.json(result)
 
+            # --- TAB 2: REPORT (streamed last so the other tabs render first) ---
+            with tab_report:
+                # Tokens render as they arrive; memos for identical inputs come from the report cache
+                prompt = build_report_prompt(ticker, quant, sent, result.get('rag_data', {}))
+                # The stream bypasses the guarded report node, so it needs that node's fallback here
+                try:
+                    report = st.write_stream(stream_report(prompt))
+                except Exception:
+                    report = None
+                    st.warning(FALLBACKS["report"]("error")["final_report"])
+                if report:
+                    st.download_button("Download Report", report, file_name=f"{ticker}_report.md")
+
         except Exception as e:
             st.error(f"Analysis Failed: {e}")
\ No newline at end of file
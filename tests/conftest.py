@@ -0,0 +1,30 @@
+# tests/conftest.py
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pytest
+
+# Point the data engine at a throwaway database before anything imports src.config,
+# so the suite never writes to data/finsight.db or the real caches.
+_TMP = tempfile.mkdtemp(prefix="finsight_test_")
+os.environ.setdefault("FINSIGHT_DB_PATH", os.path.join(_TMP, "finsight.db"))
+os.environ.setdefault("FINSIGHT_FEATURE_CACHE_DIR", os.path.join(_TMP, "features"))
+os.environ.setdefault("FINSIGHT_MODEL_DIR", os.path.join(_TMP, "models"))
+os.environ.setdefault("FINSIGHT_LLM_BACKEND", "fake")      # never call Groq from tests
+
+
+def _random_walk(n=500, seed=0, start="2020-01-01", vol=0.01, drift=0.0):
+    """Seeded yfinance-style OHLCV bars on business days (High >= Close >= Low)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    return pd.DataFrame({
+        "Open": close, "High": close * (1 + rng.uniform(0, vol, n)),
+        "Low": close * (1 - rng.uniform(0, vol, n)), "Close": close, "Volume": 1e6
+    }, index=pd.bdate_range(start, periods=n, name="Date"))
+
+
+@pytest.fixture
+def random_walk():
+    """Factory for synthetic price frames: random_walk(n, seed, start=..., vol=..., drift=...)."""
+    return _random_walk
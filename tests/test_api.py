@@ -0,0 +1,204 @@
+# tests/test_api.py
+import numpy as np
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.data_engine.database import save_stock_data
+from src.ml_engine.forecasting import get_technical_analysis
+
+client = TestClient(app)
+
+
+def test_batch_matches_single_and_reports_failures(random_walk):
+    save_stock_data("APIA", random_walk(400, 1))
+    save_stock_data("APIB", random_walk(420, 2))
+    save_stock_data("APIS", random_walk(50, 3))      # too short for SMA 200
+
+    resp = client.post("/analyze/batch", json={"tickers": ["apia", "APIB", "APIS", "NOSUCH"]})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert set(body["results"]) == {"APIA", "APIB"}
+    assert set(body["errors"]) == {"APIS", "NOSUCH"}
+    single = get_technical_analysis("APIA")
+    for key, value in single["metrics"].items():
+        assert np.isclose(body["results"]["APIA"]["metrics"][key], value)
+    assert body["results"]["APIA"]["chart_data"]["dates"] == single["chart_data"]["dates"]
+
+
+def test_batch_rejects_empty_list():
+    assert client.post("/analyze/batch", json={"tickers": []}).status_code == 422
+
+
+def test_concurrent_requests_coalesce(monkeypatch):
+    import asyncio
+    import threading
+    import time
+    import httpx
+    from src.api import main
+
+    calls = []
+
+    def slow_analysis(ticker):
+        calls.append(threading.get_ident())
+        time.sleep(0.3)
+        return {"metrics": {"ticker": ticker}}
+
+    monkeypatch.setattr(main, "get_technical_analysis", slow_analysis)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*[ac.get("/analyze/nvda") for _ in range(20)])
+
+    responses = asyncio.run(burst())
+    assert all(r.status_code == 200 for r in responses)
+    assert len(calls) == 1
+
+
+def test_overload_returns_503_with_retry_after(monkeypatch):
+    import asyncio
+    import time
+    import httpx
+    from src.api import main
+
+    monkeypatch.setattr(main, "get_technical_analysis", lambda t: time.sleep(0.3) or {"metrics": {}})
+    monkeypatch.setattr(main.gate, "max_in_flight", 1)
+
+    async def two_tickers():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(ac.get("/analyze/AAA"), ac.get("/analyze/BBB"))
+
+    codes = sorted(r.status_code for r in asyncio.run(two_tickers()))
+    assert codes == [200, 503]
+
+
+def test_etag_revalidation_and_invalidation_on_new_bar(monkeypatch, random_walk):
+    from src.api import main
+
+    calls = []
+    monkeypatch.setattr(main, "get_technical_analysis", lambda t: calls.append(t) or {"metrics": {"n": len(calls)}})
+    main.response_cache.clear()
+    df = random_walk(300, 4)
+    save_stock_data("ETAG", df.iloc[:-1])
+
+    first = client.get("/analyze/ETAG")
+    etag = first.headers["etag"]
+    assert client.get("/analyze/ETAG").json() == first.json()          # served from cache
+    assert client.get("/analyze/ETAG", headers={"If-None-Match": etag}).status_code == 304
+    assert len(calls) == 1
+
+    save_stock_data("ETAG", df.iloc[-1:])                              # new bar -> new key
+    fresh = client.get("/analyze/ETAG", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+    assert len(calls) == 2
+
+
+def test_response_cache_is_bounded():
+    from src.api.cache import ResponseCache
+
+    cache = ResponseCache(max_entries=2, ttl=60)
+    for i in range(3):
+        cache.set(("k", i), {"i": i})
+    assert cache.get(("k", 0)) is None and cache.get(("k", 2)) == {"i": 2}
+
+    expired = ResponseCache(max_entries=2, ttl=0)
+    expired.set(("k", 0), {"i": 0})
+    assert expired.get(("k", 0)) is None
+
+
+def test_graph_events_stream_node_by_node(monkeypatch):
+    import json
+    import time
+    from src.agents import graph
+
+    def slow(seconds, value):
+        return lambda ticker: time.sleep(seconds) or value
+
+    monkeypatch.setattr(graph, "get_technical_analysis", slow(0, {"metrics": {"rsi": 40}}))
+    monkeypatch.setattr(graph, "get_market_sentiment", slow(0.2, {"score": 0.3, "label": "Bullish"}))
+    monkeypatch.setattr(graph, "get_fundamental_analysis", slow(0.4, {"relevant_text": "Risk."}))
+
+    with client.stream("GET", "/analyze/sse/events") as resp:
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = [line.split(": ", 1)[1] for line in resp.iter_lines() if line.startswith("event: ")]
+        assert events == ["start", "quant", "sentiment", "rag", "report", "done"]
+
+    with client.stream("GET", "/analyze/sse/events") as resp:
+        data = [json.loads(line[6:]) for line in resp.iter_lines() if line.startswith("data: ")]
+    assert data[1]["quant_data"] == {"metrics": {"rsi": 40}}
+    assert data[4]["final_report"].startswith("## SSE")
+
+
+def test_gate_survives_repeated_app_lifespans(monkeypatch):
+    from src.api import main
+    monkeypatch.setattr(main, "get_market_sentiment", lambda t: {"score": 0.0, "label": "Neutral"})
+    for _ in range(2):
+        main.response_cache.clear()
+        with TestClient(main.app) as c:
+            assert c.get("/sentiment/abc").status_code == 200
+
+
+def test_revised_last_bar_changes_etag(random_walk):
+    df = random_walk(300, 11)
+    save_stock_data("REVS", df)
+    first = client.get("/analyze/REVS")
+
+    revised = df.tail(1).copy()
+    revised["Close"] *= 1.5
+    save_stock_data("REVS", revised)
+    assert client.get("/analyze/REVS", headers={"If-None-Match": first.headers["etag"]}).status_code == 200
+    second = client.get("/analyze/REVS")
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.json()["metrics"]["current_price"] == revised["Close"].iloc[0]
+
+
+def test_graph_events_take_a_gate_slot(monkeypatch):
+    from src.api import main
+    from src.agents import graph
+    monkeypatch.setattr(graph, "get_technical_analysis", lambda t: {"metrics": {}})
+    monkeypatch.setattr(graph, "get_market_sentiment", lambda t: {"score": 0})
+    monkeypatch.setattr(graph, "get_fundamental_analysis", lambda t: {"relevant_text": ""})
+
+    with client.stream("GET", "/analyze/slot/events") as resp:
+        assert resp.status_code == 200
+        list(resp.iter_lines())
+    assert main.gate.in_flight == 0                       # released once the stream ends
+
+    monkeypatch.setattr(main.gate, "max_in_flight", 0)
+    resp = client.get("/analyze/slot/events")
+    assert resp.status_code == 503 and resp.headers["retry-after"]
+
+
+def test_disconnected_stream_holds_its_slot_until_the_step_ends(monkeypatch):
+    import asyncio
+    import threading
+    from src.api import main
+
+    step_started, finish_step = threading.Event(), threading.Event()
+
+    class HungGraph:
+        def stream(self, state, stream_mode):
+            step_started.set()
+            finish_step.wait(5)
+            yield {"quant": {"quant_data": {}}}
+
+    monkeypatch.setattr(main, "get_graph", lambda: HungGraph())
+    released = []
+
+    async def disconnect_mid_step():
+        events = main._graph_events("HUNG", lambda: released.append(True))
+        await events.__anext__()                              # "start"
+        pending = asyncio.ensure_future(events.__anext__())
+        await asyncio.get_running_loop().run_in_executor(None, step_started.wait, 5)
+        pending.cancel()                                      # the client goes away
+        await asyncio.gather(pending, return_exceptions=True)
+        assert released == []                                 # the step is still running
+        finish_step.set()
+        for _ in range(100):
+            if released:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(disconnect_mid_step())
+    assert released == [True]
@@ -0,0 +1,44 @@
+# tests/test_benchmarks.py
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+from benchmarks.synthetic import make_ohlcv, make_universe, wide_close
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_synthetic_ohlcv_is_deterministic_and_consistent():
+    a, b = make_ohlcv("SYN0001", years=2), make_ohlcv("SYN0001", years=2)
+    assert a.equals(b)
+    assert len(a) == 504 and list(a.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert (a["High"] >= a[["Open", "Close"]].max(axis=1)).all()
+    assert (a["Low"] <= a[["Open", "Close"]].min(axis=1)).all()
+    assert (a["Low"] > 0).all()
+    assert not np.allclose(a["Close"].values, make_ohlcv("SYN0002", years=2)["Close"].values)
+
+
+def test_universe_members_do_not_depend_on_universe_size():
+    small, large = make_universe(2, years=1), make_universe(5, years=1)
+    assert small["SYN0001"].equals(large["SYN0001"])
+    assert wide_close(large).shape == (252, 5)
+
+
+def test_suite_writes_json_results_without_touching_exported_paths(tmp_path):
+    # Stand-ins for a live database / model directory exported in the shell
+    env = dict(os.environ,
+               FINSIGHT_DB_PATH=str(tmp_path / "live.db"),
+               FINSIGHT_FEATURE_CACHE_DIR=str(tmp_path / "features"),
+               FINSIGHT_MODEL_DIR=str(tmp_path / "models"))
+    out = tmp_path / "results.json"
+    subprocess.run([sys.executable, "-m", "benchmarks.run_benchmarks", "--tickers", "2", "--years", "1",
+                    "--repeats", "1", "--output", str(out)], cwd=ROOT, env=env, check=True, capture_output=True)
+
+    report = json.loads(out.read_text())
+    names = {r["name"] for r in report["results"]}
+    assert {"add_technical_indicators", "run_backtest", "save_stock_data", "get_stock_data",
+            "analyze_batch", "graph_invoke"} <= names
+    assert all(r["median_s"] >= 0 for r in report["results"])
+    assert report["meta"]["args"]["tickers"] == [2]
+    assert not (tmp_path / "live.db").exists() and not (tmp_path / "models").exists()
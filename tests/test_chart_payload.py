@@ -0,0 +1,59 @@
+# tests/test_chart_payload.py
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.data_engine.database import save_stock_data
+from src.ml_engine.backtest import run_backtest
+from src.ml_engine.chart_payload import (lttb_indices, chart_series, compact_payload, chart_columns,
+                                         COMPACT_FORMAT)
+from src.ml_engine.features import add_technical_indicators
+
+client = TestClient(app)
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    y = np.sin(np.linspace(0, 20, 5000))
+    y[2345] = 50                                   # a one-day spike must survive
+    keep = lttb_indices(y, 300)
+    assert len(keep) == 300 and keep[0] == 0 and keep[-1] == 4999
+    assert np.all(np.diff(keep) > 0)
+    assert 2345 in keep
+    np.testing.assert_array_equal(lttb_indices(y[:200], 300), np.arange(200))
+
+
+def test_backtest_curves_are_bounded_but_metrics_are_not(random_walk):
+    df = add_technical_indicators(random_walk(1500, 4))
+    full, small = run_backtest(df, max_points=None), run_backtest(df, max_points=250)
+
+    assert len(small["comparison_data"]["dates"]) == 250
+    assert len(full["comparison_data"]["dates"]) == len(df) - 1     # first bar has no return
+    assert small["final_strategy_equity"] == full["final_strategy_equity"]
+    assert small["comparison_data"]["strategy_curve"][-1] == full["comparison_data"]["strategy_curve"][-1]
+    assert small["comparison_data"]["dates"][0] == full["comparison_data"]["dates"][0]
+
+
+def test_compact_round_trip():
+    block = chart_series(pd.bdate_range("2020-01-01", periods=50), {"close": np.linspace(100, 150, 50)})
+    payload = compact_payload({"metrics": {"rsi": 55.0}, "chart_data": block})
+
+    assert payload["metrics"] == {"rsi": 55.0}
+    assert payload["chart_data"]["format"] == COMPACT_FORMAT
+    cols = chart_columns(payload["chart_data"])
+    assert [str(d) for d in cols["dates"]] == block["dates"]
+    np.testing.assert_allclose(cols["close"], block["close"], rtol=1e-6)
+    assert chart_columns(block) is block
+
+
+def test_api_backtest_compact_format(random_walk):
+    save_stock_data("CHRT", random_walk(900, 5))
+    plain = client.get("/backtest/CHRT")
+    compact = client.get("/backtest/CHRT?format=compact")
+    assert plain.status_code == compact.status_code == 200
+    assert plain.headers["etag"] != compact.headers["etag"]
+
+    curve = chart_columns(compact.json()["comparison_data"])["strategy_curve"]
+    np.testing.assert_allclose(curve, plain.json()["comparison_data"]["strategy_curve"], rtol=1e-6)
+    assert len(compact.content) < len(plain.content) / 2
+    assert client.get("/backtest/NOPE").status_code == 404
+    assert client.get("/backtest/CHRT?format=xml").status_code == 422
@@ -0,0 +1,44 @@
+# tests/test_database.py
+import pandas as pd
+from src.data_engine.database import save_stock_data, get_stock_data, get_last_date
+
+
+def make_bars(start, periods, close=100.0):
+    dates = pd.date_range(start, periods=periods, freq="D", name="Date")
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1,
+        "Close": close, "Volume": 1000.0
+    }, index=dates)
+
+
+def test_upsert_reports_inserts_and_updates():
+    first = save_stock_data("UPS1", make_bars("2024-01-01", 5))
+    assert first == {"inserted": 5, "updated": 0}
+
+    # Overlap the last two bars and add three new ones
+    second = save_stock_data("UPS1", make_bars("2024-01-04", 5, close=200.0))
+    assert second == {"inserted": 3, "updated": 2}
+
+    df = get_stock_data("UPS1")
+    assert len(df) == 8
+    assert df.loc["2024-01-04", "Close"] == 200.0
+    assert get_last_date("UPS1") == pd.Timestamp("2024-01-08").date()
+
+
+def test_last_date_missing_ticker():
+    assert get_last_date("NOPE") is None
+
+
+def test_range_and_column_pushdown():
+    save_stock_data("RNG1", make_bars("2024-02-01", 10))
+    df = get_stock_data("RNG1", start="2024-02-03", end="2024-02-05", columns=["close", "Volume"])
+
+    assert list(df.columns) == ["Close", "Volume"]
+    assert [str(d.date()) for d in df.index] == ["2024-02-03", "2024-02-04", "2024-02-05"]
+    assert df.index.name == "Date"
+
+
+def test_unknown_column_rejected():
+    import pytest
+    with pytest.raises(ValueError):
+        get_stock_data("RNG1", columns=["Close; DROP TABLE stock_prices"])
@@ -0,0 +1,34 @@
+# tests/test_embeddings.py
+import threading
+import time
+import pytest
+from src.data_engine import embeddings
+
+
+def test_model_is_built_once_across_threads(monkeypatch):
+    built = []
+
+    def slow_build():
+        time.sleep(0.05)
+        built.append(object())
+        return built[-1]
+
+    monkeypatch.setattr(embeddings, "build_embedding_model", slow_build)
+    embeddings.reset_embedding_model()
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(embeddings.get_embedding_model())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(built) == 1 and all(g is built[0] for g in got)
+    embeddings.reset_embedding_model()
+
+
+def test_backend_kwargs():
+    assert "backend" not in embeddings.backend_kwargs("torch")
+    assert embeddings.backend_kwargs("onnx")["backend"] == "onnx"
+    assert embeddings.backend_kwargs("onnx-int8")["model_kwargs"]["file_name"].startswith("onnx/model_q")
+    with pytest.raises(ValueError):
+        embeddings.backend_kwargs("tensorrt")
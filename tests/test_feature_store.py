@@ -0,0 +1,34 @@
+# tests/test_feature_store.py
+import pandas as pd
+from src.ml_engine.feature_store import FeatureStore
+from src.ml_engine.features import add_technical_indicators
+
+
+def test_hit_miss_and_revised_bar(tmp_path, random_walk):
+    store = FeatureStore(root=tmp_path, max_entries=10, max_bytes=10**9)
+    df = random_walk()
+
+    first = store.get_or_compute("AAA", df)
+    second = store.get_or_compute("AAA", df)
+    pd.testing.assert_frame_equal(first, add_technical_indicators(df))
+    pd.testing.assert_frame_equal(first, second)
+    assert (store.hits, store.misses) == (1, 1)
+
+    # Same last date but a revised close must not hit the old entry
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.05
+    store.get_or_compute("AAA", revised)
+    assert store.misses == 2
+
+    store.invalidate("AAA")
+    assert store.stats()["entries"] == 0
+
+
+def test_lru_eviction(tmp_path, random_walk):
+    store = FeatureStore(root=tmp_path, max_entries=2, max_bytes=10**9)
+    frames = [random_walk(220 + i) for i in range(3)]
+    for df in frames:
+        store.get_or_compute("EVT", df)
+
+    assert store.stats()["entries"] == 2 and store.evictions == 1
+    assert not store.key("EVT", frames[0]).exists()
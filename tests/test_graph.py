@@ -0,0 +1,45 @@
+# tests/test_graph.py
+import time
+from src.agents import graph
+
+
+def slow(seconds, value):
+    def fn(ticker):
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_data_nodes_run_in_parallel_with_timeouts(monkeypatch):
+    monkeypatch.setattr(graph, "get_technical_analysis", slow(0.3, {"metrics": {"rsi": 50}}))
+    monkeypatch.setattr(graph, "get_fundamental_analysis", slow(0.3, {"relevant_text": "10-K"}))
+    monkeypatch.setattr(graph, "get_market_sentiment", slow(2, {"score": 1}))
+    monkeypatch.setattr(graph, "report_node", lambda state: {"final_report": state["rag_data"]["relevant_text"]})
+    monkeypatch.setitem(graph.NODE_TIMEOUTS, "sentiment", 0.5)
+
+    started = time.perf_counter()
+    result = graph.build_graph().invoke({"ticker": "TEST", "user_query": "Analyze", "node_timings": {}})
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.5                                   # not 0.3 + 0.3 + 2
+    assert result["final_report"] == "10-K"
+    assert result["quant_data"] == {"metrics": {"rsi": 50}}
+    assert result["sentiment_data"]["label"] == "Neutral (timed out)"
+    timings = result["node_timings"]
+    assert set(timings) == {"quant", "rag", "sentiment", "report"}
+    assert timings["sentiment"]["status"] == "timeout" and timings["quant"]["status"] == "ok"
+
+
+def test_hung_dependency_does_not_degrade_other_nodes(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    monkeypatch.setattr(graph, "get_technical_analysis", lambda t: {"metrics": {"rsi": 50}})
+    monkeypatch.setattr(graph, "get_fundamental_analysis", lambda t: {"relevant_text": "10-K"})
+    monkeypatch.setattr(graph, "get_market_sentiment", slow(1.5, {"score": 1}))
+    monkeypatch.setitem(graph.NODE_TIMEOUTS, "sentiment", 0.2)
+    monkeypatch.setitem(graph.NODE_TIMEOUTS, "quant", 0.5)
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        states = list(pool.map(graph.gather_context, [f"T{i}" for i in range(20)]))
+
+    assert all(s["node_timings"]["quant"]["status"] == "ok" for s in states)
+    assert all(s["node_timings"]["sentiment"]["status"] in ("timeout", "busy") for s in states)
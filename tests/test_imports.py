@@ -0,0 +1,10 @@
+# tests/test_imports.py
+import pytest
+from benchmarks.bench_import_time import FORBIDDEN, measure
+
+
+@pytest.mark.parametrize("module", sorted(FORBIDDEN))
+def test_entry_points_do_not_load_heavy_stacks(module):
+    loaded = measure(module)["modules"]
+    assert module in loaded
+    assert not [m for m in FORBIDDEN[module] if m in loaded]
@@ -0,0 +1,35 @@
+# tests/test_ingestor.py
+import pandas as pd
+from src.data_engine import ingestor_quant
+from src.data_engine.database import get_stock_data
+
+
+def fake_history(ticker, start=None):
+    if ticker == "BAD":
+        raise ConnectionError("boom")
+    if ticker == "EMPTY":
+        return pd.DataFrame()
+    dates = pd.date_range("2024-01-01", periods=10, freq="D", name="Date")
+    return pd.DataFrame({"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 10.0}, index=dates)
+
+
+def test_ingest_batch_summary(monkeypatch):
+    monkeypatch.setattr(ingestor_quant, "fetch_history", fake_history)
+    summary = ingestor_quant.ingest_batch(
+        ["BAT1", "bat2", "BAD", "EMPTY"], max_workers=4,
+        requests_per_second=1000, max_retries=2, backoff=0
+    )
+
+    assert summary["BAT1"]["status"] == "ok" and summary["BAT1"]["inserted"] == 10
+    assert summary["BAT2"]["status"] == "ok"
+    assert summary["BAD"]["status"] == "error" and summary["BAD"]["attempts"] == 2
+    assert summary["EMPTY"]["status"] == "empty"
+    assert len(get_stock_data("BAT2")) == 10
+
+
+def test_exit_code_reports_partial_failures():
+    summary = {f"T{i}": {"status": "ok"} for i in range(99)}
+    summary["BAD"] = {"status": "error"}
+    assert ingestor_quant.exit_code(summary) == 1
+    assert ingestor_quant.exit_code(summary, fail_threshold=0.05) == 0
+    assert ingestor_quant.exit_code({"T": {"status": "empty"}}) == 0
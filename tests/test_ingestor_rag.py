@@ -0,0 +1,48 @@
+# tests/test_ingestor_rag.py
+from src.data_engine.ingestor_rag import chunk_stream, iter_text_blocks, ingest_filings, chunk_id
+
+
+class FakeStore:
+    """Stands in for a Chroma collection: records ids and embedding calls."""
+
+    def __init__(self):
+        self.docs = {}
+        self.add_calls = []
+
+    def get(self, ids=None, include=None):
+        return {"ids": [i for i in ids if i in self.docs]}
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        self.add_calls.append(len(texts))
+        self.docs.update(zip(ids, texts))
+        return ids
+
+
+def test_chunks_do_not_depend_on_block_boundaries():
+    text = " ".join(f"Sentence number {i} talks about supply chain risk." for i in range(400))
+    whole = list(chunk_stream([text], chunk_size=300, overlap=50))
+    streamed = list(chunk_stream((text[i:i + 37] for i in range(0, len(text), 37)), chunk_size=300, overlap=50))
+    assert whole == streamed
+    assert all(len(t) <= 300 for _, t in whole)
+    assert text.endswith(whole[-1][1])
+
+
+def test_html_reader_skips_scripts(tmp_path):
+    page = tmp_path / "10k.html"
+    page.write_text("<html><head><title>x</title><script>var risk=1;</script></head>"
+                    "<body><p>Item 1A. Risk Factors</p><div>Competition &amp; pricing</div></body></html>")
+    text = "".join(iter_text_blocks(page, block_size=16))
+    assert "Risk Factors" in text and "Competition & pricing" in text and "var risk" not in text
+
+
+def test_unchanged_chunks_are_not_embedded_again(tmp_path):
+    filing = tmp_path / "aapl_10k.txt"
+    filing.write_text("\n".join(f"Paragraph {i}: revenue grew in segment {i}." for i in range(300)))
+    store = FakeStore()
+
+    first = ingest_filings("aapl", [tmp_path], batch_size=20, chunk_size=200, overlap=20, store=store)
+    assert first["embedded"] == len(store.docs) > 0 and max(store.add_calls) <= 20
+
+    second = ingest_filings("AAPL", [filing], batch_size=20, chunk_size=200, overlap=20, store=store)
+    assert second["embedded"] == 0 and second["skipped"] == first["chunks"]
+    assert chunk_id("x") == chunk_id("x") != chunk_id("y")
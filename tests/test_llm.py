@@ -0,0 +1,46 @@
+# tests/test_llm.py
+from fastapi.testclient import TestClient
+from src.agents import llm
+
+
+class Unreachable:
+    def invoke(self, messages):
+        raise AssertionError("LLM called despite a cached report")
+
+    stream = invoke
+
+
+def prompt_for(ticker, rsi):
+    return llm.build_report_prompt(ticker, {"metrics": {"current_price": 10, "rsi": rsi}, "signals": []},
+                                   {"score": 0.2, "label": "Bullish"}, {"relevant_text": "Supply risk."})
+
+
+def test_identical_prompts_hit_the_persistent_cache(monkeypatch):
+    prompt = prompt_for("LLMA", 55)
+    first = llm.generate_report(prompt)
+    assert "LLMA" in first and "Supply risk." in first
+
+    monkeypatch.setattr(llm, "get_chat_model", lambda *a: Unreachable())
+    assert llm.generate_report(prompt) == first
+    assert llm.report_cache_key(prompt) != llm.report_cache_key(prompt_for("LLMA", 56))
+
+
+def test_stream_yields_tokens_then_caches(monkeypatch):
+    prompt = prompt_for("LLMB", 40)
+    chunks = list(llm.stream_report(prompt))
+    assert len(chunks) > 5
+
+    monkeypatch.setattr(llm, "get_chat_model", lambda *a: Unreachable())
+    assert list(llm.stream_report(prompt)) == ["".join(chunks)]
+    assert llm.generate_report(prompt) == "".join(chunks)
+
+
+def test_api_streams_report(monkeypatch):
+    from src.api import main
+    context = {"quant_data": {"metrics": {"rsi": 30}}, "sentiment_data": {"score": 0.1}, "rag_data": {}}
+    monkeypatch.setattr(main, "gather_context", lambda ticker: context)
+
+    with TestClient(main.app).stream("GET", "/report/llmc/stream") as resp:
+        assert resp.status_code == 200
+        body = "".join(resp.iter_text())
+    assert body.startswith("## LLMC")
@@ -0,0 +1,48 @@
+# tests/test_metrics.py
+import pytest
+from fastapi.testclient import TestClient
+from src import metrics
+from src.api.main import app
+from src.data_engine.database import save_stock_data
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = metrics.Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1))
+    for v in (0.05, 0.5, 5):
+        h.observe(v, stage="x")
+    text = "\n".join(h.render())
+    assert 't_seconds_bucket{stage="x",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="x",le="1"} 2' in text
+    assert 't_seconds_bucket{stage="x",le="+Inf"} 3' in text
+    assert 't_seconds_count{stage="x"} 3' in text
+
+
+def test_stage_counts_errors_and_feeds_the_active_trace():
+    trace = metrics.start_trace()
+    with metrics.stage("unit.ok"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.stage("unit.fail"):
+            raise ValueError("boom")
+
+    assert [name for name, _ in trace.stages] == ["unit.ok", "unit.fail"]
+    assert metrics.STAGE_ERRORS.value(stage="unit.fail") >= 1
+    assert metrics.STAGE_ERRORS.value(stage="unit.ok") == 0
+    assert "unit.ok;dur=" in trace.server_timing()
+
+
+def test_analyze_reports_server_timing_and_metrics(random_walk):
+    save_stock_data("MTRX", random_walk(400, 7))
+    resp = client.get("/analyze/MTRX")
+    assert resp.status_code == 200
+    timing = resp.headers["server-timing"]
+    # Stages run in the API's worker pool still show up in the request's breakdown
+    for part in ("db.get_stock_data;dur=", "features;dur=", "payload;dur=", "total;dur="):
+        assert part in timing
+
+    body = client.get("/metrics").text
+    assert 'finsight_stage_calls_total{stage="features"}' in body
+    assert 'finsight_cache_lookups_total{cache="responses",result="miss"}' in body
+    assert 'finsight_http_request_seconds_count{method="GET",route="/analyze/{ticker}",status="200"}' in body
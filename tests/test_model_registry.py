@@ -0,0 +1,52 @@
+# tests/test_model_registry.py
+import os
+import joblib
+import numpy as np
+import pytest
+from src.ml_engine.features import MODEL_FEATURES
+from src.ml_engine.model_registry import (
+    ModelRegistry, ModelArtifactError, save_model_artifact, load_model_artifact, ticker_model_path
+)
+
+
+class ConstantModel:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+
+class FittedReversed(ConstantModel):
+    feature_names_in_ = np.array(list(reversed(MODEL_FEATURES)))
+
+
+def test_ticker_model_overrides_shared_and_hot_reloads():
+    registry = ModelRegistry(check_interval=0)
+    save_model_artifact(ConstantModel(1.0))
+    assert registry.get("ZZZ").model.value == 1.0          # shared fallback
+
+    save_model_artifact(ConstantModel(2.0), ticker="ZZZ")
+    first = registry.get("ZZZ")
+    assert first.model.value == 2.0 and first.ticker == "ZZZ"
+    assert registry.get("ZZZ") is first                      # served from memory
+
+    save_model_artifact(ConstantModel(3.0), ticker="ZZZ")
+    path = ticker_model_path("ZZZ")
+    os.utime(path, (first.mtime + 10, first.mtime + 10))
+    assert registry.get("ZZZ").model.value == 3.0
+    assert "ZZZ" in registry.warm_up()
+
+
+def test_feature_mismatch_rejected_at_load(tmp_path):
+    path = tmp_path / "bad.pkl"
+    save_model_artifact(FittedReversed(0.0), MODEL_FEATURES, path=path)
+    with pytest.raises(ModelArtifactError):
+        load_model_artifact(path)
+
+
+def test_legacy_bare_model_gets_default_features(tmp_path):
+    path = tmp_path / "legacy.pkl"
+    joblib.dump(ConstantModel(5.0), path)
+    artifact = load_model_artifact(path)
+    assert artifact.version == "legacy" and artifact.features == MODEL_FEATURES
@@ -0,0 +1,40 @@
+# tests/test_panel.py
+import numpy as np
+import pandas as pd
+from src.ml_engine.features import add_technical_indicators, INDICATOR_COLUMNS
+from src.ml_engine.panel import build_panel, compute_panel_indicators, ticker_frame, load_panel
+from src.data_engine.database import save_stock_data
+
+
+def test_panel_matches_per_ticker(random_walk):
+    frames = {
+        "OLD": random_walk(600, 1, start="2019-01-01"),
+        "NEW": random_walk(300, 2, start="2020-06-01"),        # listed later
+        "GAPS": random_walk(500, 3, start="2019-03-01").drop(pd.bdate_range("2019-09-02", periods=15)),
+        "SHORT": random_walk(50, 4, start="2019-01-01"),       # never gets an SMA 200
+    }
+    panel = build_panel(frames)
+    indicators = compute_panel_indicators(panel["High"], panel["Low"], panel["Close"])
+
+    for ticker, df in frames.items():
+        expected = add_technical_indicators(df) if len(df) >= 200 else df.iloc[:0]
+        got = ticker_frame(panel, indicators, ticker)
+        assert got.index.equals(expected.index), ticker
+        if len(expected):
+            np.testing.assert_allclose(got[INDICATOR_COLUMNS], expected[INDICATOR_COLUMNS], rtol=1e-9)
+
+
+def test_load_panel_from_store(random_walk):
+    save_stock_data("PNL1", random_walk(30, 5, start="2021-01-01"))
+    save_stock_data("PNL2", random_walk(20, 6, start="2021-01-15"))
+    panel = load_panel(["PNL1", "PNL2", "MISSING"])
+
+    assert list(panel["Close"].columns) == ["PNL1", "PNL2"]
+    assert panel["Close"]["PNL2"].isna().sum() == 10
+
+
+def test_unknown_tickers_give_empty_panel(random_walk):
+    panel = load_panel(["NOSUCH1", "NOSUCH2"])
+    assert set(panel) == {"Open", "High", "Low", "Close", "Volume"}
+    assert all(wide.empty for wide in panel.values())
+    assert build_panel({"EMPTY": random_walk(10, 5, start="2020-01-01").iloc[:0]})["Close"].empty
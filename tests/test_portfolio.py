@@ -0,0 +1,75 @@
+# tests/test_portfolio.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.ml_engine.portfolio import portfolio_backtest, golden_cross_signals, run_portfolio_backtest
+from src.data_engine.database import save_stock_data
+
+
+def wide_walk(n, tickers, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, (n, len(tickers))), axis=0))
+    return pd.DataFrame(close, index=pd.bdate_range("2018-01-01", periods=n, name="Date"), columns=tickers)
+
+
+def reference(close, signals, weighting, rebalance_rows, cost_rate, vol_window, capital):
+    """Day-by-day share-count simulation to check the vectorized version against."""
+    prices = close.ffill()
+    vol = np.log(prices).diff().rolling(vol_window).std()
+    shares, cash, curve = pd.Series(0.0, index=close.columns), capital, []
+    for t, date in enumerate(close.index):
+        px = prices.loc[date].fillna(0.0)
+        value = cash + (shares * px).sum()
+        if t in rebalance_rows:
+            held = signals.loc[date].astype(bool) & close.loc[date].notna()
+            raw = held.astype(float) if weighting == "equal" else (1 / vol.loc[date]).where(held & (vol.loc[date] > 0), 0.0)
+            target = raw / raw.sum() if raw.sum() > 0 else raw * 0
+            current = (shares * px) / value
+            value -= value * cost_rate * (target - current).abs().sum()
+            shares = (target * value / px).where(target > 0, 0.0)
+            cash = value - (shares * px).sum()
+        curve.append(value)
+    return np.array(curve)
+
+
+@pytest.mark.parametrize("weighting", ["equal", "vol"])
+def test_matches_day_by_day_simulation(weighting):
+    close = wide_walk(400, ["A", "B", "C", "D", "E"], 1)
+    close.iloc[:120, 3] = np.nan                  # D lists later
+    close.iloc[200:210, 1] = np.nan               # B has missing bars
+    signals = golden_cross_signals(close, fast=10, slow=40)
+
+    got = portfolio_backtest(close, signals, weighting=weighting, rebalance="M",
+                             cost_bps=10, slippage_bps=5, vol_window=20)
+    rows = set(np.flatnonzero(np.r_[True, close.index.month[1:] != close.index.month[:-1]]))
+    expected = reference(close, signals, weighting, rows, 15 / 1e4, 20, 10000)
+
+    np.testing.assert_allclose(got["comparison_data"]["strategy_curve"], expected, rtol=1e-9)
+    assert got["total_costs"] > 0
+
+
+def test_single_asset_buy_and_hold_and_fixed_weights():
+    close = wide_walk(300, ["A", "B"], 2)
+    hold = portfolio_backtest(close[["A"]], rebalance="Q", cost_bps=0, slippage_bps=0)
+    np.testing.assert_allclose(hold["comparison_data"]["strategy_curve"], 10000 * close["A"] / close["A"].iloc[0])
+
+    half = portfolio_backtest(close, weighting={"A": 0.5}, rebalance=21, cost_bps=0, slippage_bps=0)
+    assert half["final_weights"] == {"A": 0.5}
+    with pytest.raises(ValueError):
+        portfolio_backtest(close, weighting="kelly")
+
+
+def test_run_from_price_store():
+    close = wide_walk(300, ["PFA", "PFB"], 3)
+    for t in close:
+        save_stock_data(t, pd.DataFrame({"Open": close[t], "High": close[t], "Low": close[t],
+                                         "Close": close[t], "Volume": 1e6}))
+    result = run_portfolio_backtest(["pfa", "PFB", "NOPE"], weighting="vol")
+    assert result["missing"] == ["NOPE"]
+    assert len(result["comparison_data"]["dates"]) == 300
+
+
+def test_run_with_no_stored_tickers():
+    result = run_portfolio_backtest(["nope", "NADA"])
+    assert "error" in result
+    assert result["missing"] == ["NOPE", "NADA"]
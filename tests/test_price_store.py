@@ -0,0 +1,45 @@
+# tests/test_price_store.py
+import pandas as pd
+from src.data_engine.price_store import ArrowPriceStore, migrate_from_sqlite
+from src.data_engine.database import save_stock_data, get_stock_data
+
+
+def make_bars(start, periods, close=100.0):
+    dates = pd.date_range(start, periods=periods, freq="D", name="Date", tz="America/New_York")
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1,
+        "Close": close, "Volume": 1000.0, "Dividends": 0.0
+    }, index=dates)
+
+
+def test_arrow_upsert_and_read(tmp_path):
+    store = ArrowPriceStore(root=tmp_path)
+    assert store.read("AAA").empty
+    assert store.upsert("AAA", make_bars("2024-01-01", 5)) == {"inserted": 5, "updated": 0}
+    assert store.upsert("AAA", make_bars("2024-01-04", 4, close=50.0)) == {"inserted": 2, "updated": 2}
+
+    df = store.read("AAA")
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert len(df) == 7 and df.index.is_monotonic_increasing
+    assert df.loc["2024-01-05", "Close"] == 50.0
+    assert str(store.last_date("AAA")) == "2024-01-07"
+
+
+def test_migrate_matches_sqlite(tmp_path):
+    save_stock_data("MIG1", make_bars("2023-06-01", 30))
+    store = ArrowPriceStore(root=tmp_path)
+    migrated = migrate_from_sqlite(store)
+
+    assert migrated["MIG1"] == 30
+    pd.testing.assert_frame_equal(
+        store.read("MIG1"), get_stock_data("MIG1"), check_index_type=False, check_freq=False
+    )
+
+
+def test_arrow_range_and_columns(tmp_path):
+    store = ArrowPriceStore(root=tmp_path)
+    store.upsert("BBB", make_bars("2024-03-01", 10))
+    df = store.read("BBB", start="2024-03-04", end="2024-03-06", columns=["Close"])
+
+    assert list(df.columns) == ["Close"]
+    assert len(df) == 3 and str(df.index[0].date()) == "2024-03-04"
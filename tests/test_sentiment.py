@@ -0,0 +1,75 @@
+# tests/test_sentiment.py
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.data_engine import sentiment
+from src.data_engine.database import get_sentiment_series
+
+
+class FakeNewsApi:
+    def __init__(self, articles):
+        self.articles = articles
+        self.calls = 0
+
+    def get_everything(self, **kwargs):
+        self.calls += 1
+        return {"articles": self.articles}
+
+
+def article(title, url, days_ago):
+    published = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {"title": title, "url": url, "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "source": {"name": "Wire"}}
+
+
+@pytest.fixture
+def news(monkeypatch):
+    client = FakeNewsApi([
+        article("Stock soars on record profits and great growth", "https://x/1", 0),
+        article("Stock soars on record profits and great growth", "https://x/1", 0),   # duplicate
+        article("Shares crash after terrible fraud scandal", "https://x/2", 1),
+        article("[Removed]", "https://x/3", 1),
+    ])
+    monkeypatch.setattr(sentiment, "_news_client", lambda: client)
+    return client
+
+
+def test_headlines_are_persisted_once_and_fetch_is_gated(news):
+    first = sentiment.get_market_sentiment("SNTA")
+    assert news.calls == 1
+    assert len(first["daily"]) == 2 and sum(d["count"] for d in first["daily"]) == 2
+    assert first["top_headlines"][0].startswith("Stock soars")
+
+    # Fresh window: served from the database without calling NewsAPI
+    assert sentiment.get_market_sentiment("SNTA") == first
+    assert news.calls == 1
+
+    # Forced refresh re-reads the same articles but scores nothing new
+    assert sentiment.refresh_sentiment("SNTA", force=True) == {"fetched": 3, "new": 0, "stored": 0}
+    assert get_sentiment_series("SNTA")["count"].sum() == 2
+
+
+def test_stored_sentiment_survives_api_errors(news, monkeypatch):
+    sentiment.refresh_sentiment("SNTB")
+
+    def broken(**kwargs):
+        raise RuntimeError("rate limited")
+    news.get_everything = broken
+    monkeypatch.setattr(sentiment, "SENTIMENT_STALE_AFTER", 0)
+
+    result = sentiment.get_market_sentiment("SNTB")
+    assert result["label"] != "Error" and len(result["daily"]) == 2
+    assert sentiment.get_market_sentiment("SNTNONE")["label"] == "Error"
+
+
+def test_failed_scoring_does_not_mark_fetch(news, monkeypatch):
+    def broken(titles):
+        raise RuntimeError("lexicon missing")
+    monkeypatch.setattr(sentiment, "score_headlines", broken)
+    with pytest.raises(RuntimeError):
+        sentiment.refresh_sentiment("SNTC")
+    assert sentiment.get_sentiment_fetched_at("SNTC") is None
+
+    monkeypatch.undo()
+    monkeypatch.setattr(sentiment, "_news_client", lambda: news)
+    assert sentiment.refresh_sentiment("SNTC")["stored"] == 2
+    assert news.calls == 2
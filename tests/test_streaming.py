@@ -0,0 +1,60 @@
+# tests/test_streaming.py
+import json
+import numpy as np
+import pandas as pd
+from src.ml_engine.features import add_technical_indicators, INDICATOR_COLUMNS
+from src.ml_engine.streaming import StreamingIndicators, refresh_indicator_state
+from src.data_engine.database import save_stock_data, load_indicator_state
+
+
+def stream(df, engine=None):
+    engine = engine or StreamingIndicators()
+    rows = [dict(engine.update(d, r.High, r.Low, r.Close)) for d, r in df.iterrows()]
+    return engine, pd.DataFrame(rows, index=df.index)
+
+
+def test_streaming_matches_batch(random_walk):
+    df = random_walk()
+    batch = add_technical_indicators(df)
+    _, streamed = stream(df)
+
+    streamed = streamed.dropna()
+    assert streamed.index.equals(batch.index)
+    np.testing.assert_allclose(streamed[INDICATOR_COLUMNS], batch[INDICATOR_COLUMNS], rtol=1e-9)
+
+
+def test_state_roundtrip_and_last_bar_revision(random_walk):
+    df = random_walk()
+    engine, _ = stream(df.iloc[:300])
+    # Persist, restore, then revise the last bar before continuing
+    engine = StreamingIndicators.from_dict(json.loads(json.dumps(engine.to_dict())))
+    bad = df.iloc[299]
+    engine.update(df.index[299], bad.High * 2, bad.Low, bad.Close * 1.5)
+    engine, _ = stream(df.iloc[299:], engine)
+
+    expected = add_technical_indicators(df).iloc[-1]
+    for col in INDICATOR_COLUMNS:
+        assert np.isclose(engine.values[col], expected[col], rtol=1e-9)
+
+
+def test_refresh_indicator_state_from_store(random_walk):
+    df = random_walk(300, seed=1)
+    save_stock_data("STRM", df.iloc[:250])
+    refresh_indicator_state("STRM")
+    save_stock_data("STRM", df.iloc[249:])
+    values = refresh_indicator_state("STRM")
+
+    assert load_indicator_state("STRM")["last_date"] == str(df.index[-1].date())
+    assert np.isclose(values["sma_200"], add_technical_indicators(df)["sma_200"].iloc[-1])
+
+
+def test_refresh_rebuilds_when_earlier_bar_is_rewritten(random_walk):
+    df = random_walk(300, seed=2)
+    save_stock_data("STRW", df)
+    refresh_indicator_state("STRW")
+
+    revised = df.copy()
+    revised.iloc[-2, revised.columns.get_loc("Close")] *= 1.1    # the bar before the state's last date
+    save_stock_data("STRW", revised.iloc[-2:])
+    values = refresh_indicator_state("STRW")
+    assert np.isclose(values["sma_50"], add_technical_indicators(revised)["sma_50"].iloc[-1], rtol=1e-12)
@@ -0,0 +1,35 @@
+# tests/test_sweep.py
+import pandas as pd
+import pytest
+from src.ml_engine.backtest import run_backtest
+from src.ml_engine.features import add_technical_indicators
+from src.ml_engine.sweep import sweep_backtest
+
+
+def test_golden_cross_point_matches_run_backtest(random_walk):
+    df = random_walk(1200, 7)
+    expected = run_backtest(add_technical_indicators(df))
+    table = sweep_backtest(df, fast_windows=[20, 50], slow_windows=[100, 200],
+                           rules=["long_cash", "long_short"])
+
+    row = table[(table.fast == 50) & (table.slow == 200) & (table.rule == "long_cash")].iloc[0]
+    assert row.final_equity == expected["comparison_data"]["strategy_curve"][-1]
+    assert round(row.total_return_pct, 2) == expected["strategy_return_pct"]
+    assert len(table) == 8
+
+
+def test_parallel_blocks_match_serial(random_walk):
+    df = random_walk(800, 8)
+    grid = dict(fast_windows=range(5, 60, 5), slow_windows=range(60, 160, 10),
+                rules=["long_cash", "long_short", "short_cash"])
+    serial = sweep_backtest(df, max_workers=1, **grid)
+    parallel = sweep_backtest(df, block_size=16, max_workers=4, **grid)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert (serial.max_drawdown <= 0).all()
+
+
+def test_rejects_bad_grid(random_walk):
+    with pytest.raises(ValueError):
+        sweep_backtest(random_walk(300, 9), fast_windows=[200], slow_windows=[100])
+    with pytest.raises(ValueError):
+        sweep_backtest(random_walk(300, 9), rules=["martingale"])
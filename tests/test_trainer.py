@@ -0,0 +1,42 @@
+# tests/test_trainer.py
+import json
+from src.config import MODEL_ARCHIVE_DIR
+from src.data_engine.database import save_stock_data
+from src.ml_engine.model_registry import ModelRegistry
+from src.ml_engine.trainer import train_tickers, walk_forward, load_training_frame
+
+
+def test_walk_forward_folds_are_out_of_sample(random_walk):
+    save_stock_data("TRWF", random_walk(500, 1))
+    folds = walk_forward(load_training_frame("TRWF"), n_folds=4)
+    assert len(folds) == 4
+    for f in folds:
+        assert f["train_end"] < f["test_start"]
+        assert f["mae"] > 0 and f["naive_mae"] > 0
+
+
+def test_train_tickers_in_process_pool(tmp_path, random_walk):
+    save_stock_data("TRPA", random_walk(450, 2))
+    save_stock_data("TRPB", random_walk(450, 3))
+    report = train_tickers(["trpa", "TRPB", "TRNONE"], max_workers=2, n_folds=3,
+                           report_path=tmp_path / "report.json")
+
+    status = {r["ticker"]: r["status"] for r in report["tickers"]}
+    assert status == {"TRPA": "ok", "TRPB": "ok", "TRNONE": "skipped"}
+    assert len(json.loads((tmp_path / "report.json").read_text())["tickers"][0]["folds"]) == 3
+
+    artifact = ModelRegistry(check_interval=0).get("TRPA")
+    assert artifact.ticker == "TRPA" and "walk_forward" in artifact.metadata["metrics"]
+    assert (MODEL_ARCHIVE_DIR / "TRPA" / f"{artifact.version}.pkl").exists()
+
+
+def test_spawned_workers_inherit_thread_caps():
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from src.ml_engine.trainer import _thread_caps
+
+    before = os.environ.get("OMP_NUM_THREADS")
+    with _thread_caps(3), ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        assert pool.submit(os.getenv, "OMP_NUM_THREADS").result() == "3"
+    assert os.environ.get("OMP_NUM_THREADS") == before
@@ -0,0 +1,62 @@
+# tests/test_vectorizer.py
+import pytest
+from src.data_engine import vectorizer
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = 0
+
+    def query(self, query_embeddings, n_results, include):
+        self.queries += 1
+        docs = self.docs[:n_results]
+        return {
+            "ids": [[f"id{i}" for i in range(len(docs))] for _ in query_embeddings],
+            "documents": [docs for _ in query_embeddings],
+            "metadatas": [[{"source": "10k.txt", "chunk": i} for i in range(len(docs))] for _ in query_embeddings],
+            "distances": [[0.2 * (i + 1) for i in range(len(docs))] for _ in query_embeddings],
+        }
+
+
+@pytest.fixture
+def store(monkeypatch):
+    embeddings = FakeEmbeddings()
+    collections = {"AAPL_10k": FakeCollection(["supply chain risk", "patent lawsuit", "AI growth"]),
+                   "MSFT_10k": FakeCollection(["cloud growth"])}
+
+    def get_collection(ticker):
+        return collections[f"{ticker}_10k"]          # KeyError for tickers never ingested
+
+    monkeypatch.setattr(vectorizer, "get_embedding_model", lambda: embeddings)
+    monkeypatch.setattr(vectorizer, "_get_collection", get_collection)
+    return embeddings, collections
+
+
+def test_multi_ticker_multi_topic_search(store):
+    embeddings, collections = store
+    found = vectorizer.search_filings(["aapl", "MSFT", "NOPE"], topics=["risks", "growth", "litigation"], k=2)
+
+    assert len(embeddings.calls) == 1 and len(embeddings.calls[0]) == 3     # one embedding batch
+    assert collections["AAPL_10k"].queries == 1                             # one query per collection
+    assert set(found["results"]) == {"AAPL", "MSFT"} and set(found["errors"]) == {"NOPE"}
+
+    hit = found["results"]["AAPL"]["litigation"][0]
+    assert hit["text"] == "supply chain risk" and hit["score"] == 0.9 and hit["metadata"]["chunk"] == 0
+    assert len(found["results"]["MSFT"]["growth"]) == 1
+
+
+def test_fundamental_analysis_keeps_text_shape(store):
+    result = vectorizer.get_fundamental_analysis("AAPL")
+    assert result["relevant_text"] == "supply chain risk\npatent lawsuit"
+    assert len(result["matches"]) == 2
+    assert vectorizer.get_fundamental_analysis("NOPE")["relevant_text"].startswith("Error retrieving docs")